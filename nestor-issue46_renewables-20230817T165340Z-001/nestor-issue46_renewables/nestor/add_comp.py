@@ -1,9 +1,74 @@
 import FINE as fn
+import numpy as np
 import pandas as pd
 
+# parameters which are patched on the existing component instead of adding
+# the component again, no other attributes are derived from them by FINE
+PATCHABLE_PARAMETERS = [
+    "capacityFix", "capacityMax", "capacityMin", "investPerCapacity",
+    "opexPerCapacity", "opexPerOperation", "opexPerChargeOperation",
+    "commodityCost", "commodityRevenue"]
+CAPACITY_PARAMETERS = ["capacityFix", "capacityMax", "capacityMin"]
+
 
 def update_parameter(component, esM, updated_parameter_dict, system_with_ee_restriction=False):
     # get dict to update parameter
+    param_list = get_parameter_list(component, system_with_ee_restriction)
+
+    # check if the updated parameter exists in the parameter of component
+    if any([x for x in updated_parameter_dict.keys() if x not in param_list]):
+        _missing = [x for x in updated_parameter_dict.keys()
+                    if x not in param_list]
+        raise ValueError(
+            f"Passed parameter '{_missing}' to update '{component.name}' not in parameter list")
+
+    # only bounds or costs changed: no need to validate the time series again
+    if patch_parameter(component, updated_parameter_dict):
+        return esM
+
+    update_component_parameter = {}
+    for param in param_list:
+        if param in updated_parameter_dict.keys():
+            update_component_parameter[param] = updated_parameter_dict[param]
+        else:
+            update_component_parameter[param] = getattr(component, param)
+
+    # for capacity get values out of the dict
+    for param in ["capacityFix", "capacityMax", "capacityMin", "investPerCapacity", "opexPerOperation", "opexPerCapacity", "economicLifetime", "technicalLifetime", "interestRate", "QPcostScale"]:
+        if (param == "QPcostScale" or param == "opexPerOperation" or param == "technicalLifetime") and param not in update_component_parameter.keys():
+            continue
+        update_component_parameter[param] =\
+            _get_single_value(update_component_parameter[param])
+
+    # capacity max cannot be int
+    if update_component_parameter["capacityMax"] is not None:
+        update_component_parameter["capacityMax"] =\
+            float(update_component_parameter["capacityMax"])
+    if update_component_parameter["capacityFix"] is not None:
+        update_component_parameter["capacityFix"] =\
+            float(update_component_parameter["capacityFix"])
+    if update_component_parameter["capacityMin"] is not None:
+        update_component_parameter["capacityMin"] =\
+            float(update_component_parameter["capacityMin"])
+    # update parameter
+    # for sources, sign comparison is needed, otherwises also sink chosen
+    if isinstance(component, fn.Source) and component.sign == 1:
+        addSource(esM, sourceParameter=update_component_parameter,system_with_ee_restriction=system_with_ee_restriction)
+    elif isinstance(component, fn.Sink):
+        addSink(esM, sinkParameter=update_component_parameter)
+    elif isinstance(component, fn.Conversion):
+        esM = addConversion(esM, update_component_parameter)
+    elif isinstance(component, fn.Storage):
+        esM = addStorage(esM, storageParameter=update_component_parameter)
+    else:
+        raise ValueError(
+            "Unknown component type for "+component.name)
+    return esM
+
+
+def get_parameter_list(component, system_with_ee_restriction=False):
+    """Get the parameters of a component, which are passed to FINE when the
+    component is added again by update_parameter."""
     if isinstance(component, fn.Source):
         # TODO as long as sharedCapacityExpansion is not on dev branch this differentiation is required
         if system_with_ee_restriction:
@@ -45,62 +110,166 @@ def update_parameter(component, esM, updated_parameter_dict, system_with_ee_rest
             "economicLifetime"]
     else:
         raise ValueError()
+    return param_list
 
-    # check if the updated parameter exists in the parameter of component
-    if any([x for x in updated_parameter_dict.keys() if x not in param_list]):
-        _missing = [x for x in updated_parameter_dict.keys()
-                    if x not in param_list]
-        raise ValueError(
-            f"Passed parameter '{_missing}' to update '{component.name}' not in parameter list")
 
-    update_component_parameter = {}
-    for param in param_list:
-        if param in updated_parameter_dict.keys():
-            update_component_parameter[param] = updated_parameter_dict[param]
-        else:
-            update_component_parameter[param] = getattr(component, param)
+def update_parameters(esM, updated_parameters, location,
+                      system_with_ee_restriction=False, check_bounds=True):
+    """Update the parameters of many components at once.
 
-    # for capacity get values out of the dict
-    for param in ["capacityFix", "capacityMax", "capacityMin", "investPerCapacity", "opexPerOperation", "opexPerCapacity", "economicLifetime", "technicalLifetime", "interestRate", "QPcostScale"]:
-        if (param == "QPcostScale" or param == "opexPerOperation" or param == "technicalLifetime") and param not in update_component_parameter.keys():
-            continue
-        if isinstance(update_component_parameter[param], dict):
-            if len(update_component_parameter[param]) > 1:
-                raise ValueError()
-            region = list(update_component_parameter[param].keys())[0]
-            update_component_parameter[param] =\
-                update_component_parameter[param][region]
-        if isinstance(update_component_parameter[param], pd.Series):
-            if len(update_component_parameter[param]) == 1:
-                update_component_parameter[param] =\
-                    update_component_parameter[param].values[0]
+    The capacity bounds of all components are checked once on the updated
+    values before any component is changed, and every component is updated
+    only once.
 
-    # capacity max cannot be int
-    if update_component_parameter["capacityMax"] is not None:
-        update_component_parameter["capacityMax"] =\
-            float(update_component_parameter["capacityMax"])
-    if update_component_parameter["capacityFix"] is not None:
-        update_component_parameter["capacityFix"] =\
-            float(update_component_parameter["capacityFix"])
-    if update_component_parameter["capacityMin"] is not None:
-        update_component_parameter["capacityMin"] =\
-            float(update_component_parameter["capacityMin"])
-    # update parameter
-    # for sources, sign comparison is needed, otherwises also sink chosen
-    if isinstance(component, fn.Source) and component.sign == 1:
-        addSource(esM, sourceParameter=update_component_parameter,system_with_ee_restriction=system_with_ee_restriction)
-    elif isinstance(component, fn.Sink):
-        addSink(esM, sinkParameter=update_component_parameter)
-    elif isinstance(component, fn.Conversion):
-        esM = addConversion(esM, update_component_parameter)
-    elif isinstance(component, fn.Storage):
-        esM = addStorage(esM, storageParameter=update_component_parameter)
-    else:
-        raise ValueError(
-            "Unknown component type for "+component.name)
+    Parameters
+    ----------
+    esM : fn.EnergySystemModel
+    updated_parameters : dict
+        component name -> dict of updated parameters
+    location : str
+    system_with_ee_restriction : bool
+        sources have shared expansion parameters
+    check_bounds : bool
+        check the capacity bounds of all components, skip it for
+        intermediate updates which are checked later
+    """
+    if check_bounds:
+        check_capacity_bounds(esM, location, updated_parameters)
+    for component_name, updated_parameter_dict in updated_parameters.items():
+        esM = update_parameter(
+            esM.getComponent(component_name), esM, updated_parameter_dict,
+            system_with_ee_restriction=system_with_ee_restriction)
     return esM
 
 
+def check_capacity_bounds(esM, location, updated_parameters=None):
+    """Check that no component has capacityFix and capacityMin/Max and that
+    capacityMin does not exceed capacityMax.
+
+    Parameters
+    ----------
+    esM : fn.EnergySystemModel
+    location : str
+    updated_parameters : dict
+        component name -> dict of updated parameters, which are checked
+        instead of the current values of the component
+    """
+    if updated_parameters is None:
+        updated_parameters = {}
+    for component_name in esM.componentNames:
+        bounds = get_capacity_bounds(
+            esM.getComponent(component_name), location,
+            updated_parameters.get(component_name))
+
+        if bounds["capacityFix"] is not None and \
+                (bounds["capacityMax"] is not None or
+                 bounds["capacityMin"] is not None):
+            raise ValueError(
+                f"Capacity Min and Capacity Fixis defined for {component_name}")
+        if bounds["capacityMax"] is not None and \
+                bounds["capacityMin"] is not None and \
+                bounds["capacityMin"] > bounds["capacityMax"]:
+            raise ValueError(
+                "Lower bound '{}' greater than ".format(bounds["capacityMin"]) +
+                "upper bound '{}' ".format(bounds["capacityMax"]) +
+                "for component '{}'".format(component_name))
+
+
+def get_capacity_bounds(component, location, updated_parameter_dict=None):
+    """Get capacityFix, capacityMax and capacityMin of a component in
+    location, updated values are taken instead of the current ones.
+
+    Returns
+    -------
+    dict
+        parameter -> value or None
+    """
+    if updated_parameter_dict is None:
+        updated_parameter_dict = {}
+    bounds = {}
+    for param in CAPACITY_PARAMETERS:
+        value = updated_parameter_dict.get(param, getattr(component, param))
+        if isinstance(value, pd.Series) and location in value.index:
+            value = value[location]
+        bounds[param] = _get_single_value(value)
+    return bounds
+
+
+def patch_parameter(component, updated_parameter_dict):
+    """Set updated bounds and costs directly on the existing component.
+
+    The component is only patched if the kind of its capacity bounds stays
+    the same (None, zero or positive), since FINE derives the locational
+    eligibility and the quadratic bounds from them.
+
+    Returns
+    -------
+    bool
+        False if the component has to be added again
+    """
+    if any(x not in PATCHABLE_PARAMETERS for x in updated_parameter_dict):
+        return False
+
+    patched = {}
+    for param, value in updated_parameter_dict.items():
+        # FINE keeps processed copies of the parameter
+        if hasattr(component, "processed" + param[0].upper() + param[1:]):
+            return False
+        current = getattr(component, param)
+        value = _get_single_value(value)
+        if current is None or value is None:
+            if current is None and value is None:
+                continue
+            return False
+        if not isinstance(current, pd.Series):
+            return False
+
+        value = float(value)
+        if not np.isfinite(value) or value < 0:
+            raise ValueError(
+                f"Value of '{param}' of '{component.name}' has to be " +
+                f"non-negative, got {value}")
+        if param in CAPACITY_PARAMETERS and \
+                (current > 0).any() != (value > 0):
+            return False
+        new = pd.Series(value, index=current.index)
+        if param not in CAPACITY_PARAMETERS and \
+                isinstance(getattr(component, "locationalEligibility", None),
+                           pd.Series):
+            # costs are zero in not eligible locations
+            new[component.locationalEligibility.reindex(new.index) == 0] = 0
+        patched[param] = new
+
+    capacity_changed = any(x in patched for x in CAPACITY_PARAMETERS)
+    qp_cost_scale = getattr(component, "QPcostScale", None)
+    if capacity_changed and hasattr(component, "QPbound") and \
+            qp_cost_scale is not None and (qp_cost_scale != 0).any():
+        return False
+
+    capacityMin = patched.get("capacityMin", component.capacityMin)
+    capacityMax = patched.get("capacityMax", component.capacityMax)
+    if capacityMin is not None and capacityMax is not None and \
+            (capacityMin > capacityMax).any():
+        raise ValueError(
+            f"capacityMin of '{component.name}' exceeds capacityMax")
+
+    for param, value in patched.items():
+        setattr(component, param, value)
+    return True
+
+
+def _get_single_value(value):
+    # value of the only region
+    if isinstance(value, dict):
+        if len(value) > 1:
+            raise ValueError()
+        value = list(value.values())[0]
+    if isinstance(value, pd.Series):
+        if len(value) == 1:
+            value = value.values[0]
+    return value
+
+
 def addSource(esM, sourceParameter, system_with_ee_restriction):
     if system_with_ee_restriction:
         if sourceParameter["QPcostScale"] is None or (sourceParameter["capacityMax"] is None and sourceParameter["capacityMin"] is None):
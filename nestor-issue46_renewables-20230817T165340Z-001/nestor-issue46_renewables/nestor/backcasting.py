@@ -5,15 +5,32 @@ import sys
 import shutil
 import FINE as fn
 
-from nestor.add_comp import update_parameter, addConversion, addSource, addSink, addStorage
+from nestor.add_comp import update_parameters, addConversion, addSource, addSink, addStorage, get_parameter_list, get_capacity_bounds
+from nestor.component_registry import ComponentRegistry
 from nestor.utils.exportResult import get_yearly_FINE_results, export_FINE_results
 from nestor.utils.calcDemand import calculate_demand
 from nestor.utils.check_output import check_output
 from nestor.utils.data_handling import create_evaluation_file
+from nestor.utils.pathway_optimizer import PathwayOptimizer
+from nestor.utils.clustering_cache import ClusteringCache
+from nestor.utils.stock_ledger import StockLedger
+from nestor.utils.checkpoint import save_checkpoint, remove_checkpoint
+from nestor.utils.optimal_values import OptimalValues
 
 
 class MyopicTrans():
     """Class which manages the myopic transformation path analysis"""
+    # attributes of the pathway, which are stored in the checkpoint
+    PATHWAY_STATE = [
+        "stocks", "resultCapacities", "helper_capex_calculation",
+        "yearlyRenewableExpansionMin", "ee_result_targetyear", "FINEResults",
+        "finished_years"]
+    # parameters of the components, which are changed over the pathway
+    PATHWAY_PARAMETERS = [
+        "capacityFix", "capacityMax", "capacityMin", "investPerCapacity",
+        "opexPerCapacity", "opexPerOperation", "QPcostScale",
+        "commodityConversionFactors", "sharedExpansionID",
+        "sharedCapacityExpansionMin", "sharedCapacityExpansionMax"]
 
     def __init__(self, parent):
         """Initialize the MyopicTrans class."""
@@ -59,49 +76,68 @@ class MyopicTrans():
             self.parent.raw_sinks.loc[self.parent.raw_sinks["unrestrict"] == True],
             self.parent.raw_hubs.loc[self.parent.raw_hubs["unrestrict"] == True]],
             axis=0).index
-
-        # initialize empty temp files
-        self.initialize_temp_files()
+        self._registry = None
+        # parameter updates of the current year, see add_parameter_update
+        self.parameter_updates = {}
+        # optimization model of the pathway
+        self.optimizer = PathwayOptimizer(
+            self.parent.scenario_definition.get("warmstart", False))
+        self.clustering = ClusteringCache()
+        # optimal values of the last solve
+        self.optimal_values = OptimalValues()
+
+        # vintage accounting of the stocks over the pathway
+        self.stocks = None
+        self.initialize_stock_ledger()
+
+        # results of the finished years, the run is resumed after the last
+        # finished year from a checkpoint
+        self.FINEResults = {}
+        self.finished_years = []
+
+    def get_registry(self):
+        """Get the registry of the components in the network.
+
+        Components are only added to the network, so the registry is
+        rebuilt if the number of components changed.
+        """
+        if self._registry is None or \
+                len(self._registry) != len(self.parent.esM.componentNames):
+            self._registry = ComponentRegistry(
+                self.parent.esM.componentNames,
+                self.parent.string_identifiers,
+                self.unrestricted_components)
+        return self._registry
+
+    def add_parameter_update(self, component_name, updated_parameter_dict):
+        """Collect a parameter update of a component.
+
+        All updates of a year are applied at once by apply_parameter_updates,
+        later updates of a parameter overwrite earlier ones.
+        """
+        self.parameter_updates.setdefault(component_name, {}).update(
+            updated_parameter_dict)
+
+    def get_capacity_bounds(self, component):
+        """Get the capacity bounds of a component in the location including
+        the collected parameter updates."""
+        return get_capacity_bounds(
+            component, self.parent.location,
+            self.parameter_updates.get(component.name))
+
+    def apply_parameter_updates(self):
+        """Apply the collected parameter updates to the network."""
+        self.parent.esM = update_parameters(
+            self.parent.esM, self.parameter_updates, self.parent.location,
+            system_with_ee_restriction=self.parent.considerMaxYearlyExpansionLimit)
+        self.parameter_updates = {}
 
     def transformation_pathway(self):
-
-        #######################################################################
-        # Target Year
-        #######################################################################
-        print('\n' + 'Target Year', flush=True)
-
-        self.initialize_optimization_year(
-            currentyear=self.parent.targetyear,
-            targetyear_optimization=True)
-
-        # Optimization
-        print('\n' + 'optimizing Target Year...', flush=True)
-        if self.parent.typdays is not None:
-            self.parent.esM.cluster(numberOfTypicalPeriods=self.parent.typdays)
-            tsa = True
-        else:
-            tsa = False
-
-        self.parent.esM.optimize(
-            timeSeriesAggregation=tsa, solver=self.parent.solver,
-            optimizationSpecs=self.parent.optimization_specs)
-        check_for_infeasibility(
-            str(self.parent.esM.solverSpecs["terminationCondition"]), year="Target Year")
-        print('\n' + 'Target Year optimized!', flush=True)
-
-        # save results and transform to enercore-network
-        # TODO make new approach!
-
-        print('saving results...', flush=True)
-        FINEResults = {}
-        FINEResults = get_yearly_FINE_results(
-            FINEResults=FINEResults, esM=self.parent.esM, year="target year")
-        print('results saved!')
-
-        # perform backcasting
-        print('perform backcasting...', flush=True)
-        self.initBackcasting()
-        print('backcasting performed!', flush=True)
+        """Optimize the target year and all model years, which are not
+        finished yet, and export the results."""
+        if "target year" not in self.finished_years:
+            self.optimize_target_year()
+            self.finish_year("target year")
 
         ##########################################################################
         # Myopic Transformation Path
@@ -110,41 +146,16 @@ class MyopicTrans():
         # TODO if above with range initialized, change here to >1
         if len(self.parent.modelyears) > 2:
             for year in self.parent.modelyears:
-                print('\n \n \n Year: ' + str(year))
-                # get technological parameters
-                self.initialize_optimization_year(currentyear=year)
-
-                # Optimization
-                if self.parent.typdays is not None:
-                    self.parent.esM.cluster(
-                        numberOfTypicalPeriods=self.parent.typdays)
-                print('\n' + 'optimizing ' + str(year), flush=True)
-                self.parent.esM.optimize(
-                    timeSeriesAggregation=tsa, solver=self.parent.solver,
-                    optimizationSpecs=self.parent.optimization_specs)
-
-                check_for_infeasibility(
-                    str(self.parent.esM.solverSpecs["terminationCondition"]), year=self.parent.currentyear)
-
-                print('\n' + str(year) + ' optimized!',
-                      flush=True)
-
-                # Export results and transform to enercore-network
-                # TODO make new with FINE
-                print('saving results...', flush=True)
-                FINEResults = get_yearly_FINE_results(
-                    FINEResults=FINEResults, esM=self.parent.esM, year=self.parent.currentyear)
-                FINEResults = calculate_demand(
-                    self.parent.currentyear, self.parent.resultfolderpath,
-                    FINEResults, self.parent.esM)
-                print('results saved!')
-                print('\n Finished' + str(year), flush=True)
+                if year in self.finished_years:
+                    continue
+                self.optimize_year(year)
+                self.finish_year(year)
 
         ##########################################################################
         # Export Transformation path analysis results
         ##########################################################################
         resultfilepath = self.parent.resultfolderpath + '/Transformation_overview.xlsx'
-        export_FINE_results(anyears=self.parent.modelyears, FINEResults=FINEResults,
+        export_FINE_results(anyears=self.parent.modelyears, FINEResults=self.FINEResults,
                             esM=self.parent.esM, resultfilepath=resultfilepath)
 
         ##########################################################################
@@ -181,8 +192,152 @@ class MyopicTrans():
         ##########################################################################
         # delete temp data
         # shutil.rmtree(temppath, ignore_errors=True)
+        remove_checkpoint(self.parent.resultfolderpath)
         print('\n' + 'Completed!', flush=True)
 
+    def optimize_target_year(self):
+        #######################################################################
+        # Target Year
+        #######################################################################
+        print('\n' + 'Target Year', flush=True)
+
+        self.initialize_optimization_year(
+            currentyear=self.parent.targetyear,
+            targetyear_optimization=True)
+
+        # Optimization
+        print('\n' + 'optimizing Target Year...', flush=True)
+        self.optimize()
+        check_for_infeasibility(
+            str(self.parent.esM.solverSpecs["terminationCondition"]), year="Target Year")
+        print('\n' + 'Target Year optimized!', flush=True)
+
+        # save results and transform to enercore-network
+        # TODO make new approach!
+
+        print('saving results...', flush=True)
+        self.FINEResults = get_yearly_FINE_results(
+            FINEResults=self.FINEResults, esM=self.parent.esM, year="target year")
+        print('results saved!')
+
+        # perform backcasting
+        print('perform backcasting...', flush=True)
+        self.initBackcasting()
+        print('backcasting performed!', flush=True)
+
+    def optimize_year(self, year):
+        print('\n \n \n Year: ' + str(year))
+        # get technological parameters
+        self.initialize_optimization_year(currentyear=year)
+
+        # Optimization
+        print('\n' + 'optimizing ' + str(year), flush=True)
+        self.optimize()
+
+        check_for_infeasibility(
+            str(self.parent.esM.solverSpecs["terminationCondition"]), year=self.parent.currentyear)
+
+        print('\n' + str(year) + ' optimized!',
+              flush=True)
+
+        # Export results and transform to enercore-network
+        # TODO make new with FINE
+        print('saving results...', flush=True)
+        self.FINEResults = get_yearly_FINE_results(
+            FINEResults=self.FINEResults, esM=self.parent.esM, year=self.parent.currentyear)
+        self.FINEResults = calculate_demand(
+            self.parent.currentyear, self.parent.resultfolderpath,
+            self.FINEResults, self.parent.esM, self.optimal_values)
+        print('results saved!')
+        print('\n Finished' + str(year), flush=True)
+
+    def optimize(self):
+        """Cluster the time series and optimize the current year."""
+        if self.parent.typdays is not None:
+            self.clustering.cluster(
+                self.parent.esM, numberOfTypicalPeriods=self.parent.typdays)
+            tsa = True
+        else:
+            tsa = False
+
+        self.optimizer.optimize(
+            self.parent.esM, timeSeriesAggregation=tsa,
+            solver=self.parent.solver,
+            optimizationSpecs=self.parent.optimization_specs,
+            threads=self.parent.threads)
+        self.optimal_values.clear()
+
+    def get_optimal_values(self, component, name='capacityVariablesOptimum'):
+        """Get the optimal values of the modeling class of a component in the
+        last solve, see OptimalValues."""
+        return self.optimal_values.get(
+            self.parent.esM, component.modelingClass.__name__, name)
+
+    def finish_year(self, year):
+        """Mark a year as finished and write the checkpoint of the run.
+
+        No checkpoint is written after the last year, the export needs the
+        solved model of this year.
+        """
+        self.finished_years.append(year)
+        last_year = len(self.parent.modelyears) <= 2 or \
+            year == self.parent.modelyears[-1]
+        if self.parent.scenario_definition.get("checkpoint", True) and \
+                not last_year:
+            save_checkpoint(self.parent)
+
+    def get_state(self):
+        """Get the state of the pathway after the last finished year, see
+        restore_state.
+
+        The energy system model is not part of the state. It is rebuilt from
+        the stock components, the parameters changed over the pathway and
+        the optimal capacities of the last solve.
+
+        Returns
+        -------
+        dict
+        """
+        esM = self.parent.esM
+        state = {x: getattr(self, x) for x in self.PATHWAY_STATE
+                 if hasattr(self, x)}
+        state["stock_components"] = [
+            x for x in esM.componentNames if "_stock" in x]
+        # the CO2 limit and the virtual components are added again every year
+        # or not changed
+        state["parameters"] = {}
+        for name in esM.componentNames:
+            if name == "CO2Environment" or "Virt" in name:
+                continue
+            component = esM.getComponent(name)
+            state["parameters"][name] = {
+                x: getattr(component, x) for x in get_parameter_list(
+                    component, self.parent.considerMaxYearlyExpansionLimit)
+                if x in self.PATHWAY_PARAMETERS}
+        state["optimal_values"] = {
+            (x, 'capacityVariablesOptimum'): self.optimal_values.get(esM, x)
+            for x in esM.componentModelingDict}
+        return state
+
+    def restore_state(self, state):
+        """Continue the pathway from a state of get_state.
+
+        The network has to be initialized from the input data before. The
+        stock components are added again and all components get their
+        parameters after the last finished year.
+        """
+        for name in self.PATHWAY_STATE:
+            if name in state:
+                setattr(self, name, state[name])
+        for name in state["stock_components"]:
+            self.add_stock(self.parent.esM.getComponent(
+                name.replace("_stock", "")))
+        self.parent.esM = update_parameters(
+            self.parent.esM, state["parameters"], self.parent.location,
+            system_with_ee_restriction=self.parent.considerMaxYearlyExpansionLimit,
+            check_bounds=False)
+        self.optimal_values.restore(state["optimal_values"])
+
     def initialize_optimization_year(
             self, currentyear, targetyear_optimization=False):
         # initialize start and current year of optimization
@@ -239,17 +394,13 @@ class MyopicTrans():
         # RESTRICT RENEWABLES
         if self.parent.considerMaxYearlyExpansionLimit:
             self.limitRenewableExpansion()
-            self.checkRenewableExpansionLimit()
 
-        # check data
-        for component_name, mdl in self.parent.esM.componentNames.items():
-            component = self.parent.esM.getComponent(component_name)
-            ub = component.capacityMax
-            lb = component.capacityMin
-            fix = component.capacityFix
-            if (ub is not None and fix is not None) or (lb is not None and fix is not None):
-                raise ValueError(
-                    f"Capacity Min and Capacity Fixis defined for {component.name}")
+        # update parameters and demands of all components at once, the
+        # capacity bounds are checked before
+        self.apply_parameter_updates()
+
+        if self.parent.considerMaxYearlyExpansionLimit:
+            self.checkRenewableExpansionLimit()
 
     def checkRenewableExpansionLimit(self):
         cap_fix = pd.Series()
@@ -263,23 +414,21 @@ class MyopicTrans():
                 cap_max[tech] = 0
                 cap_fix[tech] = 0
 
-                for comp in self.parent.esM.componentNames:
+                for comp in self.get_registry().get_renewables(
+                        tech, stock=False):
                     component = self.parent.esM.getComponent(comp)
-                    if self.parent.string_identifiers[tech] in component.name:
-                        if "stock" in component.name:
-                            continue
-                        # get shared expansion values
-                        shared_expansion_min[tech] = component.sharedCapacityExpansionMin
-                        shared_expansion_max[tech] = component.sharedCapacityExpansionMax
-
-                        if component.capacityMin is None:
-                            pass
-                        else:
-                            cap_min[tech] += component.capacityMin[self.parent.location]
-                        if component.capacityMax is None:
-                            cap_fix[tech] += component.capacityFix[self.parent.location]
-                        else:
-                            cap_max[tech] += component.capacityMax[self.parent.location]
+                    # get shared expansion values
+                    shared_expansion_min[tech] = component.sharedCapacityExpansionMin
+                    shared_expansion_max[tech] = component.sharedCapacityExpansionMax
+
+                    if component.capacityMin is None:
+                        pass
+                    else:
+                        cap_min[tech] += component.capacityMin[self.parent.location]
+                    if component.capacityMax is None:
+                        cap_fix[tech] += component.capacityFix[self.parent.location]
+                    else:
+                        cap_max[tech] += component.capacityMax[self.parent.location]
 
                 # check that limits are kept and will not to infeasible
                 # problems
@@ -302,28 +451,25 @@ class MyopicTrans():
     def limitRenewableExpansion(self):
         if self.parent.currentyear == self.parent.refyear:
             for tech in ["onshore", "offshore", "openfield_pv", "rooftop_pv"]:
-                tech_items = [
-                    x for x in self.parent.esM.componentNames if self.parent.string_identifiers[tech] in x and "_stock" not in x]
+                tech_items = self.get_registry().get_renewables(
+                    tech, stock=False)
                 for component in tech_items:
                     # update component
-                    self.parent.esM = update_parameter(
-                        self.parent.esM.getComponent(component),
-                        self.parent.esM,
+                    self.add_parameter_update(
+                        component,
                         {"sharedExpansionID": None,
                          "sharedCapacityExpansionMax": None,
-                         "sharedCapacityExpansionMin": None},
-                        system_with_ee_restriction=True)
+                         "sharedCapacityExpansionMin": None})
         else:
             print("WARNING: Shared Expansion Limitation for Renewable Energies will overrule the individual expansion limitation per region. CapacityFix, capacityMin and capacityMax is set to None.")
             if self.parent.targetyearoptimization:
                 expansion_interval = self.parent.targetyear-self.parent.refyear
                 # identify how much GW will be decomissioned, as this needs to be compensated
                 pathway_decommissioning = pd.Series()
-                temp_stock_decommission = pd.read_excel(
-                    os.path.join(self.parent.temppath, 'temp_stock_decommission.xlsx'), index_col=0)
+                temp_stock_decommission = self.stocks.decommission
                 for tech in ["onshore", "offshore", "openfield_pv", "rooftop_pv"]:
-                    tech_items = [
-                        x for x in self.parent.esM.componentNames if self.parent.string_identifiers[tech] in x and "_stock" not in x]
+                    tech_items = self.get_registry().get_renewables(
+                        tech, stock=False)
                     pathway_decommissioning[tech] =\
                         temp_stock_decommission[tech_items].sum().sum()
             else:
@@ -332,8 +478,8 @@ class MyopicTrans():
 
             # for every technology, limit all techs
             for tech in ["onshore", "offshore", "openfield_pv", "rooftop_pv"]:
-                tech_items = [
-                    x for x in self.parent.esM.componentNames if self.parent.string_identifiers[tech] in x and "_stock" not in x]
+                tech_items = self.get_registry().get_renewables(
+                    tech, stock=False)
 
                 # get yearly limit
                 if tech == "onshore":
@@ -374,7 +520,7 @@ class MyopicTrans():
                             updated_parameter_dict["sharedCapacityExpansionMin"] = exp_min
                             updated_parameter_dict["capacityMin"] = 0
 
-                        if component+"_stock" in self.parent.esM.componentNames:
+                        if self.get_registry().has_stock(component):
                             updated_parameter_dict["capacityMax"] =  \
                                 self.raw_ub[component] - \
                                 self.parent.esM.getComponent(
@@ -408,10 +554,8 @@ class MyopicTrans():
                         if updated_parameter_dict["sharedExpansionMin"] > updated_parameter_dict["sharedExpansionMax"]:
                             raise ValueError(
                                 "sharedexpansionmin > sharedexpansionmax")
-                    self.parent.esM = update_parameter(
-                        self.parent.esM.getComponent(component),
-                        self.parent.esM, updated_parameter_dict,
-                        system_with_ee_restriction=True)
+                    self.add_parameter_update(
+                        component, updated_parameter_dict)
 
     def getOptimalCapacities(self):
         if self.parent.targetyearoptimization:
@@ -422,8 +566,7 @@ class MyopicTrans():
         self.resultCapacities[self.parent.currentyear] = pd.Series()
         for component_name in self.parent.esM.componentNames:
             component = self.parent.esM.getComponent(component_name)
-            mdl_result_dict = self.parent.esM.componentModelingDict[component.modelingClass.__name__].getOptimalValues(
-                name='capacityVariablesOptimum')['values']
+            mdl_result_dict = self.get_optimal_values(component)
             if component_name in mdl_result_dict.index:
                 self.resultCapacities[year][component_name] = mdl_result_dict.loc[component_name][0]
             elif component.capacityMax is None and component.capacityMin is None:
@@ -464,31 +607,29 @@ class MyopicTrans():
                     component.capacityMin[self.parent.location])
 
             if not self.parent.targetyearoptimization and (self.parent.refyear != self.parent.currentyear):
-                try:
-                    self.parent.esM.componentModelingDict[component.modelingClass.__name__].getOptimalValues(name='capacityVariablesOptimum')['values'].loc[component.name, 'GermanyRegion'] = _round(
-                        self.parent.esM.componentModelingDict[component.modelingClass.__name__].getOptimalValues(name='capacityVariablesOptimum')['values'].loc[component.name, 'GermanyRegion'])
-                except:
-                    # BEV int storage without result capacity in 2020
-                    pass
-
-    def initialize_temp_files(self):
+                result_df = self.get_optimal_values(component)
+                # BEV int storage without result capacity in 2020
+                if result_df is not None and \
+                        component.name in result_df.index and \
+                        'GermanyRegion' in result_df.columns:
+                    result_df.loc[component.name, 'GermanyRegion'] = _round(
+                        result_df.loc[component.name, 'GermanyRegion'])
+
+    def initialize_stock_ledger(self):
         # list of all stock nodes
         listNotStock = [x for x in self.parent.esM.componentNames.keys()
                         if "_stock" not in x]
 
-        # create temp_stock_decomission and compensation
+        # create ledger of commissioning, decommissioning, compensation and
+        # capacity
         years = range(self.parent.refyear, self.parent.targetyear + 1)
-        temp_stock_decommission = pd.DataFrame(
-            index=years, columns=listNotStock, data=0)
-        temp_stock_compensation = pd.DataFrame(
-            index=years, columns=listNotStock, data=0)
-        temp_stock_commission = pd.DataFrame(
-            index=years, columns=listNotStock, data=0)
         historical_interval = range(
             self.parent.refyear - self.parent.interval,
             self.parent.targetyear + 1)
-        temp_stock_capacity = pd.DataFrame(
-            index=historical_interval, columns=listNotStock, data=0)
+        self.stocks = StockLedger(years, historical_interval, listNotStock)
+        temp_stock_decommission = self.stocks.decommission
+        temp_stock_commission = self.stocks.commission
+        temp_stock_capacity = self.stocks.capacity
 
         for component in listNotStock:
             # 1. if there is forced decomissioning
@@ -527,21 +668,7 @@ class MyopicTrans():
                 temp_stock_decommission[component] = abs(
                     temp_stock_decommission[component])
 
-        # round the files
-        temp_stock_commission = _round(temp_stock_commission)
-        temp_stock_decommission = _round(temp_stock_decommission)
-        temp_stock_compensation = _round(temp_stock_compensation)
-        temp_stock_capacity = _round(temp_stock_capacity)
-
-        # save the temp files
-        temp_stock_commission.to_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_commission.xlsx'))
-        temp_stock_decommission.to_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_decommission.xlsx'))
-        temp_stock_compensation.to_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_compensation.xlsx'))
-        temp_stock_capacity.to_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_capacity.xlsx'))
+        self.stocks.round()
         return
 
     def createNewStockInNetwork(self):
@@ -571,174 +698,154 @@ class MyopicTrans():
                         pass  # not add new stock if stock comp exists
                     else:  # add new stock components
                         list_new_stock_components.append(i.name)
-                        # 1. Sources and Sinks
-                        if isinstance(i, fn.Source):
-                            self.parent.esM = addSource(
-                                self.parent.esM,
-                                sourceParameter={
-                                    "name": i.name+"_stock",
-                                    "commodity": i.commodity,
-                                    "hasCapacityVariable": i.hasCapacityVariable,
-                                    "operationRateMax": i.operationRateMax,
-                                    "operationRateFix": i.operationRateFix,
-                                    "capacityFix": i.capacityFix,
-                                    "capacityMax": i.capacityMax,
-                                    "capacityMin": i.capacityMin,
-                                    "investPerCapacity": i.investPerCapacity,
-                                    "opexPerCapacity": i.opexPerCapacity,
-                                    "opexPerOperation": i.opexPerOperation,
-                                    "commodityCost": i.commodityCost,
-                                    "commodityRevenue": i.commodityRevenue,
-                                    "interestRate": i.interestRate,
-                                    "economicLifetime": i.economicLifetime,
-                                    "technicalLifetime": i.technicalLifetime,
-                                    "sharedCapacityExpansionMin": None,
-                                    "sharedCapacityExpansionMax": None,
-                                    "sharedExpansionID": None,
-                                    "QPcostScale": None},
-                                system_with_ee_restriction=self.parent.considerMaxYearlyExpansionLimit)
-
-                        elif isinstance(i, fn.Sink):
-                            self.parent.esM = addSink(
-                                self.parent.esM,
-                                sinkParameter={
-                                    "name": i.name+"_stock",
-                                    "commodity": i.commodity,
-                                    "hasCapacityVariable": i.hasCapacityVariable,
-                                    "operationRateMax": i.operationRateMax,
-                                    "operationRateFix": i.operationRateFix,
-                                    "capacityFix": i.capacityFix,
-                                    "capacityMax": i.capacityMax,
-                                    "capacityMin": i.capacityMin,
-                                    "investPerCapacity": i.investPerCapacity,
-                                    "opexPerCapacity": i.opexPerCapacity,
-                                    "opexPerOperation": i.opexPerOperation,
-                                    "commodityCost": i.commodityCost,
-                                    "commodityRevenue": i.commodityRevenue,
-                                    "interestRate": i.interestRate,
-                                    "economicLifetime": i.economicLifetime,
-                                    "technicalLifetime": i.technicalLifetime,
-                                    "QPcostScale": None})
-                        # 2. Transformers
-                        elif isinstance(i, fn.Conversion):
-                            self.parent.esM = addConversion(
-                                esM=self.parent.esM,
-                                conversionParameter={
-                                    "name": i.name + '_stock',
-                                    "physicalUnit": i.physicalUnit,
-                                    "hasCapacityVariable": i.hasCapacityVariable,
-                                    "commodityConversionFactors": i.commodityConversionFactors,
-                                    "capacityMin": None,
-                                    "capacityMax": None,
-                                    "capacityFix": 0,
-                                    "operationRateFix": i.operationRateFix,
-                                    "opexPerOperation": i.opexPerOperation,
-                                    "opexPerCapacity": i.opexPerCapacity,
-                                    "investPerCapacity": i.investPerCapacity,
-                                    "technicalLifetime": i.technicalLifetime,
-                                    "economicLifetime": i.economicLifetime,
-                                    "interestRate": i.interestRate,
-                                    "QPcostScale": None})
-
-                        # 3. Storages
-                        elif isinstance(i, fn.Storage):
-                            self.parent.esM = addStorage(
-                                esM=self.parent.esM,
-                                storageParameter={
-                                    "name": i.name + '_stock',
-                                    "commodity": i.commodity,
-                                    "hasCapacityVariable": i.hasCapacityVariable,
-                                    "capacityMin": None,
-                                    "capacityMax": None,
-                                    "capacityFix": 0,
-                                    "investPerCapacity": i.investPerCapacity,
-                                    "opexPerCapacity": i.opexPerCapacity,
-                                    "opexPerChargeOperation": i.opexPerChargeOperation,
-                                    "technicalLifetime": i.technicalLifetime,
-                                    "economicLifetime": i.economicLifetime,
-                                    "interestRate": i.interestRate,
-                                    "chargeEfficiency": i.chargeEfficiency,
-                                    "dischargeEfficiency": i.dischargeEfficiency,
-                                    "selfDischarge": i.selfDischarge}
-                            )
-
-                        else:
-                            raise ValueError(
-                                "Unknown component type for "+i.name)
+                        self.add_stock(i)
         return
 
+    def add_stock(self, component):
+        """Add the stock component of a component to the network, see
+        createNewStockInNetwork."""
+        i = component
+        # 1. Sources and Sinks
+        if isinstance(i, fn.Source):
+            self.parent.esM = addSource(
+                self.parent.esM,
+                sourceParameter={
+                    "name": i.name+"_stock",
+                    "commodity": i.commodity,
+                    "hasCapacityVariable": i.hasCapacityVariable,
+                    "operationRateMax": i.operationRateMax,
+                    "operationRateFix": i.operationRateFix,
+                    "capacityFix": i.capacityFix,
+                    "capacityMax": i.capacityMax,
+                    "capacityMin": i.capacityMin,
+                    "investPerCapacity": i.investPerCapacity,
+                    "opexPerCapacity": i.opexPerCapacity,
+                    "opexPerOperation": i.opexPerOperation,
+                    "commodityCost": i.commodityCost,
+                    "commodityRevenue": i.commodityRevenue,
+                    "interestRate": i.interestRate,
+                    "economicLifetime": i.economicLifetime,
+                    "technicalLifetime": i.technicalLifetime,
+                    "sharedCapacityExpansionMin": None,
+                    "sharedCapacityExpansionMax": None,
+                    "sharedExpansionID": None,
+                    "QPcostScale": None},
+                system_with_ee_restriction=self.parent.considerMaxYearlyExpansionLimit)
+
+        elif isinstance(i, fn.Sink):
+            self.parent.esM = addSink(
+                self.parent.esM,
+                sinkParameter={
+                    "name": i.name+"_stock",
+                    "commodity": i.commodity,
+                    "hasCapacityVariable": i.hasCapacityVariable,
+                    "operationRateMax": i.operationRateMax,
+                    "operationRateFix": i.operationRateFix,
+                    "capacityFix": i.capacityFix,
+                    "capacityMax": i.capacityMax,
+                    "capacityMin": i.capacityMin,
+                    "investPerCapacity": i.investPerCapacity,
+                    "opexPerCapacity": i.opexPerCapacity,
+                    "opexPerOperation": i.opexPerOperation,
+                    "commodityCost": i.commodityCost,
+                    "commodityRevenue": i.commodityRevenue,
+                    "interestRate": i.interestRate,
+                    "economicLifetime": i.economicLifetime,
+                    "technicalLifetime": i.technicalLifetime,
+                    "QPcostScale": None})
+        # 2. Transformers
+        elif isinstance(i, fn.Conversion):
+            self.parent.esM = addConversion(
+                esM=self.parent.esM,
+                conversionParameter={
+                    "name": i.name + '_stock',
+                    "physicalUnit": i.physicalUnit,
+                    "hasCapacityVariable": i.hasCapacityVariable,
+                    "commodityConversionFactors": i.commodityConversionFactors,
+                    "capacityMin": None,
+                    "capacityMax": None,
+                    "capacityFix": 0,
+                    "operationRateFix": i.operationRateFix,
+                    "opexPerOperation": i.opexPerOperation,
+                    "opexPerCapacity": i.opexPerCapacity,
+                    "investPerCapacity": i.investPerCapacity,
+                    "technicalLifetime": i.technicalLifetime,
+                    "economicLifetime": i.economicLifetime,
+                    "interestRate": i.interestRate,
+                    "QPcostScale": None})
+
+        # 3. Storages
+        elif isinstance(i, fn.Storage):
+            self.parent.esM = addStorage(
+                esM=self.parent.esM,
+                storageParameter={
+                    "name": i.name + '_stock',
+                    "commodity": i.commodity,
+                    "hasCapacityVariable": i.hasCapacityVariable,
+                    "capacityMin": None,
+                    "capacityMax": None,
+                    "capacityFix": 0,
+                    "investPerCapacity": i.investPerCapacity,
+                    "opexPerCapacity": i.opexPerCapacity,
+                    "opexPerChargeOperation": i.opexPerChargeOperation,
+                    "technicalLifetime": i.technicalLifetime,
+                    "economicLifetime": i.economicLifetime,
+                    "interestRate": i.interestRate,
+                    "chargeEfficiency": i.chargeEfficiency,
+                    "dischargeEfficiency": i.dischargeEfficiency,
+                    "selfDischarge": i.selfDischarge}
+            )
+
+        else:
+            raise ValueError(
+                "Unknown component type for "+i.name)
+
     def calculateStockCapacities(self):
         """Calculate stocks for transformation path analysis."""
         # list of all stock nodes
         listStock = [x for x in self.parent.esM.componentNames
                      if "_stock" in x]
-        # 0. temp files for stock decomissioning and compensation
-        temp_stock_commission = pd.read_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_commission.xlsx'),
-            index_col=0)
-        temp_stock_decommission = pd.read_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_decommission.xlsx'),
-            index_col=0)
-        temp_stock_compensation = pd.read_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_compensation.xlsx'),
-            index_col=0)
-        temp_stock_capacity = pd.read_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_capacity.xlsx'),
-            index_col=0)
-
-        for stock_component_name in listStock:
-            not_stock_name = stock_component_name.replace("_stock", "")
-            # 1. add stock components to temp file if not existing yet
-            if not_stock_name not in temp_stock_decommission.columns:
-                temp_stock_decommission[not_stock_name] = 0
-            if not_stock_name not in temp_stock_compensation.columns:
-                temp_stock_compensation[not_stock_name] = 0
-            if not_stock_name not in temp_stock_commission:
-                temp_stock_commission[not_stock_name] = 0
-
-            # 2. Save result of previous year to stock and save previous
-            # capacity
-            stock_component = self.parent.esM.getComponent(
-                stock_component_name)
-            component = self.parent.esM.getComponent(not_stock_name)
-
-            # 2b) Save commissioning data to temp-files
-            if self.parent.currentyear == self.parent.refyear:
-                pass
-            elif self.parent.currentyear == self.parent.startyear:
-                pass
-            else:
-                result = self.resultCapacities[self.parent.currentyear][component.name]
-                # self.parent.esM.componentModelingDict[component.modelingClass.__name__].getOptimalValues(
-                #            name='capacityVariablesOptimum')['values'].loc[component.name, 'GermanyRegion']
-                temp_stock_commission.loc[
-                    self.parent.currentyear - self.parent.interval, not_stock_name] = \
-                    result
-                temp_stock_capacity.loc[
-                    (self.parent.currentyear - self.parent.interval):(self.parent.currentyear - self.parent.interval + component.technicalLifetime[0]-1),
-                    not_stock_name] += result
-
+        listNotStock = [x.replace("_stock", "") for x in listStock]
+        # 0. stock decomissioning and compensation
+        for not_stock_name in listNotStock:
+            # 1. add stock components to ledger if not existing yet
+            self.stocks.add_component(not_stock_name)
+        technical_lifetime = np.array([
+            self.parent.esM.getComponent(x).technicalLifetime[0]
+            for x in listNotStock], dtype=float)
+
+        # 2b) Save result of previous year to stock and save previous
+        # capacity
+        if self.parent.currentyear == self.parent.refyear:
+            pass
+        elif self.parent.currentyear == self.parent.startyear:
+            pass
+        else:
+            results = np.array([
+                self.resultCapacities[self.parent.currentyear][x]
+                for x in listNotStock], dtype=float)
+            self.stocks.add_capacity(
+                listNotStock, self.parent.currentyear - self.parent.interval,
+                technical_lifetime, results)
+
+        # bounds of all components, which are updated at once
+        bounds = {}
         # 2. Target Year or reference year
         if self.parent.targetyearoptimization or (self.parent.currentyear <= self.parent.startyear):
-            for stock_component_name in listStock:
+            for stock_component_name, not_stock_name in zip(
+                    listStock, listNotStock):
                 # 2.1 Historical Data
-                not_stock_name = stock_component_name.replace("_stock", "")
                 if not_stock_name in self.parent.historicalcapacity.columns:
-                    stock_component = self.parent.esM.getComponent(
-                        stock_component_name)
                     component = self.parent.esM.getComponent(not_stock_name)
 
                     # set stock lb and ub to remaining historical capacity
                     # in targetyear
                     historical_rest_capacity = self.parent.historicalcapacity.loc[
                         self.parent.currentyear, not_stock_name]
-                    self.parent.esM = update_parameter(
-                        component=stock_component,
-                        esM=self.parent.esM,
-                        updated_parameter_dict={
-                            "capacityMin": None,
-                            "capacityMax": None,
-                            "capacityFix": _round(float(historical_rest_capacity))})
+                    bounds[stock_component_name] = {
+                        "capacityMin": None,
+                        "capacityMax": None,
+                        "capacityFix": _round(float(historical_rest_capacity))}
                     if self.parent.targetyearoptimization:
                         if component.capacityMax is None:
                             _capacity = component.capacityFix[self.parent.location]
@@ -748,13 +855,10 @@ class MyopicTrans():
                         if component.name in self.parent.forceddecommissioning.columns:
                             forced_value = self.parent.forceddecommissioning.loc[
                                 self.parent.currentyear, component.name]
-                            self.parent.esM = update_parameter(
-                                component=component,
-                                esM=self.parent.esM,
-                                updated_parameter_dict={
-                                    "capacityMin": None,
-                                    "capacityMax": None,
-                                    "capacityFix": _round(float(forced_value))})
+                            bounds[component.name] = {
+                                "capacityMin": None,
+                                "capacityMax": None,
+                                "capacityFix": _round(float(forced_value))}
                         # 2. historical
                         elif _capacity < historical_rest_capacity:
                             raise ValueError(
@@ -767,33 +871,23 @@ class MyopicTrans():
                             new_capacitymax = self.raw_ub[component.name] - \
                                 historical_rest_capacity
                             if component.capacityMax is not None:
-                                self.parent.esM = update_parameter(
-                                    component=component,
-                                    esM=self.parent.esM,
-                                    updated_parameter_dict={
-                                        "capacityMax": new_capacitymax,
-                                        "capacityMin": component.capacityMin,
-                                        "capacityFix": component.capacityFix})
-                            else:
-                                self.parent.esM = update_parameter(
-                                    component=component,
-                                    esM=self.parent.esM,
-                                    updated_parameter_dict={
-                                        "capacityMin": None,
-                                        "capacityMax": None,
-                                        "capacityFix": new_capacitymax})
-                            # check
-                            component = self.parent.esM.getComponent(
-                                component.name)
-                            if component.capacityMax is not None:
-                                if component.capacityMax[self.parent.location] < component.capacityMin[self.parent.location]:
+                                # check
+                                if new_capacitymax < component.capacityMin[self.parent.location]:
                                     raise ValueError(
                                         "UB is greater than lb for " +
                                         "{}".format(component.name))
+                                bounds[component.name] = {
+                                    "capacityMax": new_capacitymax,
+                                    "capacityMin": component.capacityMin,
+                                    "capacityFix": component.capacityFix}
+                            else:
+                                bounds[component.name] = {
+                                    "capacityMin": None,
+                                    "capacityMax": None,
+                                    "capacityFix": new_capacitymax}
 
             if not self.parent.targetyearoptimization:  # refyear
                 for component_name in self.parent.esM.componentNames:
-                    component = self.parent.esM.getComponent(component_name)
                     if component_name in self.unrestricted_components:
                         continue
                     elif "Virt" in component_name:
@@ -801,80 +895,51 @@ class MyopicTrans():
                     elif "CO2Environment" in component_name:
                         continue
                     if "_stock" not in component_name:
-                        self.parent.esM = update_parameter(
-                            component=component,
-                            esM=self.parent.esM,
-                            updated_parameter_dict={
-                                "capacityMin": None,
-                                "capacityMax": None,
-                                "capacityFix": 0.0})
+                        bounds[component_name] = {
+                            "capacityMin": None,
+                            "capacityMax": None,
+                            "capacityFix": 0.0}
 
         # 3. Optimization Years
         else:
-            for stock_component_name in listStock:
-                component_name = stock_component_name.replace("_stock", "")
-                stock_component = self.parent.esM.getComponent(
-                    stock_component_name)
-                component = self.parent.esM.getComponent(component_name)
-
-                # 3.0 add capacity of component to lb and ub of stock-value
-                entire_capacity = temp_stock_capacity.loc[
-                    self.parent.currentyear, component_name]
-                self.parent.esM = update_parameter(
-                    component=stock_component,
-                    esM=self.parent.esM,
-                    updated_parameter_dict={
-                        "capacityMin": None,
-                        "capacityMax": None,
-                        "capacityFix": _round(entire_capacity)})
-                stock_component = self.parent.esM.getComponent(
-                    stock_component_name)
-                if stock_component.capacityFix[self.parent.location] < 0:
-                    raise ValueError(
-                        "Negative lower bound for stock " +
-                        "'{}': {}".format(
-                            stock_component.name, stock_component.capacityMin[self.parent.location]))
-
-                # 3.2 Compensating stock
-                decommission_year = int(self.parent.currentyear - self.parent.interval +
-                                        component.technicalLifetime[0])
-                if decommission_year <= self.parent.targetyear:
-                    # write capacity to decommission in temp
-                    result = self.resultCapacities[self.parent.currentyear][component.name]
-                    temp_stock_decommission.loc[decommission_year,
-                                                component.name] += result
-
-                # 4.4. Compensate future stock removal
-                # if decomissioning is happening during pathway
-                if decommission_year <= self.parent.targetyear:
-                    t = 0
-                    # iterate over previous interval from decommiss.year
-                    for year in np.linspace(
-                            self.parent.currentyear - self.parent.interval +
-                        component.technicalLifetime[0] - 1,
-                            self.parent.currentyear +
-                        component.technicalLifetime[0] -
-                            2 * self.parent.interval + 1,
-                            self.parent.interval - 1):
-                        year = int(year)
-                        t += 1
-                        # if there is temp_stock
-                        if temp_stock_compensation.loc[year, component.name] >= 0:
-                            if year == decommission_year - 1:
-                                temp_stock_compensation.loc[year, component.name] += (
-                                    (temp_stock_decommission.loc[year + 1, component.name]) / (component.technicalLifetime[0] - 2)) * 2
-                            # increase temp_stock from component for
-                            # previous interval of decommission year
-                            else:
-                                temp_stock_compensation.loc[year, component.name] += (
-                                    temp_stock_compensation.loc[year + 1, component.name] * (
-                                        (component.technicalLifetime[0] - 2 - t) / (component.technicalLifetime[0] - 2)))
-
-        # round the files and lb and ub
-        temp_stock_decommission = _round(temp_stock_decommission)
-        temp_stock_compensation = _round(temp_stock_compensation)
-        temp_stock_commission = _round(temp_stock_commission)
-        temp_stock_capacity = _round(temp_stock_capacity)
+            # 3.0 add capacity of component to lb and ub of stock-value
+            entire_capacity = np.round(self.stocks.capacity.loc[
+                self.parent.currentyear, listNotStock].values.astype(float), 4)
+            if (entire_capacity < 0).any():
+                i = np.argmax(entire_capacity < 0)
+                raise ValueError(
+                    "Negative lower bound for stock " +
+                    "'{}': {}".format(listStock[i], entire_capacity[i]))
+            for stock_component_name, capacity in zip(
+                    listStock, entire_capacity):
+                bounds[stock_component_name] = {
+                    "capacityMin": None,
+                    "capacityMax": None,
+                    "capacityFix": capacity}
+
+            # 3.2 Compensating stock
+            # 4.4. Compensate future stock removal
+            # if decomissioning is happening during pathway
+            decommission_years = (
+                self.parent.currentyear - self.parent.interval +
+                technical_lifetime).astype(int)
+            in_pathway = decommission_years <= self.parent.targetyear
+            if in_pathway.any():
+                results = np.array([
+                    self.resultCapacities[self.parent.currentyear][x]
+                    for x, y in zip(listNotStock, in_pathway) if y],
+                    dtype=float)
+                self.stocks.add_decommissioning(
+                    [x for x, y in zip(listNotStock, in_pathway) if y],
+                    decommission_years[in_pathway],
+                    technical_lifetime[in_pathway], results,
+                    self.parent.interval)
+
+        self.parent.esM = update_parameters(
+            self.parent.esM, bounds, self.parent.location, check_bounds=False)
+
+        # round the ledger and lb and ub
+        self.stocks.round()
         for component_name in self.parent.esM.componentNames:
             component = self.parent.esM.getComponent(component_name)
             if component.capacityMax is not None:
@@ -883,15 +948,11 @@ class MyopicTrans():
                 component.capacityMin[self.parent.location] = \
                     _round(component.capacityMin[self.parent.location])
 
-        # Export yearly temp files
-        temp_stock_decommission.to_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_decommission.xlsx'))
-        temp_stock_compensation.to_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_compensation.xlsx'))
-        temp_stock_commission.to_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_commission.xlsx'))
-        temp_stock_capacity.to_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_capacity.xlsx'))
+        # Export yearly snapshot of the ledger for debugging
+        if self.parent.scenario_definition.get("stock_snapshots", False):
+            self.stocks.snapshot(os.path.join(
+                self.parent.temppath,
+                "stock_ledger_{}.npz".format(self.parent.currentyear)))
 
         # Final check
         self.check_if_lb_greater_ub()
@@ -900,16 +961,11 @@ class MyopicTrans():
 
     def calculateNewTechs(self):
         """Calculate new technology parameter for transformation path"""
-        listAllNodes = [x for x in self.parent.esM.componentNames]
-        listStock = [x for x in self.parent.esM.componentNames
-                     if "_stock" in x]
+        registry = self.get_registry()
 
-        sCurve_lb = pd.read_excel(
-            os.path.join(self.parent.temppath, 'temp_scurve_lb.xlsx'), index_col=0)
-        sCurve_ub = pd.read_excel(
-            os.path.join(self.parent.temppath, 'temp_scurve_ub.xlsx'), index_col=0)
-        temp_stock_compensation = pd.read_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_compensation.xlsx'), index_col=0)
+        sCurve_lb = self.stocks.scurve_lb
+        sCurve_ub = self.stocks.scurve_ub
+        temp_stock_compensation = self.stocks.compensation
 
         ######################################################################
         def get_expansion_funnel_for_interval(self, component):
@@ -988,9 +1044,10 @@ class MyopicTrans():
             # 2.5% Sanierungsrate basierend auf 40 Jahren techn.
             # Lebensdauer
             refurbCorFactor = (self.parent.maxRefurbishmentRate)/100
+            info = registry[component.name]
 
-            if any(z in component.name for z in self.parent.string_identifiers["building_categories"]):
-                if any(zz in component.name for zz in self.parent.string_identifiers["building_exclusion_list"]):
+            if info.building_category is not None:
+                if info.building_excluded:
                     pass
                 elif self.parent.currentyear == self.parent.refyear:
                     pass
@@ -1011,8 +1068,7 @@ class MyopicTrans():
                     else:
                         # check which refurbishment package is used and get
                         # name of reference building in historical data
-                        temp_list = [
-                            component.name.replace(x, "") for x in self.parent.string_identifiers["refurbishmentpackages"] if component.name.endswith(x)]
+                        temp_list = info.refurbished_buildings
                         if len(temp_list) != 1:
                             raise ValueError(
                                 "Unclear mapping for component " +
@@ -1061,28 +1117,22 @@ class MyopicTrans():
 
         ######################################################################
         # 2. Write upper bound and lower bound of component for year
-        for component_name in self.parent.esM.componentNames:
+        for component_name in registry.not_stocks:
+            info = registry[component_name]
+            # 2a) Stock components are skipped
+            if info.is_helper:
+                continue
             component = self.parent.esM.getComponent(component_name)
             # stock capacity of year:
-            if component.name + "_stock" in listStock:
+            if info.stock is not None:
                 stock_capacity = self.parent.esM.getComponent(
-                    component.name + "_stock").capacityFix[self.parent.location]
+                    info.stock).capacityFix[self.parent.location]
             else:
                 stock_capacity = 0
-            # 2a) Stock components
-            if "_stock" in component.name:
-                continue
-
-            if "Virt" in component.name or "CO2Environment" in component.name:
-                continue
 
             # 2b) Unrestricted Components
-            if component.name in self.unrestricted_components:
-                if component.name + "_stock" in listAllNodes:
-                    stock_cap = self.parent.esM.getComponent(
-                        component.name + "_stock").capacityFix[self.parent.location]
-                else:
-                    stock_cap = 0
+            if info.unrestricted:
+                stock_cap = stock_capacity
 
                 if stock_cap < sCurve_lb.loc[
                         self.parent.currentyear, component.name]:
@@ -1093,21 +1143,17 @@ class MyopicTrans():
                 new_max_capacity = sCurve_ub.loc[
                     self.parent.currentyear, component.name] - stock_cap
                 if new_min_capacity == new_max_capacity:
-                    self.parent.esM = update_parameter(
-                        component=component,
-                        esM=self.parent.esM,
-                        updated_parameter_dict={
-                            "capacityMin": None,
-                            "capacityMax": None,
-                            "capacityFix": new_max_capacity})
+                    self.add_parameter_update(
+                        component.name,
+                        {"capacityMin": None,
+                         "capacityMax": None,
+                         "capacityFix": new_max_capacity})
                 else:
-                    self.parent.esM = update_parameter(
-                        component=component,
-                        esM=self.parent.esM,
-                        updated_parameter_dict={
-                            "capacityMin": new_min_capacity,
-                            "capacityMax": new_max_capacity,
-                            "capacityFix": None})
+                    self.add_parameter_update(
+                        component.name,
+                        {"capacityMin": new_min_capacity,
+                         "capacityMax": new_max_capacity,
+                         "capacityFix": None})
                 continue
 
             # 2c) Restricted components
@@ -1166,23 +1212,20 @@ class MyopicTrans():
                 self, component=component, expansion_max=expansion_max,
                 expansion_min=expansion_min)
 
-            # 2.c.4) set the ub and lb
+            # 2.c.4) set the ub and lb, applied with the other parameter
+            # updates of the year
             if expansion_min == expansion_max:
-                self.parent.esM = update_parameter(
-                    component=component,
-                    esM=self.parent.esM,
-                    updated_parameter_dict={
-                        "capacityMin": None,
-                        "capacityMax": None,
-                        "capacityFix": expansion_min})
+                self.add_parameter_update(
+                    component.name,
+                    {"capacityMin": None,
+                     "capacityMax": None,
+                     "capacityFix": expansion_min})
             else:
-                self.parent.esM = update_parameter(
-                    component=component,
-                    esM=self.parent.esM,
-                    updated_parameter_dict={
-                        "capacityMin": expansion_min,
-                        "capacityMax": expansion_max,
-                        "capacityFix": None})
+                self.add_parameter_update(
+                    component.name,
+                    {"capacityMin": expansion_min,
+                     "capacityMax": expansion_max,
+                     "capacityFix": None})
 
         #######################################################################
         # 3. Transport Correction for all years
@@ -1219,7 +1262,7 @@ class MyopicTrans():
 
         #######################################################################
         # 3. BEV storage capacities
-        if self.parent.string_identifiers["BatteryElectricCar"] in listAllNodes:
+        if self.parent.string_identifiers["BatteryElectricCar"] in registry:
             if self.parent.currentyear >= self.parent.startyear and self.parent.currentyear < self.parent.targetyear:
                 result = self.resultCapacities[self.parent.currentyear][
                     self.parent.string_identifiers["BatteryElectricCar"]]
@@ -1228,15 +1271,12 @@ class MyopicTrans():
                 if result > 0.1:
                     value = self.parent.esM.getComponent(self.parent.string_identifiers["BatteryElectricCar"]+"_stock").capacityFix[self.parent.location] * \
                         self.parent.BEVstoragefactor
-                    bev_component = self.parent.esM.getComponent(
-                        self.parent.string_identifiers["BatteryElectricCar_Storage"])
-                    self.parent.esM = update_parameter(
-                        component=bev_component,
-                        esM=self.parent.esM,
-                        updated_parameter_dict={
-                            "capacityMin": None,
-                            "capacityMax": None,
-                            "capacityFix": value})
+                    self.add_parameter_update(
+                        self.parent.string_identifiers[
+                            "BatteryElectricCar_Storage"],
+                        {"capacityMin": None,
+                         "capacityMax": None,
+                         "capacityFix": value})
 
         #######################################################################
         # 4. prevent numeric issues
@@ -1250,11 +1290,12 @@ class MyopicTrans():
             if component.name in sCurve_ub.columns:
                 sCurve_ub_value = sCurve_ub.loc[self.parent.currentyear,
                                                 component.name]
-                if component.capacityMax is None:
-                    ub = component.capacityFix[self.parent.location]
+                bounds = self.get_capacity_bounds(component)
+                if bounds["capacityMax"] is None:
+                    ub = bounds["capacityFix"]
                 else:
-                    ub = component.capacityMax[self.parent.location]
-                if component.name + "_stock" in listStock:
+                    ub = bounds["capacityMax"]
+                if registry.has_stock(component.name):
                     ub += self.parent.esM.getComponent(
                         component.name + "_stock").capacityFix[self.parent.location]
                 if _round(ub) > _round(sCurve_ub_value):
@@ -1262,7 +1303,14 @@ class MyopicTrans():
                         component.name, self.parent.currentyear, sCurve_ub_value, _round(ub)))
 
     def updateStockParameters(self):
-        # write parameters for stock components
+        """Write the parameters of the stock components.
+
+        In optimization years the CO2 factors and the capex are weighted by
+        the active capacity per commissioning year. The other conversion
+        factors (efficiencies) are not weighted on purpose: the
+        per-component implementation computed them but never applied them,
+        so they are not changed here.
+        """
         # for target year and reference year
         if self.parent.targetyearoptimization or (self.parent.currentyear < self.parent.startyear):
             for component_name in self.parent.esM.componentNames:
@@ -1272,200 +1320,198 @@ class MyopicTrans():
                                                      self.parent.refyear]
                     newOpexPerCapacity = newCapex * \
                         self.raw_opexFix[component.name]
-                    self.parent.esM = update_parameter(
-                        component,
-                        self.parent.esM,
+                    self.add_parameter_update(
+                        component.name,
                         {"investPerCapacity": newCapex,
                          "opexPerCapacity": newOpexPerCapacity})
 
         # for optimization years
         else:
-            temp_stock_capacity = pd.read_excel(
-                os.path.join(self.parent.temppath, 'temp_stock_capacity.xlsx'), index_col=0)
-            temp_stock_commission = pd.read_excel(
-                os.path.join(self.parent.temppath,  'temp_stock_commission.xlsx'), index_col=0)
             # filter for components which have a stock and are not a connector
             all_nodes = [x for x in self.parent.esM.componentNames]
             components_with_stocks_and_not_hubs = [
                 x for x in all_nodes if x + "_stock" in all_nodes and ("-Hub-"not in x)]
             if len(components_with_stocks_and_not_hubs) == 0:
                 raise ValueError("No stocks updated")
-            for component_name in components_with_stocks_and_not_hubs:
-                component = self.parent.esM.getComponent(component_name)
-                stock_component = self.parent.esM.getComponent(
-                    component_name + "_stock")
-                result = self.resultCapacities[self.parent.currentyear][component_name]
-                if result < 0.01:
-                    continue
-
-                # determine commissioning capacities per year
-                # check the last intervals and distribute the installed
-                # capacity
-                total_capacity = temp_stock_commission.loc[self.parent.currentyear - self.parent.interval, component_name] + temp_stock_capacity.loc[
-                    self.parent.currentyear - self.parent.interval, component_name]
-                # no updating if nothing is installed
-                if total_capacity == 0:
-                    continue
-
-                _rest_capacity = total_capacity
-                years = range(self.parent.currentyear,
-                              self.parent.refyear - 1, -self.parent.interval)
-                active_cap_per_comissioning_year = pd.Series(index=years)
-                for year in years:
-                    if _rest_capacity >= temp_stock_commission.loc[year, component_name]:
-                        active_cap_per_comissioning_year[year] = \
-                            temp_stock_commission.loc[year, component_name]
-                        _rest_capacity -= \
-                            temp_stock_commission.loc[year, component_name]
-                    else:
-                        active_cap_per_comissioning_year[
-                            year] = _rest_capacity
-                        break
-
-                if active_cap_per_comissioning_year[self.parent.currentyear] != 0:
-                    raise ValueError(
-                        "Calculation of active capacity per commissioning year is wrong")
-
-                relevant_years = active_cap_per_comissioning_year.index
-
+            installed_components = [
+                x for x in components_with_stocks_and_not_hubs
+                if self.resultCapacities[self.parent.currentyear][x] >= 0.01]
+
+            # determine commissioning capacities per year of all components,
+            # components without installed capacity are not updated
+            active_capacities = self.stocks.get_active_capacities(
+                installed_components, self.parent.currentyear,
+                self.parent.refyear, self.parent.interval)
+            if (active_capacities[self.parent.currentyear] != 0).any():
+                raise ValueError(
+                    "Calculation of active capacity per commissioning year is wrong")
+            components = {x: self.parent.esM.getComponent(x)
+                          for x in active_capacities.index}
+            total_active_capacity = np.nansum(active_capacities.values, axis=1)
+
+            # update co2 footprint -> currently only for transformers, as
+            # sources and sinks have constant emissions
+            emission_components = [
+                x for x in active_capacities.index
+                if isinstance(components[x], fn.Conversion)
+                and x not in self.parent.raw_heatpumps.index]
+            emissions = self.parent.emissions.loc[
+                emission_components, active_capacities.columns].values.astype(float)
+            new_stock_emissions = pd.Series(
+                np.nansum(active_capacities.loc[emission_components].values *
+                          emissions, axis=1) /
+                total_active_capacity[active_capacities.index.get_indexer(
+                    emission_components)],
+                index=emission_components)
+            new_stock_emissions = new_stock_emissions[
+                np.nansum(emissions, axis=1) > 0]
+
+            # update capex and costscale
+            capex_components = [
+                x for x in active_capacities.index
+                if isinstance(components[x], (fn.Conversion, fn.Source,
+                                              fn.Sink, fn.Storage))]
+            recalculated_capex = self.get_installed_capex(
+                active_capacities.loc[capex_components])
+
+            for component_name, component in components.items():
                 update_dict = {}
-                # update co2 footprint -> currently only for transformers, as
-                # sources and sinks have constant emissions
-                if isinstance(component, fn.Conversion) and component.name not in self.parent.raw_heatpumps.index:
-                    if self.parent.emissions.loc[component.name, relevant_years].sum() > 0:
-                        _commodity_conversion = component.commodityConversionFactors
-                        new_stock_emission = \
-                            (active_cap_per_comissioning_year[
-                                relevant_years] * self.parent.emissions.loc[component.name, relevant_years]).sum() / active_cap_per_comissioning_year.sum()
-                        if new_stock_emission != 0:
-                            _commodity_conversion.update(
-                                {"CO2Out": new_stock_emission})
-                        update_dict["commodityConversionFactors"] = _commodity_conversion
-
-                # update efficiency
-                if isinstance(component, fn.Conversion):
-                    _efficiency_of_years = pd.Series(index=relevant_years)
-                    _efficiency_dict = {}
-                    for commod in component.commodityConversionFactors:
-                        if commod == "CO2Out":
-                            _efficiency_dict["CO2Out"] = component.commodityConversionFactors["CO2Out"]
-                            continue
-                        for year in relevant_years:
-                            _efficiency_of_years[year] = self.parent.efficiency[component.name][year][commod]
-                        _efficiency =\
-                            ((_efficiency_of_years * active_cap_per_comissioning_year[relevant_years]).sum()) \
-                            / (active_cap_per_comissioning_year[relevant_years].sum())
-                        _efficiency_dict[commod] = _efficiency
-
-                # update capex and costscale
-                if isinstance(component, fn.Conversion) or isinstance(component, fn.Source) or isinstance(component, fn.Sink) or isinstance(component, fn.Storage):
-                    # filter for time-horizon of lifetime -> exclude components
-                    # between economic lifetime and technical lifetime
-                    _relevant_year_capex = \
-                        [x for x in relevant_years if
-                            ((self.parent.currentyear - x) <
-                             component.economicLifetime[self.parent.location])
-                            and (x < self.parent.currentyear)
-                            and (active_cap_per_comissioning_year[x] > 0)]
-                    _relevant_year_capex.sort()
-
-                    _cost_scale_corrected_total_capex = pd.Series(
-                        index=_relevant_year_capex)
-
-                    # per year
-                    for year in _relevant_year_capex:
-                        _capacity = active_cap_per_comissioning_year[year]
-
-                        # for reference year, take the capex of parameter file
-                        if year == self.parent.refyear:
-                            capex_installed = \
-                                self.parent.capex.loc[stock_component.name,
-                                                      self.parent.refyear]
-                        # for last year -
-                        # need to calculate average capex for installed capacity
-                        elif year == (self.parent.currentyear-self.parent.interval):
-                            raw_capex = self.parent.capex.loc[component.name, year]
-                            if self.parent.costscale.loc[component.name, year] != 0 and self.parent.qp is True:
-                                def interpolation(d, x):
-                                    return d[0][1] + (x - d[0][0]) * ((d[1][1] - d[0][1])/(d[1][0] - d[0][0]))
-
-                                # datapoints
-                                modelyear_ub = \
-                                    self.helper_capex_calculation[year].loc[
-                                        component.name, "modelyear_ub"]
-                                costscale = \
-                                    self.parent.costscale.loc[component.name, year]
-                                datapoints = [
-                                    [0, raw_capex*(1-costscale)],
-                                    [modelyear_ub, raw_capex*(1+costscale)]]
-
-                                # check if capex installed in range
-                                if _capacity < 0 or _capacity > modelyear_ub:
-                                    print("\nProblem with component")
-                                    print(component.name)
-                                    print(_capacity)
-                                    print(modelyear_ub)
-                                    raise ValueError(
-                                        "Installed capacity is higher than range.")
-
-                                # interpolate to max capex installed
-                                capex_installed_max = interpolation(
-                                    datapoints, _capacity)
-                                capex_installed_min = raw_capex*(1-costscale)
-                                capex_installed = capex_installed_min + \
-                                    (capex_installed_max-capex_installed_min)/2
-
-                                if _round(capex_installed) > _round(raw_capex) or _round(capex_installed_max) < 0:
-                                    raise ValueError(
-                                        "Calculated CAPEX for stock " +
-                                        f"'{component.name}' is wrong." +
-                                        f"Calculated value: {capex_installed}")
-
-                            else:
-                                capex_installed = raw_capex
-
-                            self.helper_capex_calculation[year].loc[
-                                component.name, "capex_av_installed"] = \
-                                capex_installed
-                        # for all years but last year (and refyear)
-                        # apply the calculated costscale corrected average capex
-                        else:
-                            if year == self.parent.refyear:
-                                capex_installed = \
-                                    self.parent.capex.loc[stock_component.name,
-                                                          self.parent.refyear]
-                            else:
-                                capex_installed = \
-                                    self.helper_capex_calculation[year].loc[
-                                        component.name, "capex_av_installed"]
-                        # get the total capex of the model year
-                        _cost_scale_corrected_total_capex[year] = \
-                            _capacity * capex_installed
-
-                    # get average capex over all model years
-                    _recalculated_capex = \
-                        _cost_scale_corrected_total_capex.sum() / \
-                        active_cap_per_comissioning_year.sum()
-
+                if component_name in new_stock_emissions.index:
+                    _commodity_conversion = component.commodityConversionFactors
+                    if new_stock_emissions[component_name] != 0:
+                        _commodity_conversion.update(
+                            {"CO2Out": new_stock_emissions[component_name]})
+                    update_dict["commodityConversionFactors"] = _commodity_conversion
+
+                if component_name in recalculated_capex.index:
+                    _recalculated_capex = recalculated_capex[component_name]
                     update_dict["investPerCapacity"] = _recalculated_capex
                     update_dict["opexPerCapacity"] =\
-                        _recalculated_capex*self.raw_opexFix[component.name]
+                        _recalculated_capex*self.raw_opexFix[component_name]
                     if not isinstance(component, fn.Storage):
                         if self.parent.qp:
                             update_dict["QPcostScale"] = 0
 
                 # stock fuel costs - no weighting but normal opex costs
-                if stock_component.name.replace("_stock", "") in self.parent.fuelprices.index:
+                if component_name in self.parent.fuelprices.index:
                     new_opex = self.parent.fuelprices.loc[
-                        stock_component.name.replace("_stock", ""),
-                        self.parent.currentyear]
+                        component_name, self.parent.currentyear]
                     update_dict["opexPerOperation"] = new_opex
 
                 if update_dict:
-                    self.parent.esM = update_parameter(
-                        component,
-                        self.parent.esM,
-                        update_dict)
+                    self.add_parameter_update(component_name, update_dict)
+
+    def get_installed_capex(self, active_capacities):
+        """Get the average capex of the installed stock capacities.
+
+        Only commissioning years within the economic lifetime are
+        considered. The capex of the capacity installed in the previous
+        model year is corrected by the cost scale and stored for the
+        following years.
+
+        Parameters
+        ----------
+        active_capacities : pd.DataFrame
+            active capacity of the components per commissioning year, see
+            StockLedger.get_active_capacities
+
+        Returns
+        -------
+        pd.Series
+            average capex per component
+        """
+        years = active_capacities.columns.values
+        capacities = active_capacities.values
+        economic_lifetime = np.array([
+            self.parent.esM.getComponent(x).economicLifetime[
+                self.parent.location] for x in active_capacities.index],
+            dtype=float)
+        # filter for time-horizon of lifetime -> exclude components
+        # between economic lifetime and technical lifetime
+        with np.errstate(invalid="ignore"):
+            relevant = \
+                ((self.parent.currentyear - years)[None, :] <
+                 economic_lifetime[:, None]) & \
+                (years < self.parent.currentyear)[None, :] & \
+                (capacities > 0)
+
+        capex_installed = np.zeros(capacities.shape)
+        for j, year in enumerate(years):
+            rows = relevant[:, j]
+            if not rows.any():
+                continue
+            names = active_capacities.index[rows]
+            # for reference year, take the capex of parameter file
+            if year == self.parent.refyear:
+                capex_installed[rows, j] = self.parent.capex.loc[
+                    [x + "_stock" for x in names], self.parent.refyear].values
+            # for last year -
+            # need to calculate average capex for installed capacity
+            elif year == (self.parent.currentyear-self.parent.interval):
+                capex_installed[rows, j] = self._get_average_capex(
+                    names, year, capacities[rows, j])
+            # for all years but last year (and refyear)
+            # apply the calculated costscale corrected average capex
+            else:
+                capex_installed[rows, j] = \
+                    self.helper_capex_calculation[year].loc[
+                        names, "capex_av_installed"].values
+
+        # get the total capex of the model years, summed up from the earliest
+        # commissioning year
+        total_capex = np.where(relevant, capacities * capex_installed, 0.0)
+        return pd.Series(
+            total_capex[:, ::-1].sum(axis=1) /
+            np.nansum(capacities, axis=1),
+            index=active_capacities.index)
+
+    def _get_average_capex(self, names, year, capacities):
+        raw_capex = self.parent.capex.loc[names, year].values.astype(float)
+        costscale = self.parent.costscale.loc[names, year].values.astype(float)
+        capex_installed = raw_capex.copy()
+        scaled = (costscale != 0) & self.parent.qp
+        if scaled.any():
+            # datapoints: 0 -> capex*(1-costscale), ub -> capex*(1+costscale)
+            modelyear_ub = self.helper_capex_calculation[year].loc[
+                names[scaled], "modelyear_ub"].values.astype(float)
+            _capacity = capacities[scaled]
+
+            # check if capex installed in range
+            out_of_range = (_capacity < 0) | (_capacity > modelyear_ub)
+            if out_of_range.any():
+                i = np.argmax(out_of_range)
+                print("\nProblem with component")
+                print(names[scaled][i])
+                print(_capacity[i])
+                print(modelyear_ub[i])
+                raise ValueError(
+                    "Installed capacity is higher than range.")
+
+            # interpolate to max capex installed
+            capex_installed_min = raw_capex[scaled]*(1-costscale[scaled])
+            capex_installed_max = capex_installed_min + _capacity * (
+                (raw_capex[scaled]*(1+costscale[scaled]) - capex_installed_min) /
+                modelyear_ub)
+            capex_installed[scaled] = capex_installed_min + \
+                (capex_installed_max-capex_installed_min)/2
+
+            wrong = (np.round(capex_installed[scaled], 4) >
+                     np.round(raw_capex[scaled], 4)) | \
+                (np.round(capex_installed_max, 4) < 0)
+            if wrong.any():
+                i = np.argmax(wrong)
+                raise ValueError(
+                    "Calculated CAPEX for stock " +
+                    f"'{names[scaled][i]}' is wrong." +
+                    f"Calculated value: {capex_installed[scaled][i]}")
+
+        helper = self.helper_capex_calculation[year]
+        missing = [x for x in names if x not in helper.index]
+        if missing:
+            helper = helper.reindex(helper.index.append(pd.Index(missing)))
+            self.helper_capex_calculation[year] = helper
+        helper.loc[names, "capex_av_installed"] = capex_installed
+        return capex_installed
 
     def updateTechnologyParameters(self):
         self.helper_capex_calculation[self.parent.currentyear] = pd.DataFrame()
@@ -1479,12 +1525,14 @@ class MyopicTrans():
                 continue
             if "Virt" in component_name or "CO2Environment" in component_name:
                 continue
-            if i.capacityMax is not None:
+            # bounds of the year, which are applied with the costs
+            bounds = self.get_capacity_bounds(i)
+            if bounds["capacityMax"] is not None:
                 self.helper_capex_calculation[self.parent.currentyear].loc[
-                    i.name, "modelyear_ub"] = i.capacityMax[self.parent.location]
+                    i.name, "modelyear_ub"] = bounds["capacityMax"]
             else:
                 self.helper_capex_calculation[self.parent.currentyear].loc[
-                    i.name, "modelyear_ub"] = i.capacityFix[self.parent.location]
+                    i.name, "modelyear_ub"] = bounds["capacityFix"]
             # write new parameters depending on type of component
             if isinstance(i, fn.Source) or isinstance(i, fn.Sink):
                 update_dict = {}
@@ -1507,8 +1555,7 @@ class MyopicTrans():
                     update_dict["opexPerOperation"] = \
                         self.parent.fuelprices.loc[i.name,
                                                    self.parent.currentyear]
-                self.parent.esM = update_parameter(
-                    i, self.parent.esM, update_dict)
+                self.add_parameter_update(i.name, update_dict)
 
             elif isinstance(i, fn.Conversion):
                 new_capex = \
@@ -1535,15 +1582,15 @@ class MyopicTrans():
                         new_commodity_conversion.update(
                             {"CO2Out": new_emissions})
                 if i.name not in self.parent.raw_heatpumps.index:
-                    self.parent.esM = update_parameter(
-                        i, self.parent.esM,
+                    self.add_parameter_update(
+                        i.name,
                         {"investPerCapacity": new_capex,
                          "opexPerCapacity": new_opexPerCapacity,
                          "QPcostScale": new_costscale,
                          "commodityConversionFactors": new_commodity_conversion})
                 else:
-                    self.parent.esM = update_parameter(
-                        i, self.parent.esM,
+                    self.add_parameter_update(
+                        i.name,
                         {"investPerCapacity": new_capex,
                          "opexPerCapacity": new_opexPerCapacity,
                          "QPcostScale": new_costscale})
@@ -1553,8 +1600,8 @@ class MyopicTrans():
                 new_opexPerCapacity = self.raw_opexFix[i.name]*new_capex
                 # new_costscale = \
                 #     self.parent.costscale.loc[i.name, self.parent.currentyear]
-                self.parent.esM = update_parameter(
-                    i, self.parent.esM,
+                self.add_parameter_update(
+                    i.name,
                     {"investPerCapacity": new_capex,
                      "opexPerCapacity": new_opexPerCapacity,
                      # "QPcostScale": new_costscale
@@ -1572,10 +1619,8 @@ class MyopicTrans():
                     if demand_sink.name == self.parent.string_identifiers["LightingN-AEDemand"]:
                         pass
                     else:
-                        self.parent.esM = update_parameter(
-                            component=demand_sink,
-                            esM=self.parent.esM,
-                            updated_parameter_dict={
+                        self.add_parameter_update(
+                            demand_sink.name, {
                                 "capacityMin": None,
                                 "capacityMax": None,
                                 "capacityFix": self.parent.demand.loc[
@@ -1586,10 +1631,8 @@ class MyopicTrans():
                         temp_dem = self.parent.demand.loc[
                             demand_sink.name, self.parent.currentyear] / 8.76
                         # 8.76 is due to hours
-                        self.parent.esM = update_parameter(
-                            component=demand_sink,
-                            esM=self.parent.esM,
-                            updated_parameter_dict={
+                        self.add_parameter_update(
+                            demand_sink.name, {
                                 "capacityMin": None,
                                 "capacityMax": None,
                                 "capacityFix": temp_dem})
@@ -1599,10 +1642,8 @@ class MyopicTrans():
                     if demand_sink.name in self.parent.demand.index:
                         temp_dem = self.parent.demand.loc[
                             demand_sink.name, self.parent.currentyear]
-                        self.parent.esM = update_parameter(
-                            component=demand_sink,
-                            esM=self.parent.esM,
-                            updated_parameter_dict={
+                        self.add_parameter_update(
+                            demand_sink.name, {
                                 "capacityMin": None,
                                 "capacityMax": None,
                                 "capacityFix": temp_dem})
@@ -1612,21 +1653,26 @@ class MyopicTrans():
         if not self.parent.targetyearoptimization:
             raise ValueError("Wrong year for initBackcasting")
         years = range(self.parent.refyear, self.parent.targetyear + 1)
-        sCurve_lb = pd.DataFrame(index=years)
-        sCurve_ub = pd.DataFrame(index=years)
+        # columns of the sCurves (scalar, series or array), the frames are
+        # built at once
+        sCurve_lb = {}
+        sCurve_ub = {}
+        # restricted components with logistic lower bound:
+        # name -> (start capacity, end capacity)
+        logistic_components = {}
 
-        # node list
-        listNodes = [x for x in self.parent.esM.componentNames]
+        registry = self.get_registry()
 
         # define sCurves for all components
         for component_name in self.parent.esM.componentNames:
             component = self.parent.esM.getComponent(component_name)
+            info = registry[component_name]
             # for unrestricted components -> just ub and lb
-            if component.name in self.unrestricted_components:
+            if info.unrestricted:
                 # Special case for unrestricted components with historical data
-                if "_stock" in component.name:
+                if info.is_stock:
                     pass
-                elif component.name+"_stock" in listNodes:
+                elif info.stock is not None:
                     stock_component = self.parent.esM.getComponent(
                         component.name+"_stock")
                     sCurve_lb[component.name] = component.capacityMin[self.parent.location] + \
@@ -1652,13 +1698,13 @@ class MyopicTrans():
             # restricted componentscomponent
             else:
                 # pass for stock
-                if "_stock" in component.name or "CO2Environment" in component.name:
+                if info.is_stock or "CO2Environment" in component.name:
                     continue
                 # not stock components
                 ###############################################################
                 # 1. get entire installed capacity in target year: stock + new
                 # 1a) result of stock component in target year (if existing)
-                if component.name + '_stock' in listNodes:
+                if info.stock is not None:
                     stock_capacity = self.parent.esM.getComponent(
                         component.name + '_stock').capacityFix[self.parent.location]
                     if stock_capacity < 0.01:
@@ -1668,8 +1714,7 @@ class MyopicTrans():
 
                 # 1b) result of new installed component in target year
                 # Problem if capacityFix==0?
-                result_df = self.parent.esM.componentModelingDict[component.modelingClass.__name__].getOptimalValues(
-                    name='capacityVariablesOptimum')['values']
+                result_df = self.get_optimal_values(component)
                 if component.name in result_df.index:
                     result = result_df.loc[component.name,
                                            self.parent.location]
@@ -1687,7 +1732,8 @@ class MyopicTrans():
                 if component_capacity_targetyear < 0.01:
                     sCurve_lb[component.name] = 0
 
-                # 2.2) installed restricted components
+                # 2.2) installed restricted components, calculated for all
+                # components at once below
                 else:
                     # 2a) Get starting end and end capacity
                     # Start capacity
@@ -1698,54 +1744,9 @@ class MyopicTrans():
                         start_capacity = 0
                     # End capacity
                     end_capacity = component_capacity_targetyear
-
-                    # Set sCurve Start and end capacity
-                    sCurve_lb.loc[self.parent.refyear,
-                                  component.name] = start_capacity
-                    sCurve_lb.loc[self.parent.targetyear,
-                                  component.name] = end_capacity
-
-                    if start_capacity >= end_capacity:
-                        start_capacity = 0
-
-                    # sCurve parameters
-                    # param_A logistic function target: +-x%
-                    param_A = self.parent.sCurveParam[0]
-                    param_B = self.parent.sCurveParam[1]
-                    param_C = self.parent.sCurveParam[2] / \
-                        (end_capacity - start_capacity)
-                    shift = 0
-
-                    for year in range(self.parent.refyear + 1, self.parent.targetyear):
-                        # calculation of lb scurve function
-                        sCurve_lb.loc[year, component.name] = ((param_A * (end_capacity - start_capacity)) /
-                                                               (1 + param_A * param_C * (end_capacity - start_capacity) * np.exp(-param_B * (year - self.parent.refyear)))) + start_capacity
-
-                        # special treatment for buildings
-                        # TODO Masterthesis later
-                        if any(k in component.name for k in self.parent.string_identifiers["building_categories"]):
-                            if not self.parent.string_identifiers["building_filter_for_helper_components"] in component.name:
-                                # linear
-                                # sCurve_lb.loc[year, component.name] = (end_capacity-start_capacity)*(year-self.parent.refyear)/(self.parent.targetyear-self.parent.refyear)+start_capacity
-                                # min. lb
-                                sCurve_lb.loc[year, component.name] = self.parent.buildingdata.loc[component.name, 'Netto-Sanierungsquote'] * \
-                                    (year - self.parent.refyear)
-                                if (sCurve_lb.loc[year, component.name] > end_capacity) and (self.parent.string_identifiers["Sanierungspaket1"] in component.name):
-                                    sCurve_lb[component.name][
-                                        self.parent.targetyear] = 0
-                                    sCurve_lb.loc[year, component.name] = 0
-
-                            # if the yearly value exceeds the end capacity,
-                            # shift the scurve by one year
-                            if sCurve_lb.loc[year, component.name] > end_capacity:
-                                shift += 1
-
-                    # if lower bounds of s-curve exceed end capacity,
-                    # shift the lower scurve towards the end
-                    if shift > 0:
-                        sCurve_lb.loc[self.parent.refyear + shift +
-                                      1:, component.name] = sCurve_lb.loc[self.parent.refyear + 1:-shift, component.name]
-                        sCurve_lb.loc[:shift, component.name] = start_capacity
+                    logistic_components[component.name] = (
+                        start_capacity, end_capacity)
+                    sCurve_lb[component.name] = None
 
                 ##############################################################
                 # 3. Definition of sCurve Upper bound
@@ -1753,26 +1754,50 @@ class MyopicTrans():
                 if component.name in self.parent.historicalcapacity.columns:
                     # historical capacity higher than ub -> correct years
                     if self.parent.historicalcapacity.loc[self.parent.refyear, component.name] > self.raw_ub[component.name]:
-                        for year in sCurve_ub.index:
-                            if self.parent.historicalcapacity.loc[year, component.name] > self.raw_ub[component.name]:
-                                sCurve_ub.loc[year, component.name] = self.parent.historicalcapacity.loc[
-                                    year, component.name]
-                            else:
-                                sCurve_ub.loc[year, component.name] = self.raw_ub[
-                                    component.name]
+                        historical_capacity = self.parent.historicalcapacity.loc[
+                            list(years), component.name].values
+                        sCurve_ub[component.name] = np.where(
+                            historical_capacity > self.raw_ub[component.name],
+                            historical_capacity, self.raw_ub[component.name])
                     else:
                         sCurve_ub[component.name] = self.raw_ub[
                             component.name]
                 # 3b) rest
-                elif "Virt" in component.name:
+                elif info.is_helper:
                     pass
                 else:
                     sCurve_ub[component.name] = self.raw_ub.loc[component.name]
 
+        # 2.2) lower bounds of installed restricted components
+        shifts = {}
+        if logistic_components:
+            names = list(logistic_components)
+            start_capacity, end_capacity = np.array(
+                list(logistic_components.values()), dtype=float).T
+            values, shift = self._get_lower_scurves(
+                names, start_capacity, end_capacity, years)
+            for i, name in enumerate(names):
+                sCurve_lb[name] = values[:, i]
+                if shift[i] > 0:
+                    shifts[name] = int(shift[i])
+        sCurve_lb = pd.DataFrame(sCurve_lb, index=years)
+        sCurve_ub = pd.DataFrame(sCurve_ub, index=years)
+
+        # if lower bounds of s-curves exceed end capacity,
+        # shift the lower scurve towards the end
+        for name, shift in shifts.items():
+            start_capacity, end_capacity = logistic_components[name]
+            if start_capacity >= end_capacity:
+                start_capacity = 0
+            sCurve_lb.loc[self.parent.refyear + shift +
+                          1:, name] = sCurve_lb.loc[self.parent.refyear + 1:-shift, name]
+            sCurve_lb.loc[:shift, name] = start_capacity
+
         ######################################################################
         # no forced expansion of "inefficient" reference buildings
         for nn in sCurve_lb.columns:
-            if any(h in nn for h in self.parent.string_identifiers["building_categories"]) and not any(hh in nn for hh in self.parent.string_identifiers["building_standards"]):
+            if registry[nn].building_category is not None and \
+                    not registry[nn].building_standard:
                 sCurve_lb[nn] = 0
 
         ######################################################################
@@ -1782,14 +1807,9 @@ class MyopicTrans():
             self.ee_result_targetyear = pd.Series()
             for tech in ["onshore", "offshore", "rooftop_pv", "openfield_pv"]:
                 self.ee_result_targetyear[tech] = 0
-                tech_items = [
-                    x for x in self.parent.esM.componentNames if self.parent.string_identifiers[tech] in x]
-                for tech_item in tech_items:
+                for tech_item in registry.get_renewables(tech):
                     component = self.parent.esM.getComponent(tech_item)
-                    result_df = \
-                        self.parent.esM.componentModelingDict[
-                            component.modelingClass.__name__].getOptimalValues(
-                            name='capacityVariablesOptimum')['values']
+                    result_df = self.get_optimal_values(component)
                     if component.name in result_df.index:
                         result = result_df.loc[component.name,
                                                self.parent.location]
@@ -1821,10 +1841,10 @@ class MyopicTrans():
             # raise ValueError("sCurve_ub contains None-values. Columns: " +
             #                  "{}".format(sCurve_ub.columns[sCurve_ub.isna().any()].tolist()))
 
-        for component_name in self.parent.esM.componentNames:
-            component = self.parent.esM.getComponent(component_name)
-            if "_stock" in component.name or "Virt" in component.name or "CO2Environment" in component.name:
+        for component_name in registry.not_stocks:
+            if registry[component_name].is_helper:
                 continue
+            component = self.parent.esM.getComponent(component_name)
 
             # check minimum value in sCurve_lb
             if sCurve_lb[component.name].min() < 0:
@@ -1871,39 +1891,83 @@ class MyopicTrans():
             # raise warning if scurve lb exceeds raw_ub -> for forced
             # components this happens in first model years and is ok
             if component.name in self.raw_ub:
-                error_raw_ub = False
-                for year in sCurve_ub.index:
-                    if sCurve_lb.loc[year, component.name] > self.raw_ub.loc[component.name]:
-                        error_raw_ub = True
-                if error_raw_ub == True:
+                if (sCurve_lb[component.name] > self.raw_ub.loc[component.name]).any():
                     print(sCurve_lb[component.name])
                     raise ValueError("Component '{}': sCurve_lb exceeds ub ({}) in year {}".format(
-                        component.name, self.raw_ub.loc[component.name], year))
+                        component.name, self.raw_ub.loc[component.name],
+                        sCurve_ub.index[-1]))
 
             # check that ub is higher than lb
             if component.name in sCurve_ub.columns and component.name in sCurve_lb.columns:
-                error = False
-                for year in sCurve_ub.index:
-                    if sCurve_ub.loc[year, component.name] < sCurve_lb.loc[year, component.name]:
-                        error = True
-                        print(
-                            "\nProblem with setting up sCurve of " +
-                            "'{}' in year '{}'".format(component.name, year))
-                        print("sCurve ub: {}".format(
-                            sCurve_ub.loc[year, component.name]))
-                        print("sCurve lb: {}".format(
-                            sCurve_lb.loc[year, component.name]))
+                exceeded = sCurve_ub[component.name] < sCurve_lb[component.name]
+                error = bool(exceeded.any())
+                for year in sCurve_ub.index[exceeded.values]:
+                    print(
+                        "\nProblem with setting up sCurve of " +
+                        "'{}' in year '{}'".format(component.name, year))
+                    print("sCurve ub: {}".format(
+                        sCurve_ub.loc[year, component.name]))
+                    print("sCurve lb: {}".format(
+                        sCurve_lb.loc[year, component.name]))
             if error is True:
                 raise ValueError(
                     "sCurve_lb exceeds sCurve_ub for component '{}'".format(component.name))
 
-        # export temp files
-        sCurve_lb.to_excel(os.path.join(
-            self.parent.temppath, 'temp_scurve_lb.xlsx'))
-        sCurve_ub.to_excel(os.path.join(
-            self.parent.temppath, 'temp_scurve_ub.xlsx'))
+        # keep the s-curves for the model years
+        self.stocks.scurve_lb = sCurve_lb.astype(float)
+        self.stocks.scurve_ub = sCurve_ub.astype(float)
         return
 
+    def _get_lower_scurves(self, names, start_capacity, end_capacity, years):
+        """Get the lower sCurves of installed restricted components.
+
+        Returns
+        -------
+        np.ndarray
+            sCurves, years x components
+        np.ndarray
+            number of years the sCurve exceeds the end capacity (buildings)
+        """
+        registry = self.get_registry()
+        inner_years = np.arange(self.parent.refyear + 1, self.parent.targetyear)
+        values = np.empty((len(years), len(names)))
+        # Set sCurve Start and end capacity
+        values[0] = start_capacity
+        values[-1] = end_capacity
+        start_capacity = np.where(
+            start_capacity >= end_capacity, 0, start_capacity)
+        lb = values[1:-1]
+        lb[:] = get_logistic_scurves(
+            start_capacity, end_capacity, inner_years - self.parent.refyear,
+            self.parent.sCurveParam)
+
+        # special treatment for buildings
+        # TODO Masterthesis later
+        building = np.array(
+            [registry[x].building_category is not None for x in names],
+            dtype=bool)
+        standard = building & ~np.array(
+            [bool(registry[x].building_helper) for x in names], dtype=bool)
+        if standard.any():
+            # linear
+            # min. lb
+            quote = self.parent.buildingdata.loc[
+                np.array(names)[standard], 'Netto-Sanierungsquote'].values
+            lb[:, standard] = quote[None, :].astype(float) * \
+                (inner_years - self.parent.refyear)[:, None]
+            exceeded = (lb > end_capacity[None, :]) & standard[None, :]
+            if exceeded.any():
+                exceeded &= np.array([
+                    self.parent.string_identifiers["Sanierungspaket1"] in x
+                    for x in names], dtype=bool)[None, :]
+                lb[exceeded] = 0
+                values[-1, exceeded.any(axis=0)] = 0
+
+        # if the yearly value exceeds the end capacity,
+        # shift the scurve by one year
+        shift = (lb > end_capacity[None, :]).sum(axis=0) * building
+        return values, shift
+
     def fixNumericalInstabilities(self):
         for component_name in self.parent.esM.componentNames:
             component = self.parent.esM.getComponent(component_name)
@@ -1913,27 +1977,29 @@ class MyopicTrans():
                     component.capacityMax[self.parent.location])
                 component.capacityMin[self.parent.location] = _round(
                     component.capacityMin[self.parent.location])
+            # collected bounds are rounded before they are applied
+            updates = self.parameter_updates.get(component_name, {})
+            for param in ["capacityMax", "capacityMin"]:
+                if updates.get(param) is not None:
+                    updates[param] = _round(updates[param])
 
             # 1. check negativitiy
-            if component.capacityMax is not None:
-                if component.capacityMax[self.parent.location] < 0:
+            bounds = self.get_capacity_bounds(component)
+            if bounds["capacityMax"] is not None:
+                if bounds["capacityMax"] < 0:
                     raise ValueError("Component '{}'. ".format(component.name) +
-                                     "with negative upper bound: {}".format(component.capacityMax[self.parent.location]))
-                if component.capacityMin[self.parent.location] < 0:
+                                     "with negative upper bound: {}".format(bounds["capacityMax"]))
+                if bounds["capacityMin"] < 0:
                     raise ValueError("Component '{}'. ".format(component.name) +
-                                     "with negative lower bound: {}".format(component.capacityMin[self.parent.location]))
-            if component.capacityFix is not None:
-                if component.capacityFix[self.parent.location] < 0:
+                                     "with negative lower bound: {}".format(bounds["capacityMin"]))
+            if bounds["capacityFix"] is not None:
+                if bounds["capacityFix"] < 0:
                     raise ValueError("Component '{}'. ".format(component.name) +
-                                     "with negative fix capacity: {}".format(component.capacityFix[self.parent.location]))
+                                     "with negative fix capacity: {}".format(bounds["capacityFix"]))
 
     def getSharedExpansionCapacityMinRenewables(self):
-        temp_stock_decommission = pd.read_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_decommission.xlsx'),
-            index_col=0)
-        temp_stock_capacity = pd.read_excel(
-            os.path.join(self.parent.temppath, 'temp_stock_capacity.xlsx'),
-            index_col=0)
+        temp_stock_decommission = self.stocks.decommission
+        temp_stock_capacity = self.stocks.capacity
 
         self.yearlyRenewableExpansionMin = pd.DataFrame(
             columns=["onshore", "offshore", "openfield_pv", "rooftop_pv"],
@@ -1942,10 +2008,8 @@ class MyopicTrans():
             columns=["onshore", "offshore", "openfield_pv", "rooftop_pv"])
 
         for tech in ["onshore", "offshore", "openfield_pv", "rooftop_pv"]:
-            tech_items = [
-                x for x in self.parent.esM.componentNames if self.parent.string_identifiers[tech] in x]
-            tech_items_not_stock = [
-                x for x in tech_items if "_stock" not in x]
+            tech_items_not_stock = self.get_registry().get_renewables(
+                tech, stock=False)
             tech_stock = temp_stock_capacity[tech_items_not_stock].sum(
                 axis=1)
             switch_year = None  # year from which on renewables needs to be installed with highest speed to ensure to keep expansion limitation and achieve GW in target yera
@@ -2014,10 +2078,10 @@ class MyopicTrans():
     def check_if_lb_greater_ub(self):
         for component_name in self.parent.esM.componentNames:
             component = self.parent.esM.getComponent(component_name)
-            if component.capacityMax is not None:
+            bounds = self.get_capacity_bounds(component)
+            if bounds["capacityMax"] is not None:
                 _check_if_lb_greater_ub(
-                    component.capacityMin[self.parent.location],
-                    component.capacityMax[self.parent.location],
+                    bounds["capacityMin"], bounds["capacityMax"],
                     component.name)
 
 
@@ -2029,6 +2093,33 @@ def _check_if_lb_greater_ub(lb, ub, name):
             "for component '{}'".format(name))
 
 
+def get_logistic_scurves(start_capacity, end_capacity, years, sCurveParam):
+    """Get the logistic sCurves from start to end capacity.
+
+    Parameters
+    ----------
+    start_capacity, end_capacity : np.ndarray
+        capacity per component
+    years : np.ndarray
+        years since the reference year
+    sCurveParam : list
+        parameters A, B and C of the logistic function
+
+    Returns
+    -------
+    np.ndarray
+        years x components
+    """
+    # param_A logistic function target: +-x%
+    param_A = sCurveParam[0]
+    param_B = sCurveParam[1]
+    param_C = sCurveParam[2] / (end_capacity - start_capacity)
+    years = np.asarray(years)[:, None]
+    return ((param_A * (end_capacity - start_capacity)) /
+            (1 + param_A * param_C * (end_capacity - start_capacity) *
+             np.exp(-param_B * years))) + start_capacity
+
+
 def _round(data):
     if data is not None:
         data = round(data, 4)
@@ -0,0 +1,308 @@
+import os
+import sys
+import glob
+import json
+import time
+import datetime
+import itertools
+import traceback
+import multiprocessing
+
+from nestor.nestor import Nestor
+
+SCENARIO_PATH = os.path.join(
+    os.path.dirname(__file__), "data", "scenario_definition")
+RESULT_PATH = os.path.join(os.path.dirname(__file__), "data", "Results")
+# parameters of the scenario definition, which are not used to read and
+# process the input data and can be varied in a sweep
+SWEEP_PARAMETERS = [
+    "WACC", "sCurveParam", "maxYearlyExpansionGW_Onshore",
+    "maxYearlyExpansionGW_Offshore", "maxYearlyExpansionGW_OFPV",
+    "maxYearlyExpansionGW_RTPV", "maxRefurbRate", "GHGgoals_json", "QP"]
+# sweep parameters used to build the network of the target year, the network
+# of the base is only shared if none of them is varied
+NETWORK_PARAMETERS = ["WACC", "QP"]
+
+# preprocessed base scenario of a sweep, shared with the forked workers
+_sweep_base = None
+
+
+def get_scenario_names(patterns):
+    """Get the names of the scenario definitions matching the patterns.
+
+    Parameters
+    ----------
+    patterns : list of str
+        names or glob patterns of scenario jsons in
+        nestor/data/scenario_definition, e.g. 'newTHG0*'
+    """
+    names = []
+    for pattern in patterns:
+        if pattern.endswith(".json"):
+            pattern = pattern[:-len(".json")]
+        paths = sorted(glob.glob(os.path.join(SCENARIO_PATH, pattern + ".json")))
+        if len(paths) == 0:
+            raise ValueError(
+                "No scenario definition found for '{}'".format(pattern))
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            if name not in names:
+                names.append(name)
+    return names
+
+
+def get_available_cores():
+    """Get the number of cores allocated to the job."""
+    if "SLURM_CPUS_PER_TASK" in os.environ:
+        return int(os.environ["SLURM_CPUS_PER_TASK"])
+    return os.cpu_count()
+
+
+def run_scenario(json_name, threads=None, log_folder=None):
+    """Run one scenario and return its status.
+
+    The output of the run is written to a log file in log_folder, which is
+    copied to the result folder at the end of the run.
+
+    Returns
+    -------
+    dict
+        scenario, status ('finished' or 'failed'), result folder, log
+        file, runtime in seconds and error message
+    """
+    return _run_logged(
+        json_name, lambda: Nestor(json_name, threads=threads), log_folder)
+
+
+def run_variant(scenariopath, threads=None, log_folder=None):
+    """Run a variant of the preprocessed base scenario of the sweep.
+
+    Returns
+    -------
+    dict
+        status of the run, see run_scenario
+    """
+    def _run():
+        _sweep_base.threads = threads
+        _sweep_base.run_variant(scenariopath)
+        return _sweep_base
+
+    return _run_logged(os.path.splitext(os.path.basename(scenariopath))[0],
+                       _run, log_folder)
+
+
+def _run_logged(name, run, log_folder):
+    status = {"scenario": name, "status": "failed",
+              "resultfolder": None, "log": None, "runtime": None,
+              "error": None}
+    start = time.time()
+    stdout, stderr = sys.stdout, sys.stderr
+    log = None
+    try:
+        if log_folder is not None:
+            status["log"] = os.path.join(log_folder, name + ".log")
+            log = open(status["log"], "w")
+            sys.stdout = sys.stderr = log
+            # the log file is copied to the result folder by the run
+            sys.argv = [sys.argv[0], name, status["log"]]
+        model = run()
+        status["resultfolder"] = model.resultfolderpath
+        status["status"] = "finished"
+    except Exception as e:
+        traceback.print_exc()
+        status["error"] = "{}: {}".format(type(e).__name__, e)
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+        if log is not None:
+            log.close()
+    status["runtime"] = round(time.time() - start, 1)
+    return status
+
+
+def _run_scenario(args):
+    return run_scenario(*args)
+
+
+def _run_variant(args):
+    return run_variant(*args)
+
+
+def run_batch(json_names, workers=None, threads=None):
+    """Run several scenarios in parallel in a process pool.
+
+    Every scenario runs in its own process with its own result folder. The
+    modules are imported once in the main process.
+
+    Parameters
+    ----------
+    json_names : list of str
+        names of the scenario definitions
+    workers : int or None
+        number of parallel runs, by default one per scenario up to the
+        number of allocated cores
+    threads : int or None
+        solver threads per run, by default the allocated cores are shared
+        by the runs
+
+    Returns
+    -------
+    list of dict
+        status of every run, see run_scenario
+    """
+    log_folder = _create_report_folder()
+    results = _run_pool(_run_scenario, json_names, workers, threads,
+                        log_folder)
+    write_status_report(results, os.path.join(log_folder, "report.json"))
+    return results
+
+
+def get_sweep_variants(scenario_definition, grid):
+    """Get the scenario definitions of all combinations of the grid.
+
+    Parameters
+    ----------
+    scenario_definition : dict
+        scenario definition of the base scenario
+    grid : dict
+        parameter -> list of values, only SWEEP_PARAMETERS
+
+    Returns
+    -------
+    list of dict
+        scenario definitions of the variants
+    """
+    unknown = [x for x in grid if x not in SWEEP_PARAMETERS]
+    if unknown:
+        raise ValueError(
+            "Parameters {} can not be varied in a sweep, ".format(unknown) +
+            "only {}".format(SWEEP_PARAMETERS))
+    parameters = list(grid)
+    variants = []
+    for i, values in enumerate(itertools.product(
+            *[grid[x] for x in parameters])):
+        variant = json.loads(json.dumps(scenario_definition))
+        variant.update(dict(zip(parameters, values)))
+        variant["Run"] = "{}_variant{:03d}".format(
+            scenario_definition["Run"], i + 1)
+        variants.append(variant)
+    return variants
+
+
+def run_sweep(json_name, grid, workers=None, threads=None):
+    """Run a base scenario for all combinations of a parameter grid.
+
+    The input data is read, checked and processed once for the base
+    scenario. If the grid varies no NETWORK_PARAMETERS, the network of the
+    target year is built once for the base as well. The variants are forked
+    from this process and only create their result folder, the network if
+    it is not shared, and the optimization.
+
+    Parameters
+    ----------
+    json_name : str
+        name of the scenario definition of the base scenario
+    grid : dict
+        parameter -> list of values, see get_sweep_variants
+    workers, threads : int or None
+        see run_batch
+
+    Returns
+    -------
+    list of dict
+        status of every variant, see run_scenario
+    """
+    global _sweep_base
+
+    log_folder = _create_report_folder()
+    with open(os.path.join(SCENARIO_PATH, json_name + ".json")) as f:
+        variants = get_sweep_variants(json.load(f), grid)
+    scenariopaths = []
+    for i, variant in enumerate(variants):
+        scenariopaths.append(os.path.join(
+            log_folder, "{}_variant{:03d}.json".format(json_name, i + 1)))
+        with open(scenariopaths[-1], "w") as f:
+            json.dump(variant, f, indent=4)
+
+    print("Preprocessing base scenario '{}'...".format(json_name),
+          flush=True)
+    # the base gets no result folder, its inputs are written to the report
+    # folder and the variants only copy their scenario definition
+    _sweep_base = Nestor(json_name, run=False,
+                         input_folder=os.path.join(log_folder, "input"))
+    try:
+        # the archive thread has to finish before the workers are forked
+        error = _sweep_base.wait_for_archive()
+        if error is not None:
+            raise error
+        if not any(x in NETWORK_PARAMETERS for x in grid):
+            print("Building network of base scenario...", flush=True)
+            _sweep_base.build_network()
+        results = _run_pool(_run_variant, scenariopaths, workers, threads,
+                            log_folder)
+    finally:
+        _sweep_base.close_inputs()
+        _sweep_base = None
+
+    parameters = {
+        os.path.splitext(os.path.basename(path))[0]: {
+            x: variant[x] for x in grid}
+        for path, variant in zip(scenariopaths, variants)}
+    for status in results:
+        status["parameters"] = parameters[status["scenario"]]
+    write_status_report(results, os.path.join(log_folder, "report.json"))
+    return results
+
+
+def _create_report_folder():
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H_%M_%S")
+    log_folder = os.path.join(RESULT_PATH, "batch_reports", now)
+    suffix = 1
+    while os.path.exists(log_folder):
+        suffix += 1
+        log_folder = os.path.join(
+            RESULT_PATH, "batch_reports", "{} ({})".format(now, suffix))
+    os.makedirs(log_folder)
+    return log_folder
+
+
+def _run_pool(function, names, workers, threads, log_folder):
+    cores = get_available_cores()
+    if workers is None:
+        workers = min(len(names), cores)
+    if threads is None:
+        threads = max(1, cores // workers)
+    print("Running {} scenarios with {} workers ".format(
+        len(names), workers) + "and {} solver threads each".format(
+        threads), flush=True)
+
+    results = []
+    # forked workers share the imported modules and the preprocessed data,
+    # a new process per run releases the memory of the finished model
+    context = multiprocessing.get_context("fork")
+    with context.Pool(workers, maxtasksperchild=1) as pool:
+        for status in pool.imap_unordered(
+                function, [(x, threads, log_folder) for x in names]):
+            print("{}: {} after {} s".format(
+                status["scenario"], status["status"], status["runtime"]),
+                flush=True)
+            results.append(status)
+    return results
+
+
+def write_status_report(results, path):
+    """Write the status of all runs of a batch to a json file and print a
+    summary."""
+    report = {
+        "finished": len([x for x in results if x["status"] == "finished"]),
+        "failed": len([x for x in results if x["status"] == "failed"]),
+        "runs": sorted(results, key=lambda x: x["scenario"])}
+    with open(path, "w") as f:
+        json.dump(report, f, indent=4)
+
+    print("\nBatch finished: {} finished, {} failed".format(
+        report["finished"], report["failed"]), flush=True)
+    for status in report["runs"]:
+        print("{:<40} {:<8} {:>10} s  {}".format(
+            status["scenario"], status["status"], status["runtime"],
+            status["resultfolder"] or status["error"]), flush=True)
+    print("Report written to {}".format(path), flush=True)
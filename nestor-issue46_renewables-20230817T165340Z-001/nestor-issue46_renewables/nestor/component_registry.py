@@ -0,0 +1,105 @@
+RENEWABLE_TECHS = ["onshore", "offshore", "openfield_pv", "rooftop_pv"]
+
+
+class ComponentInfo():
+    """Classification of a component in the network by its name."""
+
+    def __init__(self, name, modeling_class, string_identifiers,
+                 unrestricted):
+        self.name = name
+        self.modeling_class = modeling_class
+        self.unrestricted = unrestricted
+        self.is_stock = "_stock" in name
+        # virtual CO2 components and the CO2 sink
+        self.is_helper = "Virt" in name or "CO2Environment" in name
+
+        # not stock partner of stock component and the other way round
+        self.stock = None
+        self.base = None
+
+        self.renewable_tech = None
+        for tech in RENEWABLE_TECHS:
+            if string_identifiers[tech] in name:
+                self.renewable_tech = tech
+                break
+
+        self.building_category = None
+        for category in string_identifiers["building_categories"]:
+            if category in name:
+                self.building_category = category
+                break
+        self.building_excluded = any(
+            x in name for x in string_identifiers["building_exclusion_list"])
+        self.building_helper = \
+            string_identifiers["building_filter_for_helper_components"] in name
+        self.building_standard = any(
+            x in name for x in string_identifiers["building_standards"])
+        # names of the reference buildings of refurbishment packages
+        self.refurbished_buildings = [
+            name.replace(x, "")
+            for x in string_identifiers["refurbishmentpackages"]
+            if name.endswith(x)]
+
+
+class ComponentRegistry():
+    """Lookup of the components in the network by type, stock, renewable
+    technology and building category.
+
+    Parameters
+    ----------
+    componentNames : dict
+        component name -> name of modeling class (esM.componentNames)
+    string_identifiers : dict
+        string identifiers of the scenario definition
+    unrestricted_components : list
+        names of unrestricted components
+    """
+
+    def __init__(self, componentNames, string_identifiers,
+                 unrestricted_components):
+        unrestricted = set(unrestricted_components)
+        self.components = {
+            name: ComponentInfo(name, modeling_class, string_identifiers,
+                                name in unrestricted)
+            for name, modeling_class in componentNames.items()}
+
+        for name, info in self.components.items():
+            if not info.is_stock and name + "_stock" in self.components:
+                info.stock = name + "_stock"
+                self.components[name + "_stock"].base = name
+
+        self.stocks = [x for x, info in self.components.items()
+                       if info.is_stock]
+        self.not_stocks = [x for x, info in self.components.items()
+                           if not info.is_stock]
+        self.renewables = {
+            tech: [x for x in self.components
+                   if string_identifiers[tech] in x]
+            for tech in RENEWABLE_TECHS}
+
+    def __len__(self):
+        return len(self.components)
+
+    def __contains__(self, name):
+        return name in self.components
+
+    def __getitem__(self, name):
+        return self.components[name]
+
+    def get_renewables(self, tech, stock=None):
+        """Get the components of a renewable technology.
+
+        Parameters
+        ----------
+        tech : str
+            'onshore', 'offshore', 'openfield_pv' or 'rooftop_pv'
+        stock : bool or None
+            only stock (True) or not stock (False) components, None for all
+        """
+        if stock is None:
+            return self.renewables[tech]
+        return [x for x in self.renewables[tech]
+                if self.components[x].is_stock == stock]
+
+    def has_stock(self, name):
+        return self.components[name].stock is not None
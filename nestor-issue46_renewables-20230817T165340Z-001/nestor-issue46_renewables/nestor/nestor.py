@@ -8,18 +8,41 @@ from nestor.utils.check_input import (check_input_data,
                                       check_scenario_definition,
                                       check_optimization_definition,
                                       check_renewable_input)
-from nestor.utils.data_handling import get_raw_input_data_paths, folder_creation
+from nestor.utils.data_handling import (get_raw_input_data_paths,
+                                        folder_creation, create_input_folder,
+                                        variant_folder_creation,
+                                        get_processed_input_paths)
+from nestor.utils.read_input import (read_parameter_file, read_input_table,
+                                     read_profiles, clear_registered_inputs)
+from nestor.utils.parameter_cube import (build_parameter_cube,
+                                         get_support_columns,
+                                         interpolate_years)
+from nestor.utils.profile_pool import ProfilePool
+from nestor.utils.heatpump_profiles import (HeatPumpProfiles,
+                                            get_heatpump_profiles)
+from nestor.utils.checkpoint import load_checkpoint
 from nestor.backcasting import MyopicTrans
-from nestor.backcasting import _round
 
 import warnings
 warnings.filterwarnings('ignore', module='FINE')
 
 
 class Nestor():
-    def __init__(self, json_name):
+    def __init__(self, json_name, threads=None, run=True, input_folder=None,
+                 resultfolder=None):
+        # number of solver threads, None for the default of FINE
+        self.threads = threads
+        # network built before the run, see build_network
+        self.prebuilt_network = False
+
         # Scenario and Run Definition
-        self.data_processing_and_checking(json_name)
+        if resultfolder is None:
+            # the base scenario of a sweep only gets an input folder and no
+            # result folder, see run_variant
+            self.data_processing_and_checking(json_name, input_folder)
+        else:
+            # continue a run on its processed input data, see resume
+            self.read_result_folder(json_name, resultfolder, input_folder)
 
         # read in and process data
         self.read_data_parameterfile()
@@ -28,20 +51,205 @@ class Nestor():
         self.define_optimizaton_specs()
         self.get_component_parameters_over_transformationpathway()
 
-        # 1. Backcasting
-        if self.scenario_definition["transformation_path"] == "backcasting":
-            self.currentyear = self.targetyear
-            self.initalize_backcasting_network()
-            self.backcasting = MyopicTrans(self)
-            self.backcasting.transformation_pathway()
-        # 2. Perfect Foresight
+        if run:
+            self.run()
+
+    def run(self, state=None):
+        """Run the transformation pathway.
+
+        Parameters
+        ----------
+        state : dict or None
+            state of the pathway to continue from, see
+            MyopicTrans.get_state
+        """
+        try:
+            # 1. Backcasting
+            if self.scenario_definition["transformation_path"] == "backcasting":
+                self.currentyear = self.targetyear
+                if not self.prebuilt_network:
+                    self.initalize_backcasting_network()
+                # the network is changed by the run and only used once
+                self.prebuilt_network = False
+                self.backcasting = MyopicTrans(self)
+                if state is not None:
+                    self.backcasting.restore_state(state)
+                self.backcasting.transformation_pathway()
+            # 2. Perfect Foresight
+            else:
+                raise ValueError("Implement FINE PERFECT FORESIGHT")
+        finally:
+            archive_error = self.close_inputs()
+        if archive_error is not None:
+            raise archive_error
+
+    def build_network(self):
+        """Build the network of the target year before the run.
+
+        The network is used by the next run, e.g. by every variant of a
+        sweep forked after it was built (see run_variant).
+        """
+        self.currentyear = self.targetyear
+        self.initalize_backcasting_network()
+        self.prebuilt_network = True
+
+    def wait_for_archive(self):
+        """Wait until the processed input files are written.
+
+        Returns
+        -------
+        Exception or None
+            error of writing the processed input files
+        """
+        error = None
+        if self.archive is not None:
+            self.archive.join()
+            error = self.archive.error
+            self.archive = None
+        return error
+
+    def close_inputs(self):
+        """Wait for the processed input files and release the input data
+        held in memory.
+
+        Returns
+        -------
+        Exception or None
+            error of writing the processed input files
+        """
+        error = self.wait_for_archive()
+        clear_registered_inputs()
+        return error
+
+    def run_variant(self, scenariopath):
+        """Run a variant of the scenario with the data read and processed
+        for this scenario.
+
+        The variant gets its own result folder with a copy of its scenario
+        definition and uses the input data of this scenario. Only parameters
+        which are not used to read and process the data may differ (see
+        nestor.batch.SWEEP_PARAMETERS). A network built with build_network
+        is used if the variant does not change the parameters of the network
+        (see nestor.batch.NETWORK_PARAMETERS).
+
+        Parameters
+        ----------
+        scenariopath : str
+            path to the scenario definition json of the variant
+        """
+        local_mainpath, optParapath, GHGScenpath = \
+            self.read_scenario_definition(
+                os.path.splitext(os.path.basename(scenariopath))[0],
+                scenariopath)
+        paths = variant_folder_creation(
+            local_mainpath, self.scenario_definition, scenariopath,
+            GHGScenpath, optParapath)
+        self.resultfolderpath = paths["resfolderpath"]
+        self.temppath = paths["temppath"]
+        self.define_optimizaton_specs()
+        self.run()
+
+    def data_processing_and_checking(self, json_name, input_folder=None):
+        local_mainpath, optParapath, GHGScenpath = \
+            self.read_scenario_definition(json_name)
+        scenariopath = self.scenariopath
+
+        # Read and check input data and create scenario folder
+        raw_input_data_paths = get_raw_input_data_paths(
+            local_mainpath, self.scenario_definition)
+        check_input_data(self.opt_parameters, raw_input_data_paths,
+                         self.scenario_definition)
+        check_renewable_input(self.scenario_definition,
+                              raw_input_data_paths)
+        if input_folder is None:
+            paths = folder_creation(local_mainpath, raw_input_data_paths,
+                                    self.scenario_definition, scenariopath,
+                                    GHGScenpath,
+                                    optParapath)
         else:
-            raise ValueError("Implement FINE PERFECT FORESIGHT")
+            paths = create_input_folder(
+                local_mainpath, input_folder, raw_input_data_paths,
+                self.scenario_definition, scenariopath, GHGScenpath,
+                optParapath)
+            paths["resfolderpath"] = None
+            paths["temppath"] = None
+        self.resultfolderpath = paths["resfolderpath"]
+        # thread writing the processed input files, see close_inputs
+        self.archive = paths["archive"]
+        self.databasepath = paths["parameterfile"]
+        self.inputprofiledatapath = paths["input_profiles"]
+        self.outputprofiledatapath = paths["output_profiles"]
+        self.historicaldatapath = paths["historicaldata"]
+        self.forceddecommissioningdatapath = paths["forceddecommissioningdata"]
+        self.heatloaddatapath = paths["heatload"]
+        self.temppath = paths["temppath"]
+        self.evaluationtemplatepath = raw_input_data_paths["template_evaluation"]
+        check_input_data(
+            self.opt_parameters, paths, self.scenario_definition)
+
+    def read_result_folder(self, json_name, resultfolder, input_folder):
+        """Read the scenario definition of an existing run and the paths of
+        its processed input data.
 
-    def data_processing_and_checking(self, json_name):
+        Parameters
+        ----------
+        json_name : str
+            name of the scenario definition
+        resultfolder : str
+            result folder of the run
+        input_folder : str
+            folder with the processed input data of the run
+        """
+        local_mainpath, optParapath, GHGScenpath = \
+            self.read_scenario_definition(
+                json_name, definition_folder=os.path.join(
+                    resultfolder, "input", "scenario_definition"))
+        paths = get_processed_input_paths(
+            local_mainpath, input_folder, self.scenario_definition)
+        self.resultfolderpath = resultfolder
+        self.archive = None
+        self.databasepath = paths["parameterfile"]
+        self.inputprofiledatapath = paths["input_profiles"]
+        self.outputprofiledatapath = paths["output_profiles"]
+        self.historicaldatapath = paths["historicaldata"]
+        self.forceddecommissioningdatapath = paths["forceddecommissioningdata"]
+        self.heatloaddatapath = paths["heatload"]
+        self.temppath = os.path.join(resultfolder, "temp")
+        self.evaluationtemplatepath = get_raw_input_data_paths(
+            local_mainpath, self.scenario_definition)["template_evaluation"]
+
+    def read_scenario_definition(self, json_name, scenariopath=None,
+                                 definition_folder=None):
+        """Read and check the scenario definition, the optimization
+        parameters and the GHG goals.
+
+        Parameters
+        ----------
+        json_name : str
+            name of the scenario definition
+        scenariopath : str or None
+            path of the scenario definition, by default the json of
+            json_name in the data folder
+        definition_folder : str or None
+            folder with all three jsons, e.g. the scenario definition folder
+            of a result folder. By default, the folders of the data folder
+            are used.
+
+        Returns
+        -------
+        tuple of str
+            path of the data folder, of the optimization parameters and of
+            the GHG goals
+        """
         local_mainpath = os.path.join(os.path.dirname(__file__), "data")
-        scenariopath = os.path.join(
-            local_mainpath, "scenario_definition", "{}.json".format(json_name))
+        if definition_folder is not None:
+            scenariopath = os.path.join(
+                definition_folder, "{}.json".format(json_name))
+        elif scenariopath is None:
+            scenariopath = os.path.join(
+                local_mainpath, "scenario_definition",
+                "{}.json".format(json_name))
+        self.scenariopath = scenariopath
         with open(scenariopath) as f:
             self.scenario_definition = json.load(f)
 
@@ -55,7 +263,9 @@ class Nestor():
 
         # Read and check Optimization-Variables from json
         optParapath = os.path.join(
-            local_mainpath, "scenario_definition", "optimization_parameter",
+            definition_folder or os.path.join(
+                local_mainpath, "scenario_definition",
+                "optimization_parameter"),
             "{}.json".format(self.scenario_definition["optparam_json"]))
         with open(optParapath) as f:
             self.opt_parameters = json.load(f)
@@ -64,7 +274,8 @@ class Nestor():
         self.get_first_parms()
         # Read GHG-targets from json
         GHGScenpath = os.path.join(
-            local_mainpath, "scenario_definition", "emission_limits",
+            definition_folder or os.path.join(
+                local_mainpath, "scenario_definition", "emission_limits"),
             "{}.json".format(self.scenario_definition["GHGgoals_json"]))
         with open(GHGScenpath) as f:
             GHG_Goal_definition = json.load(f)
@@ -73,27 +284,7 @@ class Nestor():
         self.GHGlimit = GHGlimit[self.modelyears]
         print("\n GHG goals in optimization", flush=True)
         print(self.GHGlimit, flush=True)
-
-        # Read and check input data and create scenario folder
-        raw_input_data_paths = get_raw_input_data_paths(
-            local_mainpath, self.scenario_definition)
-        check_input_data(self.opt_parameters, raw_input_data_paths,
-                         self.scenario_definition)
-        check_renewable_input(self.scenario_definition, raw_input_data_paths)
-        paths = folder_creation(local_mainpath, raw_input_data_paths,
-                                self.scenario_definition, scenariopath,
-                                GHGScenpath,
-                                optParapath)
-        self.resultfolderpath = paths["resfolderpath"]
-        self.databasepath = paths["parameterfile"]
-        self.inputprofiledatapath = paths["input_profiles"]
-        self.outputprofiledatapath = paths["output_profiles"]
-        self.historicaldatapath = paths["historicaldata"]
-        self.forceddecommissioningdatapath = paths["forceddecommissioningdata"]
-        self.heatloaddatapath = paths["heatload"]
-        self.temppath = paths["temppath"]
-        self.evaluationtemplatepath = raw_input_data_paths["template_evaluation"]
-        check_input_data(self.opt_parameters, paths, self.scenario_definition)
+        return local_mainpath, optParapath, GHGScenpath
 
     def get_first_parms(self):
         # Read some Scenario-Variables from json
@@ -145,246 +336,111 @@ class Nestor():
         self.string_identifiers = self.scenario_definition["string_identifiers"]
 
     def read_data_parameterfile(self):
-        self.raw_sources = pd.read_excel(
-            self.databasepath, sheet_name='Sources', index_col=0)
-        self.raw_sinks = pd.read_excel(
-            self.databasepath, sheet_name='Sinks', index_col=0)
-        self.raw_storages = pd.read_excel(
-            self.databasepath, sheet_name='Storages', index_col=0)
-        self.raw_transformers = pd.read_excel(
-            self.databasepath, sheet_name='Transformers', index_col=0)
-        self.raw_hubs = pd.read_excel(
-            self.databasepath, sheet_name='Hubs', index_col=0)
-        self.transport = pd.read_excel(
-            self.databasepath, sheet_name='Transport', index_col="Vehicle")
-        self.transformers = pd.read_excel(
-            self.databasepath, sheet_name='Transformers', index_col="name")
-        self.raw_heatpumps = pd.read_excel(
-            self.databasepath, sheet_name='HeatPumps', index_col=0)
-        self.raw_fuelprices = pd.read_excel(
-            self.databasepath, sheet_name='Fuel Prices', index_col=0)
-        self.raw_demand = pd.read_excel(
-            self.databasepath, sheet_name='Demand', index_col=0)
-        self.raw_connections = pd.read_excel(
-            self.databasepath, sheet_name='Connectors')
+        parameter_file = read_parameter_file(self.databasepath)
+        self.raw_sources = parameter_file.get_sheet('Sources', index_col=0)
+        self.raw_sinks = parameter_file.get_sheet('Sinks', index_col=0)
+        self.raw_storages = parameter_file.get_sheet('Storages', index_col=0)
+        self.raw_transformers = parameter_file.get_sheet(
+            'Transformers', index_col=0)
+        self.raw_hubs = parameter_file.get_sheet('Hubs', index_col=0)
+        self.transport = parameter_file.get_sheet(
+            'Transport', index_col="Vehicle")
+        self.transformers = parameter_file.get_sheet(
+            'Transformers', index_col="name")
+        self.raw_heatpumps = parameter_file.get_sheet(
+            'HeatPumps', index_col=0)
+        self.raw_fuelprices = parameter_file.get_sheet(
+            'Fuel Prices', index_col=0)
+        self.raw_demand = parameter_file.get_sheet('Demand', index_col=0)
+        self.raw_connections = parameter_file.get_sheet(
+            'Connectors', index_col=None)
 
         self.raw_all_components = pd.concat(
             [self.raw_sources, self.raw_sinks, self.raw_storages, self.raw_hubs, self.raw_heatpumps])
 
-        self.buildingdata = pd.read_excel(
-            self.databasepath, sheet_name='Buildings',
-            usecols="A,H", index_col=None)
+        # columns A and H of the buildings sheet
+        self.buildingdata = parameter_file.get_sheet(
+            'Buildings', index_col=None, usecols=[0, 7])
         if len(self.buildingdata.columns) > 1:
             self.buildingdata = self.buildingdata.set_index(
                 self.buildingdata.columns[0])
 
     def read_timeseries(self):
-        self.raw_heatload_timeseries = pd.read_csv(
-            self.heatloaddatapath, index_col=0)
-        self.raw_inputprofile_timeseries = pd.read_csv(
-            self.inputprofiledatapath, index_col=0)
-        self.raw_outputprofile_timeseries = pd.read_csv(
-            self.outputprofiledatapath, index_col=0)
+        # only the temperatures of the heat load file are used
+        self.raw_heatload_timeseries = read_profiles(
+            self.heatloaddatapath,
+            columns=["Temperature", "Geothermal_Temperature"], decimals=None)
+        # profiles are rounded once when read
+        self.raw_inputprofile_timeseries = read_profiles(
+            self.inputprofiledatapath,
+            columns=get_referenced_profiles(self.raw_sources))
+        self.raw_outputprofile_timeseries = read_profiles(
+            self.outputprofiledatapath,
+            columns=get_referenced_profiles(self.raw_sinks))
+        # constant and repeated profiles are shared by all components
+        self.profile_pool = ProfilePool()
+        self.heatpump_profiles = HeatPumpProfiles(
+            {x: self.raw_heatload_timeseries[x]
+             for x in ["Temperature", "Geothermal_Temperature"]},
+            self.profile_pool)
 
     def read_forced_decommissioning_and_historical_data(self):
-        self.forceddecommissioning = pd.read_excel(
+        self.forceddecommissioning = read_input_table(
             self.forceddecommissioningdatapath, index_col=0)
-        self.historicalcapacity = pd.read_excel(
+        self.historicalcapacity = read_input_table(
             self.historicaldatapath, index_col=0)
 
     def get_component_parameters_over_transformationpathway(self):
         """Initialize parameters for all years by interpolating between years
         in parameter file."""
-        # 1. fuel prices
-        dfFuels = self.raw_fuelprices.rename(
-            columns={"Price20": 2020, "Price30": 2030, "Price40": 2040,
-                     "Price50": 2050})
-        dfFuels = dfFuels.loc[:, [2020, 2030, 2040, 2050]]
-        new_years = [x for x in self.modelyears if x not in dfFuels.columns]
-        # ugly implementation needed for old enercore-nestor environment
-        for i in new_years:
-            dfFuels[i] = np.NaN
-        self.fuelprices = dfFuels.sort_index(axis=1).interpolate(axis=1)
-
-        # 2. demand
-        dfDemand = self.raw_demand.rename(
-            columns={"2020": 2020, "2030": 2030, "2040": 2040, "2050": 2050})
-        dfDemand = dfDemand.loc[:, [2020, 2030, 2040, 2050]]
-        new_years = [x for x in self.modelyears if x not in dfDemand.columns]
-        # ugly implementation needed for old enercore-nestor environment
-        for i in new_years:
-            dfDemand[i] = np.NaN
-        self.demand = dfDemand.sort_index(axis=1).interpolate(axis=1)
-
-        # 3. emissions
-        emissions = pd.DataFrame()
-        emissions[2020] = self.transformers['CO2footprint2020']
-        emissions[2050] = self.transformers['CO2footprint2050']
-        new_years = [x for x in self.modelyears if x not in emissions.columns]
-        # ugly implementation needed for old enercore-nestor environment
-        for i in new_years:
-            emissions[i] = np.NaN
-        self.emissions = emissions.sort_index(axis=1).interpolate(axis=1)
-
-        # 4.capex
-        capex_cols = ["capex20", "capex30", "capex40", "capex50"]
-        capex = pd.concat(
-            [x for x in [self.raw_sources[capex_cols],
-                         self.raw_storages[capex_cols],
-                         self.transformers[capex_cols],
-                         self.raw_heatpumps[capex_cols]] if not x.empty],
-            axis=0)
-        # rename
-        capex = capex.rename(
-            columns={"capex20": 2020,
-                     "capex30": 2030,
-                     "capex40": 2040,
-                     "capex50": 2050})
-        new_years = [x for x in self.modelyears if x not in capex.columns]
-        # ugly implementation needed for old enercore-nestor environment
-        for i in new_years:
-            capex[i] = np.NaN
-        self.capex = capex.sort_index(axis=1).interpolate(axis=1)
-
-        # 5. opex per Capacity
+        # 1.-6. fuel prices, demand, emissions, capex and cost scale of all
+        # components interpolated at once, years from the column names
+        component_tables = [x for x in [self.raw_sources, self.raw_storages,
+                                        self.transformers, self.raw_heatpumps]
+                            if not x.empty]
+        self.parameter_cube = build_parameter_cube(
+            {"fuelprice": (self.raw_fuelprices, "Price"),
+             "demand": (self.raw_demand, ""),
+             "emissions": (self.transformers, "CO2footprint"),
+             "capex": (pd.concat(component_tables, axis=0), "capex"),
+             "costscale": (pd.concat(component_tables, axis=0), "cost_scale")},
+            years=list(self.modelyears))
+        self.fuelprices = self.parameter_cube.get_parameter("fuelprice")
+        self.demand = self.parameter_cube.get_parameter("demand")
+        self.emissions = self.parameter_cube.get_parameter("emissions")
+        self.capex = self.parameter_cube.get_parameter("capex")
+        self.costscale = self.parameter_cube.get_parameter("costscale")
+
+        # opex per Capacity
         self.opexPerCapacity = pd.DataFrame()
         # TODO later
 
-        # 6. cost scale
-        costscale_cols = ["cost_scale2020", "cost_scale2050"]
-        costscale = pd.concat(
-            [x for x in [self.raw_sources[costscale_cols],
-                         self.raw_storages[costscale_cols],
-                         self.transformers[costscale_cols],
-                         self.raw_heatpumps[costscale_cols]] if not x.empty],
-            axis=0)
-        costscale = costscale.rename(
-            columns={"cost_scale2020": 2020, "cost_scale2050": 2050})
-        new_years = [x for x in self.modelyears if x not in costscale.columns]
-        # ugly implementation needed for old enercore-nestor environment
-        for i in new_years:
-            costscale[i] = np.NaN
-        self.costscale = costscale.sort_index(axis=1).interpolate(axis=1)
-
         # 7. efficency
-        dfConnections = self.raw_connections.rename(
-            columns={"efficiency20": 2020,
-                     "efficiency30": 2030,
-                     "efficiency40": 2040,
-                     "efficiency50": 2050})
-        dfConnections = dfConnections.set_index(["input", "output"])
-        dfConnections = dfConnections.loc[:, [2020, 2030, 2040, 2050]]
-        new_years = [
-            x for x in self.modelyears if x not in dfConnections.columns]
-        # ugly implementation needed for old senercore-nestor environment
-        for i in new_years:
-            dfConnections[i] = np.NaN
-        connections = dfConnections.sort_index(
-            axis=1).interpolate(axis=1).reset_index()
+        dfConnections = self.raw_connections.set_index(["input", "output"])
+        efficiency_columns = get_support_columns(dfConnections, "efficiency")
+        connection_years = sorted(
+            set(efficiency_columns) | set(self.modelyears))
+        connections = pd.DataFrame(
+            interpolate_years(
+                dfConnections[list(efficiency_columns.values())].astype(
+                    float).values,
+                list(efficiency_columns), connection_years),
+            index=dfConnections.index,
+            columns=connection_years).reset_index()
 
         connection_components = (
             [x for x in self.transformers.index]
             + [x for x in self.raw_heatpumps.index]
             + [x for x in self.raw_storages.index])
 
-        self.dimEnergyType = {}
-        self.efficiency = {}
-        for component in connection_components:
-            if isinstance(component, fn.Storage):
-                pass
-            self.efficiency[component] = {}
-            for year in list(self.modelyears):
-                self.efficiency[component][year] = {}
-                # 1. get connections of component
-                out_connections = connections.loc[
-                    connections['input'] == component].set_index("output")
-                in_connections = connections.loc[
-                    connections['output'] == component].set_index("input")
-
-                # 2. create empty efficiency dataframes
-                in_efficiency = pd.DataFrame(index=in_connections.index)
-                out_efficiency = pd.DataFrame(
-                    index=out_connections.index)
-
-                # 3. get energytype and efficiency of connecting component
-                for in_comp in in_efficiency.index:
-                    in_efficiency.loc[in_comp, 'energytype'] = \
-                        self.raw_all_components.loc[in_comp, "energytype"]
-                    in_efficiency.loc[in_comp, 'efficiency'] = \
-                        in_connections.loc[in_comp, year]
-                for out_comp in out_efficiency.index:
-                    out_efficiency.loc[out_comp, 'energytype'] = \
-                        self.raw_all_components.loc[out_comp, "energytype"]
-                    out_efficiency.loc[out_comp, 'efficiency'] = \
-                        out_connections.loc[out_comp, year]
-
-                # 4. dimEnergytype
-                # 4.1 get dimenergytype
-                _found = False
-                for df in [self.transformers, self.raw_sources, self.raw_storages, self.raw_heatpumps]:
-                    if component in df.index:
-                        _df = df
-                        _found = True
-                if _found == False:
-                    raise ValueError(
-                        f"Cannot find dimEnergyType for '{component}")
-                if "dimEnergyType" in _df.columns:
-                    filter = "dimEnergyType"
-                else:
-                    filter = "energytype"
-                dimEnergy = _df.loc[component, filter]
-
-                # 4.2 check if dimEnergy/reference commodity is in input or output
-                if (dimEnergy in in_efficiency.index) and (dimEnergy in out_efficiency.index):
-                    raise KeyError("Reference commodity in input and output for" +
-                                   i.name)
-                elif dimEnergy in list(in_efficiency["energytype"]):
-                    out_referenceCommodity = False
-                    dimHub = in_efficiency.loc[
-                        in_efficiency["energytype"] == dimEnergy].index[0]
-                    dimEfficiency = in_efficiency.loc[dimHub, "efficiency"]
-                    self.efficiency[component][year][dimHub] = -1
-                else:
-                    out_referenceCommodity = True
-                    dimHub = out_efficiency.loc[
-                        out_efficiency["energytype"] == dimEnergy].index[0]
-                    dimEfficiency = out_efficiency.loc[dimHub, "efficiency"]
-                    self.efficiency[component][year][dimHub] = +1
-
-                # excurse: get dimensioning Hub
-                self.dimEnergyType[component] = dimHub
-
-                # 5. write output conversions set other conversions for output
-                for out_connection, out_connect_params in out_efficiency.iterrows():
-                    # only write if the connection is not the reference connection
-                    if out_connection == dimHub and not out_referenceCommodity:
-                        continue
-
-                    # get conversion factors for commodity connection of input
-                    # component if dimEnergy in output
-                    if out_referenceCommodity:
-                        self.efficiency[component][year][out_connection] = \
-                            out_connect_params.efficiency / \
-                            dimEfficiency
-                    # get conversion factors for commodity connection of input component if dimEnergy in input
-                    # only take those i.efficiencies, where input is dimEnergy since there might be more than one input.
-                    # nothing else needed since i.efficiencies are always
-                    # dimensioned to input
-                    else:
-                        self.efficiency[component][year][out_connection] = \
-                            out_connect_params.efficiency
-
-                # 3. write input conversions
-                for in_connection, in_connect_param in in_efficiency.iterrows():
-                    # only write if the connection is not the reference connection
-                    if in_connection == dimHub and out_referenceCommodity:
-                        continue
-                    if out_referenceCommodity:
-                        self.efficiency[component][year][in_connection] = \
-                            - in_connect_param.efficiency/dimEfficiency
-                    else:
-                        self.efficiency[component][year][in_connection] = \
-                            -1 * dimEfficiency * in_connect_param.efficiency
+        self.efficiency, self.dimEnergyType = get_conversion_factors(
+            connections=connections,
+            components=connection_components,
+            years=list(self.modelyears),
+            energytypes=self.raw_all_components["energytype"].to_dict(),
+            dim_energytypes=get_dim_energytypes(
+                [self.transformers, self.raw_sources, self.raw_storages,
+                 self.raw_heatpumps]))
 
     def define_optimizaton_specs(self):
         if self.solver == "gurobi":
@@ -649,21 +705,21 @@ class Nestor():
 
             # Profiles of source
             if source_params["profile"] not in [None, "None"]:
-                p1 = pd.Series(
+                p1 = self.profile_pool.intern(
                     self.raw_inputprofile_timeseries[source_params["profile"]])
                 if not source_params.controllable:
-                    operationRateFix = _round(p1)
+                    operationRateFix = p1
                     operationRateMax = None
                 else:
-                    operationRateMax = _round(p1)
+                    operationRateMax = p1
                     operationRateFix = None
             else:
                 p1 = None
                 if not source_params.controllable:
-                    operationRateFix = pd.Series([1] * 8760)
+                    operationRateFix = self.profile_pool.constant(1)
                     operationRateMax = None
                 else:
-                    operationRateMax = pd.Series([1] * 8760)
+                    operationRateMax = self.profile_pool.constant(1)
                     operationRateFix = None
 
             # get parameters
@@ -834,21 +890,21 @@ class Nestor():
                 commodityRevenue = 0
 
             if sink_params["profile"] not in [None, "None"]:
-                p1 = pd.Series(
+                p1 = self.profile_pool.intern(
                     self.raw_outputprofile_timeseries[sink_params["profile"]])
                 if not sink_params.controllable:
-                    operationRateFix = _round(p1)
+                    operationRateFix = p1
                     operationRateMax = None
                 else:
-                    operationRateMax = _round(p1)
+                    operationRateMax = p1
                     operationRateFix = None
             else:
                 p1 = None
                 if not sink_params.controllable:
-                    operationRateFix = pd.Series([1] * 8760)
+                    operationRateFix = self.profile_pool.constant(1)
                     operationRateMax = None
                 else:
-                    operationRateMax = pd.Series([1] * 8760)
+                    operationRateMax = self.profile_pool.constant(1)
                     operationRateFix = None
 
             # add sink with either flexible or fixed capacity
@@ -929,6 +985,15 @@ class Nestor():
                     interestRate=storage_wacc,
                     economicLifetime=storage_params.lifetime))
         # 5 Heatpumps
+        def _get_temperature_name(name):
+            if self.string_identifiers["geothermalHeatPumps"] in name:
+                return "Geothermal_Temperature"
+            return "Temperature"
+
+        # conversion profiles of all heat pumps in one step
+        self.heatpump_profiles.prepare(
+            self.raw_heatpumps,
+            [_get_temperature_name(x) for x in self.raw_heatpumps.index])
         for heatpump, heatpump_params in self.raw_heatpumps.iterrows():
             heatpump_temp_name = _get_temp_name(heatpump)
             heatpump_wacc = _get_wacc(
@@ -954,16 +1019,11 @@ class Nestor():
             dfTempIn = dfTempIn.squeeze()
             dfTempOut = dfTempOut.squeeze()
 
-            if self.string_identifiers["geothermalHeatPumps"] in heatpump:
-                temperature_ts = self.raw_heatload_timeseries["Geothermal_Temperature"]
-            else:
-                temperature_ts = self.raw_heatload_timeseries["Temperature"]
-
-            conversionFactors_HP = get_heatpump_conversion(
+            conversionFactors_HP = self.heatpump_profiles.get_conversion(
                 efficiency=heatpump_params.efficiency,
                 T_hot=heatpump_params.T_hot,
-                T_cold_time_series=temperature_ts,
                 T_limit=heatpump_params.T_limit,
+                temperature_name=_get_temperature_name(heatpump),
                 input_name=dfTempIn['input'],
                 output_name=dfTempOut['output'])
 
@@ -1036,18 +1096,167 @@ class Nestor():
                 interestRate=self.default_wacc))
 
 
+def resume(resultfolderpath, threads=None):
+    """Continue a backcasting run after the last finished model year.
+
+    The input data is read from the processed input files of the run, the
+    energy system model is rebuilt from the state of the checkpoint.
+
+    Parameters
+    ----------
+    resultfolderpath : str
+        result folder of the run with the checkpoint in temp/
+    threads : int or None
+        solver threads, by default the threads of the run
+
+    Returns
+    -------
+    Nestor
+    """
+    checkpoint = load_checkpoint(resultfolderpath)
+    if threads is None:
+        threads = checkpoint["threads"]
+    model = Nestor(checkpoint["scenario"], threads=threads, run=False,
+                   input_folder=checkpoint["input_folder"],
+                   resultfolder=os.path.abspath(resultfolderpath))
+    print("Resuming '{}' after {}".format(
+        model.scenario_definition["Run"],
+        checkpoint["state"]["finished_years"][-1]), flush=True)
+    model.run(checkpoint["state"])
+    return model
+
+
 def get_heatpump_conversion(efficiency, T_hot, T_cold_time_series, T_limit,
-                            input_name, output_name):
+                            input_name, output_name, profile_pool=None):
     conversionFactors = {}
-    Hprofile = -1 / (efficiency * (T_hot + 273.15) /
-                     (T_hot - T_cold_time_series))
-    Hprofile[T_cold_time_series < T_limit] = 0.0
-    TDconvIn = pd.Series(Hprofile)
-    TDconvOut = pd.Series(np.array([1] * 8760))
-    conversionFactors[output_name] = TDconvOut.reset_index(drop=True)
-    conversionFactors[input_name] = TDconvIn.reset_index(drop=True)
+    TDconvIn = pd.Series(get_heatpump_profiles(
+        [efficiency], [T_hot], [T_limit], T_cold_time_series)[0])
+    if profile_pool is None:
+        profile_pool = ProfilePool(len(TDconvIn))
+    conversionFactors[output_name] = profile_pool.constant(1)
+    conversionFactors[input_name] = profile_pool.intern(TDconvIn)
     return conversionFactors
 
 
+def get_referenced_profiles(components):
+    """Get the names of the profiles used by the components of a sheet."""
+    profiles = components["profile"].dropna()
+    return [x for x in profiles.unique() if x != "None"]
+
+
+def get_dim_energytypes(tables):
+    """Get the dimensioning energy type of the components of all sheets.
+
+    The column dimEnergyType is used if a sheet has it, the energytype
+    otherwise. The last sheet with a component counts.
+
+    Parameters
+    ----------
+    tables : list of pd.DataFrame
+        component sheets indexed by component name
+
+    Returns
+    -------
+    dict
+        component -> dimensioning energy type
+    """
+    dim_energytypes = {}
+    for df in tables:
+        if "dimEnergyType" in df.columns:
+            filter = "dimEnergyType"
+        else:
+            filter = "energytype"
+        dim_energytypes.update(df[filter].to_dict())
+    return dim_energytypes
+
+
+def get_conversion_factors(connections, components, years, energytypes,
+                           dim_energytypes):
+    """Get the conversion factors of components for all years.
+
+    The factors are dimensioned to the hub of the dimensioning energy type
+    of the component (+1 for output, -1 for input).
+
+    Parameters
+    ----------
+    connections : pd.DataFrame
+        connectors with columns input, output and efficiency per year
+    components : list
+        names of the components
+    years : list of int
+    energytypes : dict
+        energytype of every component, which connects to the components
+    dim_energytypes : dict
+        dimensioning energytype of the components
+
+    Returns
+    -------
+    efficiency : dict
+        component -> year -> commodity -> conversion factor
+    dimEnergyType : dict
+        component -> dimensioning hub
+    """
+    efficiency_values = connections[years].values.astype(float)
+    out_rows = connections.groupby("input", sort=False).indices
+    in_rows = connections.groupby("output", sort=False).indices
+    inputs = connections["input"].values
+    outputs = connections["output"].values
+
+    efficiency = {}
+    dimEnergyType = {}
+    for component in components:
+        if component not in dim_energytypes:
+            raise ValueError(
+                f"Cannot find dimEnergyType for '{component}")
+        dimEnergy = dim_energytypes[component]
+        out_idx = out_rows.get(component, [])
+        in_idx = in_rows.get(component, [])
+        out_names = list(outputs[out_idx])
+        in_names = list(inputs[in_idx])
+        in_types = [energytypes[x] for x in in_names]
+        out_types = [energytypes[x] for x in out_names]
+
+        # reference commodity/dimensioning hub in input or output
+        if (dimEnergy in in_names) and (dimEnergy in out_names):
+            raise KeyError("Reference commodity in input and output for " +
+                           component)
+        elif dimEnergy in in_types:
+            out_referenceCommodity = False
+            dimHub = in_names[in_types.index(dimEnergy)]
+            dimRow = in_idx[in_types.index(dimEnergy)]
+        elif dimEnergy in out_types:
+            out_referenceCommodity = True
+            dimHub = out_names[out_types.index(dimEnergy)]
+            dimRow = out_idx[out_types.index(dimEnergy)]
+        else:
+            raise KeyError("No connection with dimensioning energytype " +
+                           "'{}' for '{}'".format(dimEnergy, component))
+        dimEnergyType[component] = dimHub
+        dimEfficiency = efficiency_values[dimRow]
+
+        # factors of all connections for all years
+        factors = {dimHub: np.full(len(years), 1.0 if out_referenceCommodity
+                                   else -1.0)}
+        for name, row in zip(out_names, out_idx):
+            if name == dimHub and not out_referenceCommodity:
+                continue
+            if out_referenceCommodity:
+                factors[name] = efficiency_values[row] / dimEfficiency
+            else:
+                factors[name] = efficiency_values[row]
+        for name, row in zip(in_names, in_idx):
+            if name == dimHub and out_referenceCommodity:
+                continue
+            if out_referenceCommodity:
+                factors[name] = - efficiency_values[row] / dimEfficiency
+            else:
+                factors[name] = -1 * dimEfficiency * efficiency_values[row]
+
+        efficiency[component] = {
+            year: {name: factor[i] for name, factor in factors.items()}
+            for i, year in enumerate(years)}
+    return efficiency, dimEnergyType
+
+
 if __name__ == "__main__":
     Nestor("newTHG0")
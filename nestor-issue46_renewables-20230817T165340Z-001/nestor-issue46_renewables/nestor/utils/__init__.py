@@ -6,3 +6,12 @@ from .combine_several_transformation_overview import *
 from .data_handling import *
 from .exportResult import *
 from .coupling_renewables import PotentialUpdate
+from .read_input import *
+from .parameter_cube import *
+from .profile_pool import *
+from .heatpump_profiles import *
+from .pathway_optimizer import *
+from .clustering_cache import *
+from .stock_ledger import *
+from .checkpoint import *
+from .optimal_values import *
@@ -1,19 +1,29 @@
 import pandas as pd
 import os
 
+from nestor.utils.optimal_values import OptimalValues
 
-def calculate_demand(year, resfolderpath, FINEResults, esM):
+
+def calculate_demand(year, resfolderpath, FINEResults, esM,
+                     optimal_values=None):
     flow_folder_name = str(year)
     resfolderpath_flow = os.path.join(resfolderpath, flow_folder_name)
     if not os.path.exists(resfolderpath_flow):
         os.makedirs(resfolderpath_flow)
-    get_demand_data_CH4(FINEResults, year, resfolderpath_flow, esM)
-    get_demand_data_H2(FINEResults, year, resfolderpath_flow, esM)
-    get_demand_data_power(FINEResults, year, resfolderpath_flow, esM)
+    # the operation of all components is fetched once per modeling class
+    if optimal_values is None:
+        optimal_values = OptimalValues()
+    get_demand_data_CH4(FINEResults, year, resfolderpath_flow, esM,
+                        optimal_values)
+    get_demand_data_H2(FINEResults, year, resfolderpath_flow, esM,
+                       optimal_values)
+    get_demand_data_power(FINEResults, year, resfolderpath_flow, esM,
+                          optimal_values)
     return FINEResults
 
 
-def get_demand_data_CH4(FINEResults, year, resfolderpath_flow, esM):
+def get_demand_data_CH4(FINEResults, year, resfolderpath_flow, esM,
+                        optimal_values=None):
     '''
     Get demand timeseries for CH4 Components
 
@@ -29,6 +39,8 @@ def get_demand_data_CH4(FINEResults, year, resfolderpath_flow, esM):
     already in 2020 installed components can be checked.
 
     '''
+    if optimal_values is None:
+        optimal_values = OptimalValues()
     df_CH4 = pd.DataFrame()
     for component in esM.componentNames:
 
@@ -48,8 +60,8 @@ def get_demand_data_CH4(FINEResults, year, resfolderpath_flow, esM):
                     if ConvFac_name == 'P-Hub-CH4Hub-CH4':
                         ConvFac_value = esM.getComponentAttribute(
                             component, 'commodityConversionFactors')[ConvFac_name]
-                        data = esM.componentModelingDict['ConversionModel'].getOptimalValues(
-                            name='operationVariablesOptimum')['values'].loc[component, 'GermanyRegion']
+                        data = optimal_values.get(
+                            esM, 'ConversionModel', 'operationVariablesOptimum').loc[component, 'GermanyRegion']
                         data_conv = ConvFac_value * data
 
                         if data_conv[0] < 0:
@@ -67,8 +79,8 @@ def get_demand_data_CH4(FINEResults, year, resfolderpath_flow, esM):
 
             else:
                 if esM.getComponentAttribute(component, 'commodity') == 'P-Hub-CH4Hub-CH4':
-                    data = esM.componentModelingDict['StorageModel'].getOptimalValues(
-                        name='chargeOperationVariablesOptimum')['values'].loc[component, 'GermanyRegion']
+                    data = optimal_values.get(
+                        esM, 'StorageModel', 'chargeOperationVariablesOptimum').loc[component, 'GermanyRegion']
                     data.name = esM.getComponentAttribute(
                         component, 'commodity')+' to ' + component
                     data = data.abs()
@@ -98,7 +110,8 @@ def get_demand_data_CH4(FINEResults, year, resfolderpath_flow, esM):
     return
 
 
-def get_demand_data_H2(FINEResults, year, resfolderpath_flow, esM):
+def get_demand_data_H2(FINEResults, year, resfolderpath_flow, esM,
+                       optimal_values=None):
     '''
     Get demand timeseries for H2 Components
 
@@ -117,6 +130,8 @@ def get_demand_data_H2(FINEResults, year, resfolderpath_flow, esM):
     already in 2020 installed components can be checked.
 
     '''
+    if optimal_values is None:
+        optimal_values = OptimalValues()
     df_H2_GridHub = pd.DataFrame()
     df_H2Hub = pd.DataFrame()
     for component in esM.componentNames:
@@ -139,8 +154,8 @@ def get_demand_data_H2(FINEResults, year, resfolderpath_flow, esM):
 
                         ConvFac_value = esM.getComponentAttribute(
                             component, 'commodityConversionFactors')[ConvFac_name]
-                        data = esM.componentModelingDict['ConversionModel'].getOptimalValues(
-                            name='operationVariablesOptimum')['values'].loc[component, 'GermanyRegion']
+                        data = optimal_values.get(
+                            esM, 'ConversionModel', 'operationVariablesOptimum').loc[component, 'GermanyRegion']
                         data_conv = ConvFac_value * data
 
                         if data_conv[0] < 0:
@@ -166,8 +181,8 @@ def get_demand_data_H2(FINEResults, year, resfolderpath_flow, esM):
             else:
                 if (esM.getComponentAttribute(component, 'commodity') == 'P-Hub-H2GridHub-H2') or ('B-Hub-HouseHoldH2Hub-H2' in esM.getComponentAttribute(component, 'commodity')):
 
-                    data = esM.componentModelingDict['StorageModel'].getOptimalValues(
-                        name='chargeOperationVariablesOptimum')['values'].loc[component, 'GermanyRegion']
+                    data = optimal_values.get(
+                        esM, 'StorageModel', 'chargeOperationVariablesOptimum').loc[component, 'GermanyRegion']
                     data.name = esM.getComponentAttribute(
                         component, 'commodity')+' to ' + component
                     data = data.abs()
@@ -188,8 +203,8 @@ def get_demand_data_H2(FINEResults, year, resfolderpath_flow, esM):
 
             else:
                 if (esM.getComponentAttribute(component, 'commodity') == 'P-Hub-H2GridHub-H2') or ('B-Hub-HouseHoldH2Hub-H2' in esM.getComponentAttribute(component, 'commodity')):
-                    data = esM.componentModelingDict['SourceSinkModel'].getOptimalValues(
-                        name='operationVariablesOptimum')['values'].loc[component, 'GermanyRegion']
+                    data = optimal_values.get(
+                        esM, 'SourceSinkModel', 'operationVariablesOptimum').loc[component, 'GermanyRegion']
                     data.name = esM.getComponentAttribute(
                         component, 'commodity')+' to '+component
                     data = data.abs()
@@ -241,7 +256,8 @@ def get_demand_data_H2(FINEResults, year, resfolderpath_flow, esM):
     return
 
 
-def get_demand_data_power(FINEResults, year, resfolderpath_flow, esM):
+def get_demand_data_power(FINEResults, year, resfolderpath_flow, esM,
+                          optimal_values=None):
     '''
     Get demand timeseries for electricity Components
 
@@ -260,6 +276,8 @@ def get_demand_data_power(FINEResults, year, resfolderpath_flow, esM):
     already in 2020 installed components can be checked.
 
     '''
+    if optimal_values is None:
+        optimal_values = OptimalValues()
     df_Demand_EHub = pd.DataFrame()
     df_HH_EHub = pd.DataFrame()
 
@@ -283,15 +301,15 @@ def get_demand_data_power(FINEResults, year, resfolderpath_flow, esM):
                         if isinstance(esM.getComponentAttribute(component, 'commodityConversionFactors')[ConvFac_name], pd.Series):
                             ConvFac_value = esM.getComponentAttribute(
                                 component, 'commodityConversionFactors')[ConvFac_name].mean()
-                            data = esM.componentModelingDict['ConversionModel'].getOptimalValues(
-                                name='operationVariablesOptimum')['values'].loc[component, 'GermanyRegion']
+                            data = optimal_values.get(
+                                esM, 'ConversionModel', 'operationVariablesOptimum').loc[component, 'GermanyRegion']
                             data_conv = ConvFac_value * data
 
                         else:
                             ConvFac_value = esM.getComponentAttribute(
                                 component, 'commodityConversionFactors')[ConvFac_name]
-                            data = esM.componentModelingDict['ConversionModel'].getOptimalValues(
-                                name='operationVariablesOptimum')['values'].loc[component, 'GermanyRegion']
+                            data = optimal_values.get(
+                                esM, 'ConversionModel', 'operationVariablesOptimum').loc[component, 'GermanyRegion']
                             data_conv = ConvFac_value * data
 
                         if data_conv[0] < 0:
@@ -315,8 +333,8 @@ def get_demand_data_power(FINEResults, year, resfolderpath_flow, esM):
 
             else:
                 if (esM.getComponentAttribute(component, 'commodity') == 'Demand-EHub') or (esM.getComponentAttribute(component, 'commodity') == 'HH-EHub'):
-                    data = esM.componentModelingDict['SourceSinkModel'].getOptimalValues(
-                        name='operationVariablesOptimum')['values'].loc[component, 'GermanyRegion']
+                    data = optimal_values.get(
+                        esM, 'SourceSinkModel', 'operationVariablesOptimum').loc[component, 'GermanyRegion']
                     data.name = esM.getComponentAttribute(
                         component, 'commodity')+' to '+component
                     data = data.abs()
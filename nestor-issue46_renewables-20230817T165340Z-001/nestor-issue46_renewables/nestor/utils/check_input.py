@@ -1,6 +1,9 @@
 import pandas as pd
 import os
 
+from nestor.utils.read_input import (read_parameter_file, read_input_table,
+                                     is_registered_input)
+
 
 def check_renewable_input(scenario_definition, paths):
     # check the coupled renewable energies
@@ -116,6 +119,21 @@ def check_scenario_definition(json, local_mainpath):
     # exportflowresults
     if json["exportFlowResults"] != True and json["exportFlowResults"] != False:
         raise ValueError("exportFlowResults in json should be true or false")
+    # archive of processed input (optional)
+    if "archive_processed_input" in json and \
+            json["archive_processed_input"] not in [True, False]:
+        raise ValueError(
+            "archive_processed_input in json should be true or false")
+    # warm start from the solution of the previous year (optional)
+    if "warmstart" in json and json["warmstart"] not in [True, False]:
+        raise ValueError("warmstart in json should be true or false")
+    # checkpoint after every model year (optional)
+    if "checkpoint" in json and json["checkpoint"] not in [True, False]:
+        raise ValueError("checkpoint in json should be true or false")
+    # snapshots of the stock ledger for debugging (optional)
+    if "stock_snapshots" in json and \
+            json["stock_snapshots"] not in [True, False]:
+        raise ValueError("stock_snapshots in json should be true or false")
     # max Refurbishment rate
     if json["maxRefurbRate"] > 3 or json["maxRefurbRate"] < 1:
         raise Warning("Check for realistic maximum refurbishment rate")
@@ -219,20 +237,15 @@ def check_scenario_definition(json, local_mainpath):
 
 def check_input_data(opt_json, paths, scenario_definition):
     # get list of unrestrited components
-    raw_transformers = pd.read_excel(
-        paths["parameterfile"], sheet_name='Transformers', index_col="name")
-    raw_sources = pd.read_excel(
-        paths["parameterfile"], sheet_name='Sources', index_col=0)
-    raw_heatpumps = pd.read_excel(
-        paths["parameterfile"], sheet_name='HeatPumps', index_col=0)
-    raw_storages = pd.read_excel(
-        paths["parameterfile"], sheet_name='Storages', index_col=0)
-    raw_sinks = pd.read_excel(
-        paths["parameterfile"], sheet_name='Sinks', index_col=0)
-    raw_hubs = pd.read_excel(
-        paths["parameterfile"], sheet_name='Hubs', index_col=0)
-    connections = pd.read_excel(
-        paths["parameterfile"], "Connectors")
+    parameter_file = read_parameter_file(paths["parameterfile"])
+    raw_transformers = parameter_file.get_sheet(
+        'Transformers', index_col="name")
+    raw_sources = parameter_file.get_sheet('Sources', index_col=0)
+    raw_heatpumps = parameter_file.get_sheet('HeatPumps', index_col=0)
+    raw_storages = parameter_file.get_sheet('Storages', index_col=0)
+    raw_sinks = parameter_file.get_sheet('Sinks', index_col=0)
+    raw_hubs = parameter_file.get_sheet('Hubs', index_col=0)
+    connections = parameter_file.get_sheet("Connectors", index_col=None)
     all_components = list(raw_transformers.index)+list(raw_sources.index) +\
         list(raw_heatpumps.index) + list(raw_hubs.index) +\
         list(raw_storages.index)+list(raw_sinks.index)
@@ -387,15 +400,15 @@ def check_optimization_definition(json):
 
 
 def check_parameter_file(param_file_path):
-    hubs = pd.read_excel(param_file_path, "Hubs", index_col="name")
-    transformer_df = pd.read_excel(
-        param_file_path, "Transformers", index_col="name")
-    connections = pd.read_excel(param_file_path, "Connectors")
-    sources = pd.read_excel(param_file_path, "Sources", index_col="name")
-    sinks = pd.read_excel(param_file_path, "Sinks", index_col="name")
-    storages = pd.read_excel(param_file_path, "Storages", index_col="name")
-    heatpumps = pd.read_excel(
-        param_file_path, "HeatPumps", index_col="name")
+    parameter_file = read_parameter_file(param_file_path)
+    hubs = parameter_file.get_sheet("Hubs", index_col="name")
+    transformer_df = parameter_file.get_sheet(
+        "Transformers", index_col="name")
+    connections = parameter_file.get_sheet("Connectors", index_col=None)
+    sources = parameter_file.get_sheet("Sources", index_col="name")
+    sinks = parameter_file.get_sheet("Sinks", index_col="name")
+    storages = parameter_file.get_sheet("Storages", index_col="name")
+    heatpumps = parameter_file.get_sheet("HeatPumps", index_col="name")
 
     # check functions
     check_for_duplicate_components(
@@ -409,7 +422,9 @@ def check_parameter_file(param_file_path):
     check_dimenergy_and_energytype_of_transformer(transformer_df)
     check_if_stocks_have_ub_greater_zero(
         transformer_df, sources, sinks, storages, heatpumps)
-    check_if_any_cell_is_formular(param_file_path)
+    # processed data in memory only holds values
+    if not is_registered_input(param_file_path):
+        check_if_any_cell_is_formular(param_file_path)
 
 
 def check_if_any_cell_is_formular(param_file_path):
@@ -625,19 +640,15 @@ def check_hub_after_source_with_co2footprint(hubs, sources, connections):
 def check_if_components_with_lb_have_historical_capacity(parameter_file_path, historical_cap_path):
     # 1. read data
     # historical data
-    historical_data = pd.read_excel(historical_cap_path, index_col=0)
+    historical_data = read_input_table(historical_cap_path, index_col=0)
 
     # parameter file with ubs
-    transformers = pd.read_excel(
-        parameter_file_path, sheet_name='Transformers', index_col="name")
-    raw_sources = pd.read_excel(
-        parameter_file_path, sheet_name='Sources', index_col=0)
-    raw_heatpumps = pd.read_excel(
-        parameter_file_path, sheet_name='HeatPumps', index_col=0)
-    raw_storages = pd.read_excel(
-        parameter_file_path, sheet_name='Storages', index_col=0)
-    raw_sinks = pd.read_excel(
-        parameter_file_path, sheet_name='Sinks', index_col=0)
+    parameter_file = read_parameter_file(parameter_file_path)
+    transformers = parameter_file.get_sheet('Transformers', index_col="name")
+    raw_sources = parameter_file.get_sheet('Sources', index_col=0)
+    raw_heatpumps = parameter_file.get_sheet('HeatPumps', index_col=0)
+    raw_storages = parameter_file.get_sheet('Storages', index_col=0)
+    raw_sinks = parameter_file.get_sheet('Sinks', index_col=0)
 
     raw_lb = pd.concat([
         transformers["lb"],
@@ -669,8 +680,8 @@ def check_stock_hist_data(parameterfile_path, histData_path):
     stocks_parameterfile = []
     sheetnames = ['Sources', 'Sinks', 'Storages', 'Transformers', 'HeatPumps']
     for sheetname in sheetnames:
-        parameterfile = pd.read_excel(
-            parameterfile_path, sheet_name=sheetname, index_col=0)
+        parameterfile = read_parameter_file(parameterfile_path).get_sheet(
+            sheetname, index_col=0)
         _componentenlist_stock = [
             x for x in parameterfile.index if "_stock" in x]
         stocks_parameterfile.extend(_componentenlist_stock)
@@ -679,7 +690,7 @@ def check_stock_hist_data(parameterfile_path, histData_path):
                             for x in stocks_parameterfile]
 
     # get list of stock components in historical data
-    hist_data = pd.read_excel(histData_path, index_col=0)
+    hist_data = read_input_table(histData_path, index_col=0)
     stocks_historicaldata = hist_data.columns
 
     # compare lists and raise error if stocks of parameterfile and historical
@@ -702,7 +713,7 @@ def check_stock_hist_data(parameterfile_path, histData_path):
 
 
 def compare_unrestriced_components_and_historical_data(historical_cap_path, unrestricted_components):
-    historical_components = pd.read_excel(
+    historical_components = read_input_table(
         historical_cap_path, index_col=0).columns
 
     _missing_components = []
@@ -719,25 +730,21 @@ def compare_unrestriced_components_and_historical_data(historical_cap_path, unre
 def check_forced_decommissioning_data(forced_decommissioning_path, historical_cap_path, parameter_file_path, targetyear):
     # 1. read data
     # historical data
-    historical_data = pd.read_excel(historical_cap_path, index_col=0)
+    historical_data = read_input_table(historical_cap_path, index_col=0)
 
     # forced decommissioning
-    forced_decommissioning = pd.read_excel(
+    forced_decommissioning = read_input_table(
         forced_decommissioning_path, index_col=0)
     unnamed_cols = [
         x for x in forced_decommissioning.columns if x.startswith("Unnamed: ")]
     forced_decommissioning = forced_decommissioning.drop(columns=unnamed_cols)
     # parameter file with ubs
-    transformers = pd.read_excel(
-        parameter_file_path, sheet_name='Transformers', index_col="name")
-    raw_sources = pd.read_excel(
-        parameter_file_path, sheet_name='Sources', index_col=0)
-    raw_heatpumps = pd.read_excel(
-        parameter_file_path, sheet_name='HeatPumps', index_col=0)
-    raw_storages = pd.read_excel(
-        parameter_file_path, sheet_name='Storages', index_col=0)
-    raw_sinks = pd.read_excel(
-        parameter_file_path, sheet_name='Sinks', index_col=0)
+    parameter_file = read_parameter_file(parameter_file_path)
+    transformers = parameter_file.get_sheet('Transformers', index_col="name")
+    raw_sources = parameter_file.get_sheet('Sources', index_col=0)
+    raw_heatpumps = parameter_file.get_sheet('HeatPumps', index_col=0)
+    raw_storages = parameter_file.get_sheet('Storages', index_col=0)
+    raw_sinks = parameter_file.get_sheet('Sinks', index_col=0)
 
     raw_ub = pd.concat([
         transformers["ub"],
@@ -787,16 +794,12 @@ def check_forced_decommissioning_data(forced_decommissioning_path, historical_ca
 
 def check_if_unrestriced_have_ub(unrestricted_components, parameter_file_path):
     # parameter file with ubs
-    transformers = pd.read_excel(
-        parameter_file_path, sheet_name='Transformers', index_col="name")
-    raw_sources = pd.read_excel(
-        parameter_file_path, sheet_name='Sources', index_col=0)
-    raw_heatpumps = pd.read_excel(
-        parameter_file_path, sheet_name='HeatPumps', index_col=0)
-    raw_storages = pd.read_excel(
-        parameter_file_path, sheet_name='Storages', index_col=0)
-    raw_sinks = pd.read_excel(
-        parameter_file_path, sheet_name='Sinks', index_col=0)
+    parameter_file = read_parameter_file(parameter_file_path)
+    transformers = parameter_file.get_sheet('Transformers', index_col="name")
+    raw_sources = parameter_file.get_sheet('Sources', index_col=0)
+    raw_heatpumps = parameter_file.get_sheet('HeatPumps', index_col=0)
+    raw_storages = parameter_file.get_sheet('Storages', index_col=0)
+    raw_sinks = parameter_file.get_sheet('Sinks', index_col=0)
 
     raw_ub = pd.concat([
         transformers["ub"],
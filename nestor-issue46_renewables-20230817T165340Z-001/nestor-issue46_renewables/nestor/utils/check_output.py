@@ -1,5 +1,7 @@
 import pandas as pd
 
+from nestor.utils.read_input import read_parameter_file, read_input_table
+
 
 def _round(data):
     data = round(data, 4)
@@ -14,17 +16,14 @@ def check_output(databasepath, resultfilepath, historicaldatapath, targetyear):
 
 def check_upper_bounds(databasepath, resultfilepath, historicaldatapath,
                        targetyear):
-    raw_transformers = pd.read_excel(
-        databasepath, sheet_name='Transformers', index_col="name")
-    raw_sources = pd.read_excel(
-        databasepath, sheet_name='Sources', index_col=0)
-    raw_heatpumps = pd.read_excel(
-        databasepath, sheet_name='HeatPumps', index_col=0)
-    raw_storages = pd.read_excel(
-        databasepath, sheet_name='Storages', index_col=0)
-    raw_sink = pd.read_excel(
-        databasepath, sheet_name='Sinks', index_col=0)
-    historicalcapacity = pd.read_excel(
+    parameter_file = read_parameter_file(databasepath)
+    raw_transformers = parameter_file.get_sheet(
+        'Transformers', index_col="name")
+    raw_sources = parameter_file.get_sheet('Sources', index_col=0)
+    raw_heatpumps = parameter_file.get_sheet('HeatPumps', index_col=0)
+    raw_storages = parameter_file.get_sheet('Storages', index_col=0)
+    raw_sink = parameter_file.get_sheet('Sinks', index_col=0)
+    historicalcapacity = read_input_table(
         historicaldatapath, index_col="Year")
     result_capacities = pd.read_excel(
         resultfilepath, sheet_name="capacities", index_col=0)
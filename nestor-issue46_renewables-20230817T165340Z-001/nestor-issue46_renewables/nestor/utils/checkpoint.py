@@ -0,0 +1,88 @@
+import os
+import time
+import pickle
+
+CHECKPOINT_NAME = "checkpoint.pkl"
+
+
+def get_checkpoint_path(resultfolderpath):
+    """Get the path of the checkpoint of the run in resultfolderpath."""
+    return os.path.join(resultfolderpath, "temp", CHECKPOINT_NAME)
+
+
+def save_checkpoint(model):
+    """Write the state of a run to the checkpoint in its result folder.
+
+    Only the state of the pathway is stored (see MyopicTrans.get_state)
+    together with the scenario, the solver threads and the input folder of
+    the run. The input data is read again and the energy system model is
+    rebuilt when the run is resumed.
+
+    Parameters
+    ----------
+    model : Nestor
+
+    Returns
+    -------
+    bool
+        False if the state cannot be stored, the run continues without
+        checkpoint in this case
+    """
+    start = time.time()
+    path = get_checkpoint_path(model.resultfolderpath)
+    temp_path = "{}.{}.tmp".format(path, os.getpid())
+    # the input folder of a variant of a sweep is not in its result folder
+    input_folder = os.path.dirname(os.path.dirname(model.databasepath))
+    if os.path.abspath(input_folder).startswith(
+            os.path.abspath(model.resultfolderpath) + os.sep):
+        input_folder = os.path.relpath(input_folder, model.resultfolderpath)
+    try:
+        checkpoint = {
+            "scenario": os.path.splitext(
+                os.path.basename(model.scenariopath))[0],
+            "threads": model.threads,
+            "input_folder": input_folder,
+            "state": model.backcasting.get_state()}
+        with open(temp_path, "wb") as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # an interrupted write keeps the previous checkpoint
+        os.replace(temp_path, path)
+    except Exception as e:
+        print("Warning: checkpoint could not be written " +
+              "({}: {})".format(type(e).__name__, e), flush=True)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+    print("Checkpoint written in {:.1f} s ({:.0f} MB)".format(
+        time.time() - start, os.path.getsize(path) / 1e6), flush=True)
+    return True
+
+
+def load_checkpoint(resultfolderpath):
+    """Load the checkpoint in a result folder.
+
+    Returns
+    -------
+    dict
+        "scenario" (name of the scenario definition), "threads",
+        "input_folder" (absolute path) and "state" of the pathway, see
+        save_checkpoint
+    """
+    resultfolderpath = os.path.abspath(resultfolderpath)
+    path = get_checkpoint_path(resultfolderpath)
+    if not os.path.isfile(path):
+        raise ValueError(
+            "No checkpoint found in '{}'".format(resultfolderpath))
+    with open(path, "rb") as f:
+        checkpoint = pickle.load(f)
+    # relative to the result folder, which can be moved before resuming
+    checkpoint["input_folder"] = os.path.join(
+        resultfolderpath, checkpoint["input_folder"])
+    return checkpoint
+
+
+def remove_checkpoint(resultfolderpath):
+    """Remove the checkpoint of a completed run."""
+    path = get_checkpoint_path(resultfolderpath)
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,94 @@
+import hashlib
+import numpy as np
+
+
+class ClusteringCache():
+    """Time series aggregation of the energy system model, which is reused
+    as long as the time series of the model do not change.
+
+    Components which were added (again) since the last clustering, e.g. new
+    stocks or components with updated parameters, are mapped into the
+    existing aggregation if a clustered component had the same time series.
+    """
+
+    def __init__(self):
+        self._settings = None
+        # hash of time series -> clustered component holding the aggregation
+        self._series = {}
+        # component name -> clustered component object
+        self._components = {}
+
+    def cluster(self, esM, **settings):
+        """Cluster the time series of esM or reuse the last clustering.
+
+        Parameters
+        ----------
+        esM : fn.EnergySystemModel
+        settings : dict
+            arguments of esM.cluster
+        """
+        components = {x: esM.getComponent(x) for x in esM.componentNames}
+        if not all(hasattr(x, "getDataForTimeSeriesAggregation")
+                   for x in components.values()):
+            esM.cluster(**settings)
+            return
+        hashes = {name: get_series_hash(x) for name, x in components.items()}
+
+        if settings == self._settings and all(
+                x is None or x in self._series for x in hashes.values()):
+            n_mapped = 0
+            for name, component in components.items():
+                if hashes[name] is None or \
+                        self._components.get(name) is component:
+                    continue
+                _copy_aggregation(self._series[hashes[name]], component)
+                self._components[name] = component
+                n_mapped += 1
+            esM.isTimeSeriesDataClustered = True
+            print("Time series unchanged, clustering is reused " +
+                  "({} components mapped)".format(n_mapped), flush=True)
+            return
+
+        esM.cluster(**settings)
+        self._settings = settings
+        self._components = components
+        self._series = {x: components[name] for name, x in hashes.items()
+                        if x is not None}
+
+
+def get_series_hash(component):
+    """Get the hash of the time series and weights of a component used by
+    the time series aggregation, None if it has no time series.
+
+    The hash contains the class of the component and the column labels
+    without the component name (time series parameter, commodity and
+    location), so only components with the same class and the same time
+    series parameters can share an aggregation.
+    """
+    data, weights = component.getDataForTimeSeriesAggregation()
+    if data is None:
+        return None
+    values = np.ascontiguousarray(data.values, dtype=float)
+    sha = hashlib.sha256(values.tobytes())
+    sha.update(str(values.shape).encode())
+    sha.update(type(component).__name__.encode())
+    sha.update(str([_strip_name(x, component.name)
+                    for x in data.columns]).encode())
+    sha.update(str([(_strip_name(x, component.name), y)
+                    for x, y in weights.items()]).encode())
+    return sha.hexdigest()
+
+
+def _strip_name(label, name):
+    # FINE labels the time series with the component name as prefix
+    label = str(label)
+    if label.startswith(name):
+        return label[len(name):]
+    return label
+
+
+def _copy_aggregation(source, target):
+    # FINE stores the aggregated data in the attributes aggregated*
+    for name, value in vars(source).items():
+        if name.startswith("aggregated"):
+            setattr(target, name, value)
@@ -2,9 +2,27 @@ import pandas as pd
 import numpy as np
 import openpyxl
 import os
+import json
+import hashlib
+import threading
+
+from nestor.utils.read_input import (ParameterFile, read_parameter_file,
+                                     read_input_table, load_cached_object,
+                                     file_hash, folder_hash)
+
+# increase if the coupling changes to invalidate the cached results
+COUPLING_VERSION = 1
 
 
 class PotentialUpdate():
+    # attributes set by prepare_data, which are stored in the input cache
+    prepared_attributes = [
+        "res_Sources", "res_Sinks", "res_Hubs", "res_Connectors",
+        "res_Transformers", "connections_helper", "groups", "timeseries",
+        "historical_data", "stock_grid_connection", "TSources",
+        "raw_group_name_mapping", "base_names", "sources_cols", "hubs_cols",
+        "connector_cols", "transformer_cols", "sinks_cols"]
+
     def __init__(self, renewable_definition, nestor_ee_path, parameter_file_path):
         self.renewable_definition = renewable_definition
         self.nestor_ee_path = nestor_ee_path
@@ -28,8 +46,28 @@ class PotentialUpdate():
         # 1. TODO check for renewables in Parameter-File!
         self.precheck_parameter_file()
 
-        # 2. Prepare data
+        # 2. Prepare data - reused from the input cache for same inputs
+        prepared = load_cached_object(
+            self.get_cache_key(), self._prepare_and_collect)
+        for name, value in prepared.items():
+            setattr(self, name, value)
+
+    def get_cache_key(self):
+        """Get the hash of all inputs of the coupling: renewables case
+        folders, renewables definition and raw parameter file."""
+        sha = hashlib.sha256()
+        sha.update("potentialupdate_{}".format(COUPLING_VERSION).encode())
+        sha.update(json.dumps(
+            self.renewable_definition, sort_keys=True).encode())
+        sha.update(file_hash(self.parameter_file_path).encode())
+        for renewable_tech in sorted(self.case_paths):
+            sha.update(renewable_tech.encode())
+            sha.update(folder_hash(self.case_paths[renewable_tech]).encode())
+        return sha.hexdigest()
+
+    def _prepare_and_collect(self):
         self.prepare_data()
+        return {name: getattr(self, name) for name in self.prepared_attributes}
 
     def precheck_parameter_file(self):
 
@@ -49,9 +87,10 @@ class PotentialUpdate():
             ee_keys.extend(check_strings[i])
 
         # Sheets
+        parameter_file = read_parameter_file(self.parameter_file_path)
         for sheet_name in ["Sources", "Hubs", "Transformers"]:
-            components = pd.read_excel(
-                self.parameter_file_path, sheet_name=sheet_name)["name"]
+            components = parameter_file.get_sheet(
+                sheet_name, index_col=None)["name"]
             ee_components_warning = [x for x in components if any(
                 [y for y in ee_keys if (y in x) and ("CO2" not in x)])]
 
@@ -71,8 +110,7 @@ class PotentialUpdate():
                     "are in pre-coupled raw parameter-file in " +
                     "sheet {}".format(sheet_name))
         # Sheet Connectors
-        connections = pd.read_excel(
-            self.parameter_file_path, sheet_name="Connectors")
+        connections = parameter_file.get_sheet("Connectors", index_col=None)
         input_ee_warning = [x for x in connections["input"] if any(
             [y for y in ee_keys if (y in x) and ("CO2" not in x)])]
         output_ee_warning = [x for x in connections["output"] if any(
@@ -112,17 +150,13 @@ class PotentialUpdate():
         self.base_names = {}
 
         # get cols for each sheet
-        self.sources_cols = list(pd.read_excel(
-            self.parameter_file_path, sheet_name="Sources").columns)
-        self.hubs_cols = list(pd.read_excel(
-            self.parameter_file_path,
-            sheet_name="Hubs").columns)
-        self.connector_cols = list(pd.read_excel(
-            self.parameter_file_path, sheet_name="Connectors").columns)
-        self.transformer_cols = list(pd.read_excel(
-            self.parameter_file_path, sheet_name="Transformers").columns)
-        self.sinks_cols = list(pd.read_excel(
-            self.parameter_file_path, sheet_name="Sinks").columns)
+        parameter_file = read_parameter_file(self.parameter_file_path)
+        self.sources_cols = list(parameter_file.sheets["Sources"].columns)
+        self.hubs_cols = list(parameter_file.sheets["Hubs"].columns)
+        self.connector_cols = list(parameter_file.sheets["Connectors"].columns)
+        self.transformer_cols = list(
+            parameter_file.sheets["Transformers"].columns)
+        self.sinks_cols = list(parameter_file.sheets["Sinks"].columns)
 
         for renewable_tech, renewable_info in self.renewable_definition.items():
             # get all groups
@@ -589,31 +623,101 @@ class PotentialUpdate():
                 self.res_Transformers[renewable_tech], book["Transformers"])
             append_rows(self.res_Sinks[renewable_tech], book["Sinks"])
 
-        name = os.path.basename(self.parameter_file_path).split(".xlsx")[
-            0]+"_processed.xlsx"
-        path = os.path.join(targetpath, name)
+        path = processed_path(self.parameter_file_path, targetpath)
         book.save(path)
         return path
 
     def update_timeseries(self, original_path, targetpath):
-        data = pd.read_csv(original_path, index_col=0)
-        for tech in self.renewable_technologies:
-            data[self.timeseries[tech].columns] = self.timeseries[tech]
-        name = os.path.basename(original_path).split(".csv")[
-            0]+"_processed.csv"
-        path = os.path.join(targetpath, name)
-        data.to_csv(path)
+        path = processed_path(original_path, targetpath)
+        self.get_timeseries(original_path).to_csv(path)
         return path
 
     def update_historical_data(self, original_path, targetpath):
-        data = pd.read_excel(original_path, index_col=0)
+        data_path = processed_path(original_path, targetpath)
+        self.get_historical_data(original_path).to_excel(data_path)
+        return data_path
+
+    def get_parameter_file(self, path):
+        """Get the parameter file with the coupled renewables in memory.
+
+        The sheets equal the sheets of the file written by
+        update_parameter_files.
+
+        Parameters
+        ----------
+        path : str
+            path of the processed parameter file
+        """
+        sheets = dict(read_parameter_file(self.parameter_file_path).sheets)
+        for sheet_name, res in [("Sources", self.res_Sources),
+                                ("Hubs", self.res_Hubs),
+                                ("Connectors", self.res_Connectors),
+                                ("Transformers", self.res_Transformers),
+                                ("Sinks", self.res_Sinks)]:
+            for renewable_tech in self.renewable_definition.keys():
+                sheets[sheet_name] = append_sheet_rows(
+                    res[renewable_tech], sheets[sheet_name])
+        return ParameterFile(path, sheets)
+
+    def get_timeseries(self, original_path):
+        data = read_input_table(original_path, index_col=0)
+        for tech in self.renewable_technologies:
+            data[self.timeseries[tech].columns] = self.timeseries[tech]
+        return data
+
+    def get_historical_data(self, original_path):
+        data = read_input_table(original_path, index_col=0)
         for tech in self.renewable_technologies:
             data[self.historical_data[tech].columns] = self.historical_data[tech]
-        name = os.path.basename(original_path).split(".xlsx")[
-            0]+"_processed.xlsx"
-        data_path = os.path.join(targetpath, name)
-        data.to_excel(data_path)
-        return data_path
+        return data
+
+    def archive(self, paths, timeseries, historical_data):
+        """Write the processed input files in a background thread.
+
+        The model runs on the data in memory, the files only document the
+        input of the run.
+
+        Parameters
+        ----------
+        paths : dict
+            paths of the processed "parameterfile", "input_profiles" and
+            "historicaldata"
+        timeseries : pd.DataFrame
+        historical_data : pd.DataFrame
+
+        Returns
+        -------
+        ArchiveThread
+            started thread, which has to be joined by the caller
+        """
+        def _write():
+            self.update_parameter_files(
+                os.path.dirname(paths["parameterfile"]))
+            timeseries.to_csv(paths["input_profiles"])
+            historical_data.to_excel(paths["historicaldata"])
+
+        thread = ArchiveThread(_write)
+        thread.start()
+        return thread
+
+
+class ArchiveThread(threading.Thread):
+    """Thread writing the processed input files, see PotentialUpdate.archive.
+
+    An error of the thread is kept in error, the thread itself does not
+    raise.
+    """
+
+    def __init__(self, write):
+        super().__init__(name="archive_processed_input")
+        self._write = write
+        self.error = None
+
+    def run(self):
+        try:
+            self._write()
+        except Exception as e:
+            self.error = e
 
 
 #############################################################
@@ -676,7 +780,37 @@ def append_rows(df: pd.DataFrame, sheet):
         sheet in Nestor parameter .xlsx data to add rows to
     """
     for index, row in df.iterrows():
-        # convert bool-value in list to string
-        append_row_values = [str(x) if type(x) == bool or type(
-            x) == np.bool_ else x for x in row]
-        sheet.append(append_row_values)
+        sheet.append(_get_row_values(row))
+
+
+def append_sheet_rows(df: pd.DataFrame, sheet: pd.DataFrame):
+    """Add rows of df to a parsed sheet of Nestor-param file.
+
+    Like append_rows the values are added by position, so the result equals
+    the sheet of the processed .xlsx file read by read_parameter_file (where
+    the bools written as strings are parsed as bools again).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+    sheet : pd.DataFrame
+        sheet as read with index_col=None
+    """
+    if len(df) == 0:
+        return sheet
+    width = min(len(df.columns), len(sheet.columns))
+    new_rows = pd.DataFrame(df.iloc[:, :width].values,
+                            columns=sheet.columns[:width])
+    return pd.concat([sheet, new_rows], ignore_index=True).infer_objects()
+
+
+def _get_row_values(row):
+    # convert bool-value in list to string
+    return [str(x) if type(x) == bool or type(x) == np.bool_ else x
+            for x in row]
+
+
+def processed_path(original_path, targetpath):
+    """Get the path of the processed version of an input file."""
+    name, extension = os.path.splitext(os.path.basename(original_path))
+    return os.path.join(targetpath, name + "_processed" + extension)
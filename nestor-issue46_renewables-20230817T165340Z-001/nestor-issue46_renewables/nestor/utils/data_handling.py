@@ -1,9 +1,11 @@
 import os
+import json
 import shutil
 import datetime
 from xml.dom import NotFoundErr
 import openpyxl
-from nestor.utils.coupling_renewables import PotentialUpdate
+from nestor.utils.coupling_renewables import PotentialUpdate, processed_path
+from nestor.utils.read_input import register_input, file_hash
 
 
 def get_raw_input_data_paths(local_mainpath, scenario_definition):
@@ -47,6 +49,44 @@ def get_raw_input_data_paths(local_mainpath, scenario_definition):
 
 def folder_creation(local_mainpath, raw_input_data_paths, scenario_definition,
                     scenariopath, GHGScenpath, optParapath):
+    paths = create_result_folder(local_mainpath, scenario_definition)
+    paths.update(create_input_folder(
+        local_mainpath, os.path.join(paths["resfolderpath"], "input"),
+        raw_input_data_paths, scenario_definition, scenariopath,
+        GHGScenpath, optParapath))
+    return paths
+
+
+def variant_folder_creation(local_mainpath, scenario_definition,
+                            scenariopath, GHGScenpath, optParapath):
+    """Create the result folder of a variant of a parameter sweep.
+
+    The variant runs on the input data of the base scenario, so only the
+    scenario definition is copied to the result folder.
+
+    Returns
+    -------
+    dict
+        paths of the result folder, see create_result_folder
+    """
+    paths = create_result_folder(local_mainpath, scenario_definition)
+    scendef_path = os.path.join(
+        paths["resfolderpath"], "input", "scenario_definition")
+    os.makedirs(scendef_path)
+    for path in [scenariopath, optParapath, GHGScenpath]:
+        shutil.copy(path, scendef_path)
+    return paths
+
+
+def create_result_folder(local_mainpath, scenario_definition):
+    """Create the result folder of a run and its temp folder.
+
+    Returns
+    -------
+    dict
+        paths of the result folder ("resfolderpath") and of the temp folder
+        ("temppath")
+    """
     # result folder path
     respath = os.path.join(local_mainpath, "Results")
 
@@ -57,19 +97,45 @@ def folder_creation(local_mainpath, raw_input_data_paths, scenario_definition,
         ' QP_' + str(scenario_definition["QP"]) +
         ' TSA_' + str(scenario_definition["typdays"]) +
         ' Name_' + str(scenario_definition["Run"]))
+    # parallel runs of the same scenario get their own folder
     resfolderpath = os.path.join(respath, resfoldername)
-    rawinput_folderpath = os.path.join(
-        resfolderpath, "input", "raw_input_data")
-    processedinput_folderpath = os.path.join(
-        resfolderpath, "input", "processed_input_data")
+    suffix = 1
+    while True:
+        try:
+            os.makedirs(resfolderpath)
+            break
+        except FileExistsError:
+            suffix += 1
+            resfolderpath = os.path.join(
+                respath, "{} ({})".format(resfoldername, suffix))
+    resfoldername = os.path.basename(resfolderpath)
     temppath = os.path.join(resfolderpath, 'temp')
-    scendef_path = os.path.join(
-        resfolderpath, 'input', 'scenario_definition')
     print(resfoldername, flush=True)
 
     # create Result Folder
-    os.makedirs(resfolderpath)
     os.makedirs(temppath)
+    return {"resfolderpath": resfolderpath, "temppath": temppath}
+
+
+def create_input_folder(local_mainpath, input_folderpath,
+                        raw_input_data_paths, scenario_definition,
+                        scenariopath, GHGScenpath, optParapath):
+    """Link the input files to input_folderpath and process the input data.
+
+    The processed input data is kept in memory (see
+    read_input.register_input) and written to input_folderpath in the
+    background.
+
+    Returns
+    -------
+    dict
+        paths of the input data and the thread writing the processed input
+        files ("archive", None if they are not written)
+    """
+    rawinput_folderpath = os.path.join(input_folderpath, "raw_input_data")
+    processedinput_folderpath = os.path.join(
+        input_folderpath, "processed_input_data")
+    scendef_path = os.path.join(input_folderpath, 'scenario_definition')
     os.makedirs(rawinput_folderpath)
     os.makedirs(processedinput_folderpath)
     os.makedirs(scendef_path)
@@ -83,52 +149,47 @@ def folder_creation(local_mainpath, raw_input_data_paths, scenario_definition,
 
     ###
     paths = {}
-    paths["temppath"] = temppath
-    paths["resfolderpath"] = resfolderpath
+    # input files are stored once for all runs and linked to result folder
+    input_store = InputStore(
+        os.path.join(local_mainpath, "Results", "input_store"),
+        os.path.dirname(input_folderpath))
 
     # 1.1. copy scenario definition
-    shutil.copy(scenariopath, scendef_path)
-    shutil.copy(optParapath, scendef_path)
-    shutil.copy(GHGScenpath, scendef_path)
+    input_store.add_file(scenariopath, scendef_path)
+    input_store.add_file(optParapath, scendef_path)
+    input_store.add_file(GHGScenpath, scendef_path)
 
     # 1.2. Forced Decomissioning
-    shutil.copy(
+    input_store.add_file(
         raw_input_data_paths["forceddecommissioningdata"],
         raw_input_paths_resfolder["forced_decomissioning"])
-    paths["forceddecommissioningdata"] = \
-        os.path.join(processedinput_folderpath,
-                     scenario_definition["forceddecommissioningdataname"])
-    shutil.copy(
+    paths["forceddecommissioningdata"] = input_store.add_file(
         raw_input_data_paths["forceddecommissioningdata"],
         processedinput_folderpath)
 
     # 1.3 Heat Load
-    shutil.copy(raw_input_data_paths["heatload"],
-                raw_input_paths_resfolder["timeseries"])
-    paths["heatload"] = os.path.join(
-        processedinput_folderpath, scenario_definition["heatloaddataname"])
-    shutil.copy(raw_input_data_paths["heatload"],
-                processedinput_folderpath)
+    input_store.add_file(raw_input_data_paths["heatload"],
+                         raw_input_paths_resfolder["timeseries"])
+    paths["heatload"] = input_store.add_file(
+        raw_input_data_paths["heatload"], processedinput_folderpath)
 
     # 1.4 Output profiles
-    shutil.copy(raw_input_data_paths["output_profiles"],
-                raw_input_paths_resfolder["timeseries"])
-    paths["output_profiles"] = os.path.join(
-        processedinput_folderpath, scenario_definition["outputprofiledataname"])
-    shutil.copy(raw_input_data_paths["output_profiles"],
-                processedinput_folderpath)
+    input_store.add_file(raw_input_data_paths["output_profiles"],
+                         raw_input_paths_resfolder["timeseries"])
+    paths["output_profiles"] = input_store.add_file(
+        raw_input_data_paths["output_profiles"], processedinput_folderpath)
 
     # 1.5 Parameterfile - only raw data
-    shutil.copy(raw_input_data_paths["parameterfile"],
-                os.path.join(raw_input_paths_resfolder["parameter"]))
+    input_store.add_file(raw_input_data_paths["parameterfile"],
+                         raw_input_paths_resfolder["parameter"])
 
     # 1.6 Historical data - only raw data
-    shutil.copy(raw_input_data_paths["historicaldata"],
-                raw_input_paths_resfolder["historical_data"])
+    input_store.add_file(raw_input_data_paths["historicaldata"],
+                         raw_input_paths_resfolder["historical_data"])
 
     # 1.7 input profiles - only raw data
-    shutil.copy(raw_input_data_paths["input_profiles"],
-                raw_input_paths_resfolder["timeseries"])
+    input_store.add_file(raw_input_data_paths["input_profiles"],
+                         raw_input_paths_resfolder["timeseries"])
 
     # 1.8 potentials - raw
     for renewable_tech, renewable_info in scenario_definition["renewables"].items():
@@ -138,32 +199,146 @@ def folder_creation(local_mainpath, raw_input_data_paths, scenario_definition,
         _re_new_path = os.path.join(
             raw_input_paths_resfolder["renewables"], renewable_tech,
             renewable_info["nestor_ee_case"])
-        # os.makedirs(_re_new_path)
-        shutil.copytree(_re_old_path, _re_new_path)
+        input_store.add_folder(_re_old_path, _re_new_path)
+
+    # 1.9 hashes of all input files
+    input_store.write_manifest(
+        os.path.join(input_folderpath, "manifest.json"))
 
     # PROCESS PARAMETER, HISTORICAL DATA AND INPUT PROFILES
     # initialize Potential coupling
-    _path = os.path.join(
-        processedinput_folderpath, scenario_definition["databasename"])
     potential_data = PotentialUpdate(
         renewable_definition=scenario_definition["renewables"],
         nestor_ee_path=raw_input_data_paths["nestor_ee_DB"],
         parameter_file_path=raw_input_data_paths["parameterfile"])
+    # processed data is kept in memory and read from there by Nestor
     # 2.1 Pameterfile processed
-    paths["parameterfile"] = potential_data.update_parameter_files(
-        targetpath=processedinput_folderpath
-    )
+    paths["parameterfile"] = processed_path(
+        raw_input_data_paths["parameterfile"], processedinput_folderpath)
+    register_input(paths["parameterfile"],
+                   potential_data.get_parameter_file(paths["parameterfile"]))
     # 2.2 Input profiles processed
-    paths["input_profiles"] = potential_data.update_timeseries(
-        raw_input_data_paths["input_profiles"],
-        targetpath=processedinput_folderpath)
+    paths["input_profiles"] = processed_path(
+        raw_input_data_paths["input_profiles"], processedinput_folderpath)
+    timeseries = potential_data.get_timeseries(
+        raw_input_data_paths["input_profiles"])
+    register_input(paths["input_profiles"], timeseries.reset_index())
     # 2.3 historical data processed
-    paths["historicaldata"] = potential_data.update_historical_data(
-        raw_input_data_paths["historicaldata"],
-        targetpath=processedinput_folderpath)
+    paths["historicaldata"] = processed_path(
+        raw_input_data_paths["historicaldata"], processedinput_folderpath)
+    historical_data = potential_data.get_historical_data(
+        raw_input_data_paths["historicaldata"])
+    register_input(paths["historicaldata"], historical_data.reset_index())
+    # 2.4 write processed files to result folder in the background
+    paths["archive"] = None
+    if scenario_definition.get("archive_processed_input", True):
+        paths["archive"] = potential_data.archive(
+            paths, timeseries, historical_data)
     return paths
 
 
+def get_processed_input_paths(local_mainpath, input_folderpath,
+                              scenario_definition):
+    """Get the paths of the processed input data in the input folder of a
+    run, see create_input_folder.
+
+    Returns
+    -------
+    dict
+        paths of the input data
+    """
+    raw_input_data_paths = get_raw_input_data_paths(
+        local_mainpath, scenario_definition)
+    processedinput_folderpath = os.path.join(
+        input_folderpath, "processed_input_data")
+    paths = {}
+    for name in ["parameterfile", "input_profiles", "historicaldata"]:
+        paths[name] = processed_path(
+            raw_input_data_paths[name], processedinput_folderpath)
+    for name in ["forceddecommissioningdata", "heatload", "output_profiles"]:
+        paths[name] = os.path.join(
+            processedinput_folderpath,
+            os.path.basename(raw_input_data_paths[name]))
+    missing = [x for x in paths.values() if not os.path.isfile(x)]
+    if missing:
+        raise ValueError(
+            "Processed input data {} not found, ".format(missing) +
+            "the run was not started with 'archive_processed_input'")
+    return paths
+
+
+class InputStore():
+    """Content-addressed store of the input files of all result folders.
+
+    Every unique file is stored once, named by the hash of its content. The
+    result folder gets hardlinks to the stored files and a manifest with the
+    hashes of its input files.
+    """
+
+    def __init__(self, store_path, resfolderpath):
+        self.store_path = store_path
+        self.resfolderpath = resfolderpath
+        self.manifest = {}
+        self._hashes = {}
+
+    def add_file(self, file_path, target_folder):
+        """Link file to target folder and return the path of the link."""
+        key = (os.path.abspath(file_path), os.path.getmtime(file_path))
+        if key not in self._hashes:
+            self._hashes[key] = file_hash(file_path)
+        digest = self._hashes[key]
+
+        stored_path = os.path.join(
+            self.store_path, digest[:2],
+            digest + os.path.splitext(file_path)[1])
+        if not self._is_stored(stored_path, digest):
+            os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+            # write to temp file first, parallel runs may store same file
+            temp_path = "{}.{}.tmp".format(stored_path, os.getpid())
+            shutil.copyfile(file_path, temp_path)
+            # stored files are shared by all links and must not be changed
+            os.chmod(temp_path, 0o444)
+            os.replace(temp_path, stored_path)
+            self._hashes[(stored_path, os.path.getmtime(stored_path))] = \
+                digest
+
+        target_path = os.path.join(target_folder, os.path.basename(file_path))
+        if os.path.isfile(target_path):
+            # same file added twice (e.g. input and output profiles)
+            os.remove(target_path)
+        try:
+            os.link(stored_path, target_path)
+        except OSError:
+            # e.g. file system without hardlinks
+            shutil.copyfile(stored_path, target_path)
+        self.manifest[os.path.relpath(target_path, self.resfolderpath)] = \
+            digest
+        return target_path
+
+    def _is_stored(self, stored_path, digest):
+        # the content is checked, as a stored file may have been made
+        # writable and changed through a link of a result folder
+        if not os.path.isfile(stored_path):
+            return False
+        key = (stored_path, os.path.getmtime(stored_path))
+        if key not in self._hashes:
+            self._hashes[key] = file_hash(stored_path)
+        return self._hashes[key] == digest
+
+    def add_folder(self, folder_path, target_folder):
+        """Link all files of folder to target folder like shutil.copytree."""
+        for root, dirs, files in os.walk(folder_path):
+            target_root = os.path.join(
+                target_folder, os.path.relpath(root, folder_path))
+            os.makedirs(target_root, exist_ok=True)
+            for name in sorted(files):
+                self.add_file(os.path.join(root, name), target_root)
+
+    def write_manifest(self, path):
+        with open(path, "w") as f:
+            json.dump(self.manifest, f, indent=4, sort_keys=True)
+
+
 def create_evaluation_file(resultfolderpath, resultfilepath,
                            templateEvaluationPath, scenario_definition):
     wb_update = openpyxl.load_workbook(resultfilepath)
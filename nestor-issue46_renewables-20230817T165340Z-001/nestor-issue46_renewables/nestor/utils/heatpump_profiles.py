@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+
+class HeatPumpProfiles():
+    """Input conversion profiles of heat pumps, computed for all heat pumps
+    at once and cached by (efficiency, T_hot, T_limit, temperature series).
+
+    Parameters
+    ----------
+    temperatures : dict
+        name -> temperature time series of the heat source
+    profile_pool : ProfilePool
+        pool the profiles are shared through
+    """
+
+    def __init__(self, temperatures, profile_pool):
+        self.temperatures = temperatures
+        self.profile_pool = profile_pool
+        self._profiles = {}
+
+    def prepare(self, heatpumps, temperature_names):
+        """Compute the profiles of all heat pumps not in the cache yet.
+
+        Parameters
+        ----------
+        heatpumps : pd.DataFrame
+            heat pumps with the columns efficiency, T_hot and T_limit
+        temperature_names : list of str
+            name of the temperature series of each heat pump
+        """
+        missing = {}
+        for params, name in zip(
+                heatpumps[["efficiency", "T_hot", "T_limit"]].itertuples(
+                    index=False), temperature_names):
+            key = _get_key(params.efficiency, params.T_hot, params.T_limit,
+                           name)
+            if key not in self._profiles:
+                missing.setdefault(name, {})[key] = params
+
+        for name, keys in missing.items():
+            temperature = self.temperatures[name]
+            params = np.array([tuple(x) for x in keys.values()], dtype=float)
+            values = get_heatpump_profiles(
+                params[:, 0], params[:, 1], params[:, 2], temperature.values)
+            for key, row in zip(keys, values):
+                self._profiles[key] = self.profile_pool.intern(
+                    pd.Series(row, copy=False))
+
+    def get(self, efficiency, T_hot, T_limit, temperature_name):
+        """Get the input conversion profile of a heat pump."""
+        key = _get_key(efficiency, T_hot, T_limit, temperature_name)
+        if key not in self._profiles:
+            self.prepare(pd.DataFrame(
+                [[efficiency, T_hot, T_limit]],
+                columns=["efficiency", "T_hot", "T_limit"]),
+                [temperature_name])
+        return self._profiles[key]
+
+    def get_conversion(self, efficiency, T_hot, T_limit, temperature_name,
+                       input_name, output_name):
+        """Get the commodity conversion factors of a heat pump."""
+        return {output_name: self.profile_pool.constant(1),
+                input_name: self.get(efficiency, T_hot, T_limit,
+                                     temperature_name)}
+
+
+def get_heatpump_profiles(efficiency, T_hot, T_limit, T_cold):
+    """Get the input conversion profiles of heat pumps based on the Carnot
+    efficiency. Below T_limit the heat pumps are not operated.
+
+    Parameters
+    ----------
+    efficiency, T_hot, T_limit : np.ndarray
+        parameters of the heat pumps (n_heatpumps)
+    T_cold : np.ndarray
+        temperature of the heat source (n_timesteps)
+
+    Returns
+    -------
+    np.ndarray
+        n_heatpumps x n_timesteps
+    """
+    efficiency = np.asarray(efficiency, dtype=float)[:, None]
+    T_hot = np.asarray(T_hot, dtype=float)[:, None]
+    T_limit = np.asarray(T_limit, dtype=float)[:, None]
+    T_cold = np.asarray(T_cold, dtype=float)[None, :]
+    with np.errstate(divide="ignore"):
+        profiles = -1 / (efficiency * (T_hot + 273.15) / (T_hot - T_cold))
+    profiles[np.broadcast_to(T_cold < T_limit, profiles.shape)] = 0.0
+    return profiles
+
+
+def _get_key(efficiency, T_hot, T_limit, temperature_name):
+    return (float(efficiency), float(T_hot), float(T_limit), temperature_name)
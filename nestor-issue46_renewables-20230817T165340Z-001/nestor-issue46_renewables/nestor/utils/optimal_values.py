@@ -0,0 +1,49 @@
+class OptimalValues():
+    """Optimal values of the energy system model, fetched once per modeling
+    class and variable and shared by all lookups of the components.
+
+    The values belong to the last solve, the cache is cleared after every
+    optimization.
+    """
+
+    def __init__(self):
+        # (modeling class, variable) -> values of all components
+        self._values = {}
+
+    def clear(self):
+        """Drop the values of the last solve."""
+        self._values = {}
+
+    def restore(self, values):
+        """Use the values of an earlier solve until the next clear, e.g. of a
+        checkpoint.
+
+        Parameters
+        ----------
+        values : dict
+            (modeling class, variable) -> values of all components
+        """
+        self._values = dict(values)
+
+    def get(self, esM, modeling_class, name='capacityVariablesOptimum'):
+        """Get the optimal values of a variable of a modeling class.
+
+        Parameters
+        ----------
+        esM : fn.EnergySystemModel
+        modeling_class : str
+            name of the modeling class, e.g. 'ConversionModel'
+        name : str
+            name of the variable, e.g. 'operationVariablesOptimum'
+
+        Returns
+        -------
+        pd.DataFrame
+            values of all components of the modeling class. The data frame
+            of FINE is returned and not a copy.
+        """
+        key = (modeling_class, name)
+        if key not in self._values:
+            self._values[key] = esM.componentModelingDict[
+                modeling_class].getOptimalValues(name=name)['values']
+        return self._values[key]
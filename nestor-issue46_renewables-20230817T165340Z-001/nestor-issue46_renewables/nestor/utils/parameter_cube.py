@@ -0,0 +1,173 @@
+import re
+import numpy as np
+import pandas as pd
+
+
+class ParameterCube():
+    """Year-dependent parameters of all components.
+
+    The values are stored as array with the shape (components, parameters,
+    years). Parameters which are not given for a component are NaN. A name
+    given several times in the table of a parameter has a row for each
+    occurrence, like the concatenated tables.
+    """
+
+    def __init__(self, values, components, parameters, years, rows):
+        self.values = values
+        self.components = components
+        self.parameters = parameters
+        self.years = years
+        # rows with values for each parameter in the order of its table
+        self.rows = rows
+
+        # first row of each component
+        self._component_pos = {}
+        for i, x in enumerate(components):
+            self._component_pos.setdefault(x, i)
+        self._parameter_pos = {x: i for i, x in enumerate(parameters)}
+        self._year_pos = {x: i for i, x in enumerate(years)}
+
+    def at_year(self, year):
+        """Get all parameters of all components in year."""
+        return pd.DataFrame(self.values[:, :, self._year_pos[year]],
+                            index=self.components, columns=self.parameters)
+
+    def get_parameter(self, parameter):
+        """Get a parameter of its components over all years."""
+        rows = self.rows[parameter]
+        return pd.DataFrame(
+            self.values[rows, self._parameter_pos[parameter], :],
+            index=[self.components[x] for x in rows], columns=self.years)
+
+    def get_value(self, component, parameter, year):
+        """Get a parameter of the (first) component of that name."""
+        return self.values[self._component_pos[component],
+                           self._parameter_pos[parameter],
+                           self._year_pos[year]]
+
+
+def build_parameter_cube(tables, years):
+    """Interpolate the year-dependent parameters of all components at once.
+
+    Parameters
+    ----------
+    tables : dict
+        parameter name -> (pd.DataFrame indexed by component, prefix of the
+        columns with values of the support years)
+    years : list of int
+        years to interpolate, the support years are always included
+
+    Returns
+    -------
+    ParameterCube
+    """
+    support = {parameter: get_support_columns(df, prefix)
+               for parameter, (df, prefix) in tables.items()}
+    support_years = sorted(set(
+        year for columns in support.values() for year in columns))
+    all_years = sorted(set(support_years) | set(years))
+
+    # one row per component and parameter, NaN for missing support years
+    blocks = []
+    # (component, occurrence in the table) -> cube row
+    components = {}
+    rows = {}
+    row_parameters = []
+    for parameter_pos, (parameter, (df, prefix)) in enumerate(tables.items()):
+        block = np.full((len(df), len(support_years)), np.nan)
+        for year, column in support[parameter].items():
+            block[:, support_years.index(year)] = df[column].astype(float)
+        blocks.append(block)
+        rows[parameter] = []
+        occurrences = {}
+        for component in df.index:
+            key = (component, occurrences.get(component, 0))
+            occurrences[component] = key[1] + 1
+            components.setdefault(key, len(components))
+            rows[parameter].append(components[key])
+            row_parameters.append(parameter_pos)
+
+    values = interpolate_years(
+        np.vstack(blocks), support_years, all_years)
+    cube = np.full((len(components), len(tables), len(all_years)), np.nan)
+    cube[[x for parameter in tables for x in rows[parameter]],
+         row_parameters, :] = values
+    return ParameterCube(
+        cube, [x for x, occurrence in components], list(tables), all_years,
+        rows)
+
+
+def get_support_columns(df, prefix):
+    """Get the columns of df with values for support years.
+
+    The columns are named prefix + year with four digits or two digits for
+    years after 2000, e.g. 'capex30' or 'cost_scale2030'. Without prefix
+    only four digit years are support years, e.g. '2030'.
+
+    Returns
+    -------
+    dict
+        year -> column name, sorted by year
+    """
+    if prefix:
+        pattern = re.compile(
+            r"^{}(\d{{2}}|\d{{4}})$".format(re.escape(prefix)))
+    else:
+        pattern = re.compile(r"^(\d{4})$")
+    columns = {}
+    for column in df.columns:
+        match = pattern.match(str(column))
+        if match:
+            year = int(match.group(1))
+            columns[year + 2000 if year < 100 else year] = column
+    return dict(sorted(columns.items()))
+
+
+def interpolate_years(values, support_years, years):
+    """Interpolate linearly between support years for all rows at once.
+
+    NaN values are skipped. Like pd.DataFrame.interpolate(axis=1), years
+    before the first value of a row are NaN and years after the last value
+    get the last value.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        values of the support years (rows x support years)
+    support_years : list of int
+        sorted support years
+    years : list of int
+
+    Returns
+    -------
+    np.ndarray
+        rows x years
+    """
+    x = np.asarray(support_years, dtype=float)
+    y = np.asarray(years, dtype=float)
+    n_support = len(x)
+    if values.shape[0] == 0 or n_support == 0:
+        return np.full((values.shape[0], len(y)), np.nan)
+
+    valid = ~np.isnan(values)[:, :, None]
+    position = np.arange(n_support)[None, :, None]
+    # last valid support year before and first one after each year
+    left = np.where(valid & (x[None, :, None] <= y[None, None, :]),
+                    position, -1).max(axis=1)
+    right = np.where(valid & (x[None, :, None] >= y[None, None, :]),
+                     position, n_support).min(axis=1)
+    before_first = left < 0
+    after_last = right == n_support
+    left = np.where(before_first, 0, left)
+    right = np.where(after_last, left, right)
+
+    x_left = x[left]
+    x_right = x[right]
+    v_left = np.take_along_axis(values, left, axis=1)
+    v_right = np.take_along_axis(values, right, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(x_right > x_left,
+                          (y[None, :] - x_left) / (x_right - x_left), 0)
+    result = v_left + weight * (v_right - v_left)
+    result[before_first] = np.nan
+    return result
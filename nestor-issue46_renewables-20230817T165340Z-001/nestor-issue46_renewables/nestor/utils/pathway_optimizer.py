@@ -0,0 +1,116 @@
+import time
+import pyomo.environ as pyomo
+
+
+class PathwayOptimizer():
+    """Optimization of the energy system model over the model years, which
+    keeps the solution of the previous year for warm starts.
+
+    The optimization problem is declared and solved in two steps, the time
+    of both is printed. The Pyomo model is declared again every year, as
+    FINE builds costs, bounds and the CO2 limit into it as constants and
+    offers neither mutable parameters nor adding components to a declared
+    model.
+
+    Parameters
+    ----------
+    warmstart : bool
+        start the solver from the solution of the previous optimization
+    """
+
+    def __init__(self, warmstart=False):
+        self.warmstart = warmstart
+        # variable name -> index -> value of the last solution
+        self._solution = None
+
+    def optimize(self, esM, timeSeriesAggregation, solver,
+                 optimizationSpecs, threads=None):
+        """Declare and solve the optimization problem of esM.
+
+        Parameters
+        ----------
+        threads : int or None
+            solver threads, None for the default of FINE
+        """
+        start = time.time()
+        esM.declareOptimizationProblem(
+            timeSeriesAggregation=timeSeriesAggregation)
+        print("Optimization problem declared in " +
+              "{:.1f} s".format(time.time() - start), flush=True)
+
+        options = {}
+        if self.warmstart and self._solution is not None:
+            if is_warm_start_capable(solver):
+                n_values = set_variable_values(esM.pyM, self._solution)
+                print("Warm start with {} values of the ".format(n_values) +
+                      "previous solution", flush=True)
+                if n_values > 0:
+                    options["warmstart"] = True
+            else:
+                print("Solver '{}' does not support warm ".format(solver) +
+                      "starts, starting cold", flush=True)
+
+        if threads is not None:
+            options["threads"] = threads
+
+        start = time.time()
+        esM.optimize(declaresOptimizationProblem=False,
+                     timeSeriesAggregation=timeSeriesAggregation,
+                     solver=solver, optimizationSpecs=optimizationSpecs,
+                     **options)
+        print("Optimization problem solved in " +
+              "{:.1f} s".format(time.time() - start), flush=True)
+        if self.warmstart:
+            self._solution = get_variable_values(esM.pyM)
+
+
+def is_warm_start_capable(solver):
+    """Check if Pyomo can pass start values to the solver."""
+    try:
+        return bool(pyomo.SolverFactory(solver).warm_start_capable())
+    except Exception:
+        return False
+
+
+def get_variable_values(pyM):
+    """Get the values of all variables of a solved Pyomo model.
+
+    Returns
+    -------
+    dict
+        variable name -> index -> value
+    """
+    values = {}
+    for var in pyM.component_objects(pyomo.Var, active=True):
+        values[var.name] = {index: x.value for index, x in var.items()
+                            if x.value is not None}
+    return values
+
+
+def set_variable_values(pyM, values):
+    """Set start values of the variables of pyM, which exist in values.
+
+    Variables and indices of components which were added since values were
+    taken, e.g. new stocks, keep no start value.
+
+    Returns
+    -------
+    int
+        number of variables with start value
+    """
+    n_values = 0
+    for var in pyM.component_objects(pyomo.Var, active=True):
+        var_values = values.get(var.name)
+        if not var_values:
+            continue
+        for index, x in var.items():
+            if index in var_values and not x.fixed:
+                value = var_values[index]
+                # start values have to be within the bounds of the new year
+                if x.lb is not None:
+                    value = max(value, x.lb)
+                if x.ub is not None:
+                    value = min(value, x.ub)
+                x.value = value
+                n_values += 1
+    return n_values
@@ -0,0 +1,58 @@
+import hashlib
+import numpy as np
+import pandas as pd
+
+
+class ProfilePool():
+    """Pool of read-only profiles shared by the components of a network.
+
+    Constant and repeated profiles are built once and the same series is
+    passed to every component using it.
+
+    Parameters
+    ----------
+    length : int
+        number of time steps of the constant profiles
+    """
+
+    def __init__(self, length=8760):
+        self.length = length
+        self._profiles = {}
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def constant(self, value):
+        """Get the constant profile of value."""
+        key = ("constant", value)
+        if key not in self._profiles:
+            self._profiles[key] = pd.Series(
+                _read_only(np.full(self.length, value)), copy=False)
+        return self._profiles[key]
+
+    def intern(self, profile):
+        """Get the pooled profile with the values and index of profile.
+
+        Parameters
+        ----------
+        profile : pd.Series
+        """
+        values = np.ascontiguousarray(profile.values)
+        sha = hashlib.sha1(values.tobytes())
+        sha.update(values.dtype.str.encode())
+        if not isinstance(profile.index, pd.RangeIndex) or \
+                profile.index.start != 0 or profile.index.step != 1:
+            sha.update(pd.util.hash_pandas_object(
+                profile.index, index=False).values.tobytes())
+        key = ("profile", len(values), sha.hexdigest())
+        if key not in self._profiles:
+            self._profiles[key] = pd.Series(
+                _read_only(values), index=profile.index, copy=False)
+        return self._profiles[key]
+
+
+def _read_only(values):
+    # shared by several components, writing to it would change all of them
+    values = values.view()
+    values.flags.writeable = False
+    return values
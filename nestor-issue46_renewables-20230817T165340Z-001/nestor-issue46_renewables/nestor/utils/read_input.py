@@ -0,0 +1,311 @@
+import os
+import pickle
+import hashlib
+import numpy as np
+import pandas as pd
+
+# increase if the parsing of input files changes to invalidate the cache
+LOADER_VERSION = 2
+INPUT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "input_cache")
+
+
+class ParameterFile():
+    """All sheets of a Nestor parameter file, parsed in a single pass."""
+
+    def __init__(self, path, sheets):
+        self.path = path
+        self.sheets = sheets
+
+    def get_sheet(self, sheet_name, index_col=0, usecols=None):
+        """Return a copy of a sheet like pd.read_excel would.
+
+        Parameters
+        ----------
+        sheet_name : str
+        index_col : int, str or None
+            position or name of the column used as index
+        usecols : list of int or None
+            positions of the columns to keep
+        """
+        df = self.sheets[sheet_name].copy()
+        if usecols is not None:
+            df = df.iloc[:, [x for x in usecols if x < len(df.columns)]]
+        return _set_index(df, index_col)
+
+
+_parameter_files = {}
+_registered_inputs = {}
+
+
+def register_input(path, data):
+    """Use data as content of the input file at path.
+
+    Processed input data is passed to all readers of this module without
+    writing and parsing the file first.
+
+    Parameters
+    ----------
+    path : str
+        path of the input file, which does not need to exist
+    data : ParameterFile or pd.DataFrame
+        parameter file or table as read with index_col=None
+    """
+    _registered_inputs[os.path.abspath(path)] = data
+
+
+def clear_registered_inputs():
+    """Release the input data held in memory, see register_input."""
+    _registered_inputs.clear()
+
+
+def is_registered_input(path):
+    """Check if the data of path is held in memory."""
+    return os.path.abspath(path) in _registered_inputs
+
+
+def read_parameter_file(path, cache_dir=INPUT_CACHE_DIR):
+    """Get the parsed parameter file of path.
+
+    The workbook is parsed once and shared by every consumer as long as the
+    file is not modified.
+
+    Parameters
+    ----------
+    path : str
+        path to the parameter file (.xlsx)
+    cache_dir : str or None
+        folder of the input cache, None to always parse the file
+    """
+    if is_registered_input(path):
+        return _registered_inputs[os.path.abspath(path)]
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    if key not in _parameter_files:
+        sheets = load_cached(
+            path, lambda x: _parse_bools(pd.read_excel(x, sheet_name=None)),
+            tag="parameterfile", cache_dir=cache_dir)
+        _parameter_files[key] = ParameterFile(path, sheets)
+    return _parameter_files[key]
+
+
+def read_input_table(path, index_col=0, cache_dir=INPUT_CACHE_DIR):
+    """Read a .csv file or the first sheet of a .xlsx file via the cache.
+
+    Parameters
+    ----------
+    path : str
+    index_col : int, str or None
+    cache_dir : str or None
+        folder of the input cache, None to always parse the file
+    """
+    if is_registered_input(path):
+        return _set_index(
+            _registered_inputs[os.path.abspath(path)].copy(), index_col)
+    if path.endswith(".csv"):
+        def loader(x):
+            return pd.read_csv(x, index_col=index_col)
+    else:
+        def loader(x):
+            return pd.read_excel(x, index_col=index_col)
+    return load_cached(path, loader, tag="table_{}".format(index_col),
+                       cache_dir=cache_dir)
+
+
+class ProfileStore():
+    """Profiles of a timeseries file as one float array with column index.
+
+    Every profile is a contiguous row of the (memory-mapped) array, so
+    components get views on the profiles instead of copies.
+    """
+
+    def __init__(self, values, columns, index):
+        self.values = values
+        self.columns = {name: i for i, name in enumerate(columns)}
+        self.index = index
+
+    def __getitem__(self, name):
+        if name not in self.columns:
+            raise KeyError("Profile '{}' was not read from the ".format(name) +
+                           "profile file.")
+        return pd.Series(self.values[self.columns[name]], index=self.index,
+                         name=name, copy=False)
+
+    def __contains__(self, name):
+        return name in self.columns
+
+
+def read_profiles(path, columns=None, decimals=4, cache_dir=INPUT_CACHE_DIR):
+    """Read a profile .csv file as ProfileStore.
+
+    The profiles are rounded once and written to a memory-mapped .npy file
+    in the input cache, which is shared by all runs with the same file.
+
+    Parameters
+    ----------
+    path : str
+        path to the profile file (.csv)
+    columns : list of str or None
+        names of the profiles to read, None to read all profiles
+    decimals : int or None
+        number of decimals the profiles are rounded to, None to keep values
+    cache_dir : str or None
+        folder of the input cache, None to keep the profiles in memory
+    """
+    if columns is not None:
+        columns = set(columns)
+    if is_registered_input(path):
+        data = _set_index(_registered_inputs[os.path.abspath(path)], 0)
+        if columns is not None:
+            data = data[[x for x in data.columns if x in columns]]
+        return ProfileStore(*_profile_values(data, decimals))
+
+    usecols = None
+    if columns is not None:
+        # positions of the index and of the requested profiles in the file
+        header = pd.read_csv(path, index_col=0, nrows=0)
+        usecols = [0] + [i + 1 for i, name in enumerate(header.columns)
+                         if name in columns]
+
+    def _read_values():
+        data = pd.read_csv(path, index_col=0, usecols=usecols)
+        return _profile_values(data, decimals)
+
+    if cache_dir is None:
+        return ProfileStore(*_read_values())
+
+    key = _cache_key(path, "profiles_{}_{}".format(decimals, usecols))
+    array_path = os.path.join(cache_dir, key + ".npy")
+    meta_path = os.path.join(cache_dir, key + ".pkl")
+    if not (os.path.isfile(array_path) and os.path.isfile(meta_path)):
+        values, columns, index = _read_values()
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_atomic(array_path, lambda f: np.save(f, values))
+        _write_atomic(meta_path, lambda f: pickle.dump(
+            {"columns": columns, "index": index}, f,
+            protocol=pickle.HIGHEST_PROTOCOL))
+
+    # copy-on-write mapping: the file is never modified by the model
+    values = np.load(array_path, mmap_mode="c")
+    with open(meta_path, "rb") as f:
+        meta = pickle.load(f)
+    return ProfileStore(values, meta["columns"], meta["index"])
+
+
+def load_cached(path, loader, tag, cache_dir=INPUT_CACHE_DIR):
+    """Load the parsed data of a file from the cache or parse and store it.
+
+    The cache key is the hash of the file content, the loader version and
+    the tag, so that changed inputs are parsed again.
+
+    Parameters
+    ----------
+    path : str
+        path to the input file
+    loader : callable
+        function parsing the file at path
+    tag : str
+        identifier of the kind of parsing (e.g. the index column)
+    cache_dir : str or None
+        folder of the input cache, None to always parse the file
+    """
+    if cache_dir is None:
+        return loader(path)
+    return load_cached_object(_cache_key(path, tag), lambda: loader(path),
+                              cache_dir=cache_dir)
+
+
+def load_cached_object(key, builder, cache_dir=INPUT_CACHE_DIR):
+    """Load an object from the cache or build and store it.
+
+    Parameters
+    ----------
+    key : str
+        hash of everything the object depends on
+    builder : callable
+        function without arguments creating the object
+    cache_dir : str or None
+        folder of the input cache, None to always build the object
+    """
+    if cache_dir is None:
+        return builder()
+
+    cache_path = os.path.join(cache_dir, key + ".pkl")
+    if os.path.isfile(cache_path):
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+
+    data = builder()
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_atomic(cache_path, lambda f: pickle.dump(
+        data, f, protocol=pickle.HIGHEST_PROTOCOL))
+    return data
+
+
+def file_hash(path):
+    """Get the sha256 hash of the content of a file."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def folder_hash(path):
+    """Get the sha256 hash of the names and contents of all files in a
+    folder."""
+    sha = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            sha.update(os.path.relpath(file_path, path).encode())
+            sha.update(file_hash(file_path).encode())
+    return sha.hexdigest()
+
+
+def _set_index(df, index_col):
+    if index_col is not None:
+        if isinstance(index_col, int):
+            index_col = df.columns[index_col]
+        df = df.set_index(index_col)
+    return df
+
+
+def _parse_bools(sheets):
+    # the bools of the coupled renewables are written as strings, which
+    # pandas below 3 parses as bools again, do the same on newer versions
+    for df in sheets.values():
+        for column in df.columns:
+            values = df[column].dropna()
+            if len(values) == 0 or pd.api.types.is_numeric_dtype(values):
+                continue
+            if values.map(_is_bool).all():
+                df[column] = df[column].map(
+                    lambda x: x == "True" if isinstance(x, str) else x)
+    return sheets
+
+
+def _is_bool(x):
+    if isinstance(x, str):
+        return x in ["True", "False"]
+    return isinstance(x, (bool, np.bool_))
+
+
+def _profile_values(data, decimals):
+    values = data.values.T.astype(float)
+    if decimals is not None:
+        values = np.round(values, decimals)
+    return np.ascontiguousarray(values), list(data.columns), data.index
+
+
+def _cache_key(path, tag):
+    return hashlib.sha256("{}_{}_{}".format(
+        file_hash(path), LOADER_VERSION, tag).encode()).hexdigest()
+
+
+def _write_atomic(path, write):
+    # write to temp file first, parallel runs may access the same cache
+    temp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(temp_path, "wb") as f:
+        write(f)
+    os.replace(temp_path, path)
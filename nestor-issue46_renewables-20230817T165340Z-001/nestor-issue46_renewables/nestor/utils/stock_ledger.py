@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+
+class StockLedger():
+    """Vintage accounting of the components over the transformation pathway,
+    kept in memory and shared by the steps of every model year.
+
+    The tables are float data frames (year x component):
+
+    - commission: capacity commissioned in a year
+    - decommission: capacity decommissioned in a year
+    - compensation: capacity to be built to compensate future decommissioning
+    - capacity: remaining capacity of the stock in a year
+    - scurve_lb, scurve_ub: s-curves of the backcasting, None until set
+
+    Parameters
+    ----------
+    years : range
+        years of the pathway
+    historical_years : range
+        years of the capacity table, starting one interval before
+    components : list of str
+        names of the components (without stocks)
+    """
+    TABLES = ["commission", "decommission", "compensation", "capacity"]
+
+    def __init__(self, years, historical_years, components):
+        self.commission = _zeros(years, components)
+        self.decommission = _zeros(years, components)
+        self.compensation = _zeros(years, components)
+        self.capacity = _zeros(historical_years, components)
+        self.scurve_lb = None
+        self.scurve_ub = None
+
+    def add_component(self, name):
+        """Add a component without commissioning or decommissioning."""
+        for table in self.TABLES:
+            if name not in getattr(self, table).columns:
+                getattr(self, table)[name] = 0.0
+
+    def round(self):
+        """Round all tables to four decimal places."""
+        for table in self.TABLES:
+            setattr(self, table, getattr(self, table).round(4))
+
+    def add_capacity(self, components, year, lifetime, capacity):
+        """Add the capacity commissioned in year to the capacity table over
+        the technical lifetime of the components.
+
+        Parameters
+        ----------
+        components : list of str
+        year : int
+            commissioning year
+        lifetime, capacity : np.ndarray
+            technical lifetime and commissioned capacity per component
+        """
+        self.commission.loc[year, components] = capacity
+        years = self.capacity.index.values[:, None]
+        window = (years >= year) & (years <= year + lifetime[None, :] - 1)
+        values = self.capacity[components].values.copy()
+        values[window] += np.broadcast_to(capacity, values.shape)[window]
+        self.capacity.loc[:, components] = values
+
+    def add_decommissioning(self, components, decommission_years, lifetime,
+                            capacity, interval):
+        """Add the decommissioning of capacity and its compensation in the
+        years of the interval before the decommissioning.
+
+        The compensation of the year before the decommissioning is twice the
+        decommissioned capacity divided by lifetime - 2, the years before
+        get a decreasing share of the following year.
+
+        Parameters
+        ----------
+        components : list of str
+        decommission_years : np.ndarray
+            year of decommissioning per component
+        lifetime, capacity : np.ndarray
+            technical lifetime and decommissioned capacity per component
+        interval : int
+        """
+        decommission = self.decommission[components].values.copy()
+        compensation = self.compensation[components].values.copy()
+        columns = np.arange(len(components))
+        rows = self.decommission.index.get_indexer(decommission_years)
+        if (rows < interval - 1).any():
+            raise KeyError(
+                "Decommissioning years {} ".format(decommission_years) +
+                "outside of the stock ledger")
+
+        decommission[rows, columns] += capacity
+        for t in range(1, interval):
+            current = compensation[rows - t, columns]
+            if t == 1:
+                increase = (decommission[rows, columns] / (lifetime - 2)) * 2
+            else:
+                increase = compensation[rows - t + 1, columns] * (
+                    (lifetime - 2 - t) / (lifetime - 2))
+            # only years without negative compensation are increased
+            with np.errstate(invalid="ignore"):
+                increased = current >= 0
+            compensation[rows[increased] - t, columns[increased]] = \
+                current[increased] + increase[increased]
+
+        self.decommission.loc[:, components] = decommission
+        self.compensation.loc[:, components] = compensation
+
+    def get_active_capacities(self, components, currentyear, refyear,
+                              interval):
+        """Get the capacity of the components which is still active per
+        commissioning year.
+
+        The capacity installed in the previous model year (commissioning and
+        stock) is assigned to the commissioning years from the latest to the
+        earliest, until it is used up.
+
+        Returns
+        -------
+        pd.DataFrame
+            components x commissioning years (descending), NaN for years
+            after the capacity is used up. Components without installed
+            capacity are left out.
+        """
+        previous_year = currentyear - interval
+        years = list(range(currentyear, refyear - 1, -interval))
+        total = self.commission.loc[previous_year, components].values + \
+            self.capacity.loc[previous_year, components].values
+        installed = total != 0
+        components = [x for x, y in zip(components, installed) if y]
+        commission = self.commission.loc[years, components].values.T
+
+        rest = total[installed]
+        active = np.full(commission.shape, np.nan)
+        used_up = np.zeros(len(components), dtype=bool)
+        for j in range(len(years)):
+            with np.errstate(invalid="ignore"):
+                fits = ~used_up & (rest >= commission[:, j])
+            last = ~used_up & ~fits
+            active[fits, j] = commission[fits, j]
+            rest[fits] -= commission[fits, j]
+            active[last, j] = rest[last]
+            used_up |= last
+        return pd.DataFrame(active, index=components, columns=years)
+
+    def snapshot(self, path):
+        """Write all tables to a compressed .npz file for debugging, see
+        load_snapshot."""
+        arrays = {}
+        for table in self.TABLES + ["scurve_lb", "scurve_ub"]:
+            df = getattr(self, table)
+            if df is None:
+                continue
+            arrays[table + "/values"] = df.values.astype(float)
+            arrays[table + "/index"] = np.array(df.index)
+            arrays[table + "/columns"] = np.array(df.columns, dtype=str)
+        np.savez_compressed(path, **arrays)
+
+
+def load_snapshot(path):
+    """Load the tables of a snapshot of the stock ledger.
+
+    Returns
+    -------
+    dict
+        table name -> pd.DataFrame
+    """
+    tables = {}
+    with np.load(path) as arrays:
+        for name in arrays.files:
+            table, key = name.split("/")
+            if key == "values":
+                tables[table] = pd.DataFrame(
+                    arrays[name], index=arrays[table + "/index"],
+                    columns=arrays[table + "/columns"])
+    return tables
+
+
+def _zeros(index, columns):
+    return pd.DataFrame(0.0, index=index, columns=columns)
@@ -0,0 +1,23 @@
+#!/bin/bash
+
+#SBATCH --output="logs/slurm-%x-%A.out"
+#SBATCH --job-name=nestor_batch
+#SBATCH --nodes=1
+#SBATCH --cpus-per-task=32
+#SBATCH --partition=normal
+#SBATCH --exclude=cn10,cn8,cn24,cn25
+#SBATCH --no-kill
+
+#### JOB LOGIC ###
+export OMP_NUM_THREADS=1
+export USE_SIMPLE_THREADED_LEVEL3=1
+export MKL_NUM_THREADS=1
+
+source activate FINE_Nestor_new
+
+# names or glob patterns of the scenario jsons
+SCENARIOS=("newTHG0" "newTHG0with*")
+# solver threads per scenario, the allocated cores are shared by default
+# THREADS="--threads 8"
+
+python scripts_nestor/start_batch.py "${SCENARIOS[@]}" $THREADS
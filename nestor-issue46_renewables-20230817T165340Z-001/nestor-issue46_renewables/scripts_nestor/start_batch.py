@@ -0,0 +1,18 @@
+import argparse
+from nestor.batch import get_scenario_names, run_batch
+
+parser = argparse.ArgumentParser(
+    description="Run several scenarios in parallel.")
+parser.add_argument(
+    "scenarios", nargs="+",
+    help="names or glob patterns of scenario jsons, e.g. 'newTHG0*'")
+parser.add_argument("--workers", type=int, default=None,
+                    help="number of parallel runs")
+parser.add_argument("--threads", type=int, default=None,
+                    help="solver threads per run")
+args = parser.parse_args()
+
+results = run_batch(get_scenario_names(args.scenarios),
+                    workers=args.workers, threads=args.threads)
+if any(x["status"] != "finished" for x in results):
+    raise SystemExit(1)
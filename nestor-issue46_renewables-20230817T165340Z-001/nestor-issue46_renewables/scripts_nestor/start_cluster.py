@@ -1,5 +1,10 @@
 import sys
-from nestor.nestor import Nestor
+from nestor.nestor import Nestor, resume
 
-json_name = sys.argv[1]
-Nestor(json_name)
+if sys.argv[1] == "--resume":
+    # start_cluster.py --resume <resultfolder> [<log file>], the log file is
+    # expected as second argument by the run
+    resume(sys.argv.pop(2))
+else:
+    json_name = sys.argv[1]
+    Nestor(json_name)
@@ -0,0 +1,23 @@
+import json
+import argparse
+from nestor.batch import run_sweep
+
+parser = argparse.ArgumentParser(
+    description="Run a scenario for all combinations of a parameter grid.")
+parser.add_argument("scenario", help="name of the base scenario json")
+parser.add_argument(
+    "--grid", required=True,
+    help="json file with parameter -> list of values, e.g. " +
+         "{\"WACC\": [0.05, 0.07], \"sCurveParam\": [2, 4]}")
+parser.add_argument("--workers", type=int, default=None,
+                    help="number of parallel runs")
+parser.add_argument("--threads", type=int, default=None,
+                    help="solver threads per run")
+args = parser.parse_args()
+
+with open(args.grid) as f:
+    grid = json.load(f)
+results = run_sweep(args.scenario, grid, workers=args.workers,
+                    threads=args.threads)
+if any(x["status"] != "finished" for x in results):
+    raise SystemExit(1)
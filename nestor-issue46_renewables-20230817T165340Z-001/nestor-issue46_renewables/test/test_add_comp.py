@@ -0,0 +1,136 @@
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from nestor.add_comp import get_capacity_bounds, patch_parameter
+from nestor.backcasting import MyopicTrans
+
+
+def get_component(**parameters):
+    component = types.SimpleNamespace(
+        name="P-Trans-Test",
+        capacityFix=None,
+        capacityMax=pd.Series({"L": 10.0}),
+        capacityMin=pd.Series({"L": 1.0}),
+        investPerCapacity=pd.Series({"L": 100.0}),
+        opexPerCapacity=pd.Series({"L": 2.0}),
+        QPcostScale=pd.Series({"L": 0.0}))
+    for name, value in parameters.items():
+        setattr(component, name, value)
+    return component
+
+
+def test_patch_bounds_and_costs():
+    component = get_component()
+    assert patch_parameter(component, {
+        "capacityMax": 20, "capacityMin": pd.Series({"L": 2}),
+        "investPerCapacity": {"L": 80.0}, "capacityFix": None})
+    assert component.capacityMax.to_dict() == {"L": 20.0}
+    assert component.capacityMin.to_dict() == {"L": 2.0}
+    assert component.investPerCapacity.to_dict() == {"L": 80.0}
+    assert component.capacityFix is None
+    assert component.capacityMax.dtype == float
+
+
+def test_patch_costs_of_not_eligible_locations():
+    component = get_component(
+        opexPerCapacity=pd.Series({"L": 2.0, "M": 2.0}),
+        locationalEligibility=pd.Series({"L": 1, "M": 0}))
+    assert patch_parameter(component, {"opexPerCapacity": 3})
+    assert component.opexPerCapacity.to_dict() == {"L": 3.0, "M": 0.0}
+
+
+@pytest.mark.parametrize("value", [-1, np.nan, np.inf])
+def test_patch_invalid_values(value):
+    component = get_component()
+    with pytest.raises(ValueError):
+        patch_parameter(component, {"investPerCapacity": value})
+    assert component.investPerCapacity.to_dict() == {"L": 100.0}
+
+
+def test_patch_capacity_min_exceeds_max():
+    component = get_component()
+    with pytest.raises(ValueError):
+        patch_parameter(component, {"capacityMin": 15})
+    assert component.capacityMin.to_dict() == {"L": 1.0}
+
+
+@pytest.mark.parametrize("update", [
+    # bound kind changes: positive -> zero, None -> value, value -> None
+    {"capacityMax": 0},
+    {"capacityFix": 5},
+    {"capacityMin": None},
+    # not patchable parameter
+    {"capacityMax": 20, "QPcostScale": 0.1}])
+def test_no_patch_for_changed_bound_kind(update):
+    component = get_component()
+    before = dict(vars(component))
+    assert not patch_parameter(component, update)
+    assert vars(component) == before
+
+
+def test_no_patch_for_processed_parameter():
+    component = get_component(
+        processedInvestPerCapacity=pd.Series({"L": 100.0}))
+    assert not patch_parameter(component, {"investPerCapacity": 80})
+    assert component.investPerCapacity.to_dict() == {"L": 100.0}
+    # other parameters are patched
+    assert patch_parameter(component, {"opexPerCapacity": 3})
+
+
+def test_no_patch_of_bounds_with_qp_bound():
+    component = get_component(QPbound=pd.Series({"L": 10.0}),
+                              QPcostScale=pd.Series({"L": 0.1}))
+    assert not patch_parameter(component, {"capacityMax": 20})
+    assert component.capacityMax.to_dict() == {"L": 10.0}
+    # costs do not change the quadratic bound
+    assert patch_parameter(component, {"investPerCapacity": 80})
+
+    component = get_component(QPbound=pd.Series({"L": 10.0}))
+    assert patch_parameter(component, {"capacityMax": 20})
+
+
+def test_capacity_bounds_with_updates():
+    component = get_component()
+    assert get_capacity_bounds(component, "L") == {
+        "capacityFix": None, "capacityMax": 10.0, "capacityMin": 1.0}
+    assert get_capacity_bounds(component, "L", {
+        "capacityFix": 4.0, "capacityMax": None, "capacityMin": None}) == {
+        "capacityFix": 4.0, "capacityMax": None, "capacityMin": None}
+
+
+def get_myopic_trans(parameter_updates):
+    components = {"P-Trans-Test": get_component(),
+                  "P-Trans-Fix": get_component(
+                      name="P-Trans-Fix", capacityFix=pd.Series({"L": 2.0}),
+                      capacityMax=None, capacityMin=None)}
+    trans = object.__new__(MyopicTrans)
+    trans.parent = types.SimpleNamespace(
+        esM=types.SimpleNamespace(componentNames={x: None for x in components},
+                                  getComponent=components.__getitem__),
+        location="L")
+    trans.parameter_updates = parameter_updates
+    return trans
+
+
+def test_collected_bounds_are_rounded_and_checked():
+    # new bounds of the year are collected and applied with the costs
+    trans = get_myopic_trans({"P-Trans-Fix": {
+        "capacityFix": None, "capacityMax": 3.123456, "capacityMin": 1.5}})
+    trans.fixNumericalInstabilities()
+    trans.check_if_lb_greater_ub()
+    assert trans.parameter_updates["P-Trans-Fix"]["capacityMax"] == 3.1235
+    assert trans.get_capacity_bounds(
+        trans.parent.esM.getComponent("P-Trans-Fix"))["capacityMax"] == 3.1235
+
+    trans = get_myopic_trans({"P-Trans-Test": {
+        "capacityFix": None, "capacityMax": 2.0, "capacityMin": 5.0}})
+    with pytest.raises(ValueError):
+        trans.check_if_lb_greater_ub()
+
+    trans = get_myopic_trans({"P-Trans-Test": {
+        "capacityFix": None, "capacityMax": -1.0, "capacityMin": 0.0}})
+    with pytest.raises(ValueError):
+        trans.fixNumericalInstabilities()
@@ -0,0 +1,92 @@
+import os
+import shutil
+import types
+
+import numpy as np
+import pandas as pd
+
+from nestor.utils.checkpoint import (save_checkpoint, load_checkpoint,
+                                     get_checkpoint_path)
+from nestor.utils.stock_ledger import StockLedger
+
+
+def get_state():
+    stocks = StockLedger(range(2020, 2031), range(2015, 2031), ["CHP", "PV"])
+    stocks.add_capacity(["CHP", "PV"], 2025, np.array([20, 10]),
+                        np.array([1.5, 3.0]))
+    return {
+        "stocks": stocks,
+        "resultCapacities": {2025: pd.Series({"CHP": 1.5, "PV": 3.0})},
+        "helper_capex_calculation": {
+            2025: pd.DataFrame({"modelyear_ub": [2.0]}, index=["CHP"])},
+        "FINEResults": {"target year": {}},
+        "finished_years": ["target year", 2025],
+        "stock_components": ["CHP_stock"],
+        "parameters": {"CHP": {"capacityMax": pd.Series({"L": 2.0})}},
+        "optimal_values": {("ConversionModel", "capacityVariablesOptimum"):
+                           pd.DataFrame({"L": [1.5]}, index=["CHP"])}}
+
+
+def get_model(resultfolderpath, input_folder, state):
+    os.makedirs(os.path.join(resultfolderpath, "temp"))
+    return types.SimpleNamespace(
+        resultfolderpath=resultfolderpath,
+        scenariopath=os.path.join("data", "scenario_definition", "Scen.json"),
+        threads=4,
+        databasepath=os.path.join(input_folder, "processed_input_data",
+                                  "parameter_processed.xlsx"),
+        backcasting=types.SimpleNamespace(get_state=lambda: state))
+
+
+def test_save_and_load_checkpoint(tmp_path):
+    resultfolderpath = str(tmp_path / "run")
+    state = get_state()
+    model = get_model(resultfolderpath,
+                      os.path.join(resultfolderpath, "input"), state)
+    assert save_checkpoint(model)
+
+    # the result folder can be moved before resuming
+    moved = str(tmp_path / "moved")
+    shutil.move(resultfolderpath, moved)
+    checkpoint = load_checkpoint(moved)
+
+    assert checkpoint["scenario"] == "Scen"
+    assert checkpoint["threads"] == 4
+    assert checkpoint["input_folder"] == os.path.join(moved, "input")
+    loaded = checkpoint["state"]
+    assert sorted(loaded) == sorted(state)
+    for table in StockLedger.TABLES:
+        pd.testing.assert_frame_equal(getattr(loaded["stocks"], table),
+                                      getattr(state["stocks"], table))
+    pd.testing.assert_series_equal(loaded["resultCapacities"][2025],
+                                   state["resultCapacities"][2025])
+    pd.testing.assert_frame_equal(loaded["helper_capex_calculation"][2025],
+                                  state["helper_capex_calculation"][2025])
+    assert loaded["finished_years"] == ["target year", 2025]
+    assert loaded["stock_components"] == ["CHP_stock"]
+
+
+def test_checkpoint_of_sweep_variant(tmp_path):
+    # the input data of a variant is in the report folder of the sweep
+    input_folder = str(tmp_path / "batch_reports" / "input")
+    model = get_model(str(tmp_path / "variant"), input_folder, get_state())
+    assert save_checkpoint(model)
+    assert load_checkpoint(str(tmp_path / "variant"))["input_folder"] == \
+        input_folder
+
+
+def test_failed_checkpoint_keeps_previous(tmp_path):
+    resultfolderpath = str(tmp_path / "run")
+    model = get_model(resultfolderpath,
+                      os.path.join(resultfolderpath, "input"), get_state())
+    assert save_checkpoint(model)
+
+    def _fail():
+        raise RuntimeError("no state")
+    model.backcasting.get_state = _fail
+    assert not save_checkpoint(model)
+
+    path = get_checkpoint_path(resultfolderpath)
+    assert os.listdir(os.path.dirname(path)) == [os.path.basename(path)]
+    assert load_checkpoint(resultfolderpath)["state"]["finished_years"] == \
+        ["target year", 2025]
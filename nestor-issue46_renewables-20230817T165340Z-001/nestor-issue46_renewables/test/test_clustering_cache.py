@@ -0,0 +1,76 @@
+import pandas as pd
+
+from nestor.utils.clustering_cache import ClusteringCache, get_series_hash
+
+VALUES = [0.2, 0.5, 0.9]
+
+
+class Component():
+    def __init__(self, name, parameter, values=VALUES):
+        self.name = name
+        # column labels of FINE: name, parameter, commodity and location
+        self.data = pd.DataFrame(
+            {name + parameter + "_L": values})
+
+    def getDataForTimeSeriesAggregation(self):
+        return self.data, {x: 1 for x in self.data.columns}
+
+
+class OtherComponent(Component):
+    pass
+
+
+class EnergySystemModel():
+    def __init__(self, components):
+        self.components = {x.name: x for x in components}
+        self.n_clustered = 0
+        self.isTimeSeriesDataClustered = False
+
+    @property
+    def componentNames(self):
+        return list(self.components)
+
+    def getComponent(self, name):
+        return self.components[name]
+
+    def cluster(self, **settings):
+        self.n_clustered += 1
+        for component in self.components.values():
+            component.aggregatedData = component.name
+
+
+def test_series_hash_contains_labels_and_class():
+    el = Component("Conversion-El", "_commodityConversionFactorTimeSeries_el")
+    h2 = Component("Conversion-H2", "_commodityConversionFactorTimeSeries_h2")
+    el_2 = Component("Conversion-El-2",
+                     "_commodityConversionFactorTimeSeries_el")
+
+    assert get_series_hash(el) == get_series_hash(el_2)
+    assert get_series_hash(el) != get_series_hash(h2)
+    assert get_series_hash(Component("Wind", "_operationRateFix")) != \
+        get_series_hash(Component("Wind", "_operationRateMax"))
+    assert get_series_hash(Component("Wind", "_operationRateMax")) != \
+        get_series_hash(OtherComponent("Wind", "_operationRateMax"))
+
+
+def test_reuse_only_for_same_commodity():
+    el = Component("Conversion-El", "_commodityConversionFactorTimeSeries_el")
+    esM = EnergySystemModel([el])
+    cache = ClusteringCache()
+    cache.cluster(esM, numberOfTypicalPeriods=2)
+    assert esM.n_clustered == 1
+
+    # same values and commodity: the aggregation is mapped
+    el_2 = Component("Conversion-El-2",
+                     "_commodityConversionFactorTimeSeries_el")
+    esM.components[el_2.name] = el_2
+    cache.cluster(esM, numberOfTypicalPeriods=2)
+    assert esM.n_clustered == 1
+    assert el_2.aggregatedData == "Conversion-El"
+
+    # same values but another commodity: clustered again
+    h2 = Component("Conversion-H2", "_commodityConversionFactorTimeSeries_h2")
+    esM.components[h2.name] = h2
+    cache.cluster(esM, numberOfTypicalPeriods=2)
+    assert esM.n_clustered == 2
+    assert h2.aggregatedData == "Conversion-H2"
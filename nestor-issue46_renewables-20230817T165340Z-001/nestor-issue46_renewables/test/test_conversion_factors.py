@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from nestor.nestor import get_conversion_factors, get_dim_energytypes
+
+YEARS = [2025, 2030]
+ENERGYTYPES = {"Hub-Gas": "gas", "Hub-El": "el", "Hub-Heat": "heat"}
+
+
+def get_connections():
+    return pd.DataFrame(
+        [["Hub-Gas", "CHP", 2.0, 2.5],
+         ["CHP", "Hub-El", 0.5, 0.625],
+         ["CHP", "Hub-Heat", 0.3, 0.25],
+         ["Hub-Gas", "Boiler", 0.8, 0.5],
+         ["Boiler", "Hub-Heat", 0.4, 0.9]],
+        columns=["input", "output"] + YEARS)
+
+
+def test_conversion_factors_output_reference():
+    efficiency, dimEnergyType = get_conversion_factors(
+        get_connections(), ["CHP"], YEARS, ENERGYTYPES, {"CHP": "el"})
+
+    assert dimEnergyType == {"CHP": "Hub-El"}
+    assert efficiency["CHP"][2025] == pytest.approx(
+        {"Hub-El": 1, "Hub-Heat": 0.6, "Hub-Gas": -4})
+    assert efficiency["CHP"][2030] == pytest.approx(
+        {"Hub-El": 1, "Hub-Heat": 0.4, "Hub-Gas": -4})
+    assert list(efficiency["CHP"][2025]) == ["Hub-El", "Hub-Heat", "Hub-Gas"]
+
+
+def test_conversion_factors_input_reference():
+    efficiency, dimEnergyType = get_conversion_factors(
+        get_connections(), ["Boiler"], YEARS, ENERGYTYPES,
+        {"Boiler": "gas"})
+
+    assert dimEnergyType == {"Boiler": "Hub-Gas"}
+    # the -1 of the dimensioning hub is overwritten by -dimEfficiency^2
+    assert efficiency["Boiler"][2025] == pytest.approx(
+        {"Hub-Gas": -0.64, "Hub-Heat": 0.4})
+    assert efficiency["Boiler"][2030] == pytest.approx(
+        {"Hub-Gas": -0.25, "Hub-Heat": 0.9})
+    assert list(efficiency["Boiler"][2025]) == ["Hub-Gas", "Hub-Heat"]
+
+
+def test_conversion_factors_errors():
+    with pytest.raises(ValueError):
+        get_conversion_factors(get_connections(), ["CHP"], YEARS,
+                               ENERGYTYPES, {})
+    with pytest.raises(KeyError):
+        get_conversion_factors(get_connections(), ["CHP"], YEARS,
+                               ENERGYTYPES, {"CHP": "H2"})
+
+
+def test_dim_energytypes_last_sheet_wins():
+    transformers = pd.DataFrame(
+        {"energytype": ["el", "gas"], "dimEnergyType": ["el", "heat"]},
+        index=["CHP", "Boiler"])
+    heatpumps = pd.DataFrame({"energytype": ["heat"]}, index=["CHP"])
+
+    assert get_dim_energytypes([transformers, heatpumps]) == {
+        "CHP": "heat", "Boiler": "heat"}
+    assert get_dim_energytypes([heatpumps, transformers]) == {
+        "CHP": "el", "Boiler": "heat"}
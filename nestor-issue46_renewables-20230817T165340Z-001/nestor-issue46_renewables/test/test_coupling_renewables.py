@@ -0,0 +1,46 @@
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from nestor.utils.coupling_renewables import append_rows, append_sheet_rows
+from nestor.utils.read_input import read_parameter_file
+
+
+def test_append_sheet_rows_equals_processed_file(tmp_path):
+    # sheet of the raw parameter file
+    path = str(tmp_path / "parameter.xlsx")
+    pd.DataFrame({"name": ["P-Trans-Gas", "P-Trans-Coal"],
+                  "unrestrict": [True, False],
+                  "controllable": [False, True],
+                  "ub": [10.5, 3.0],
+                  "profile": ["None", "None"]}).to_excel(
+        path, sheet_name="Sources", index=False)
+
+    # coupled renewables with the columns of the sheet
+    res = pd.DataFrame({"name": ["P-Trans-WindOnshore1-el",
+                                 "P-Trans-WindOnshore2-el"],
+                        "unrestrict": [np.bool_(False), True],
+                        "controllable": [False, False],
+                        "ub": [1.25, np.nan],
+                        "profile": ["WindOnshore1", "WindOnshore2"]})
+
+    book = openpyxl.load_workbook(path)
+    append_rows(res, book["Sources"])
+    processed_path = str(tmp_path / "parameter_processed.xlsx")
+    book.save(processed_path)
+
+    sheet = append_sheet_rows(
+        res, read_parameter_file(path, cache_dir=None).sheets["Sources"])
+    processed = read_parameter_file(
+        processed_path, cache_dir=None).sheets["Sources"]
+
+    pd.testing.assert_frame_equal(sheet, processed)
+    # bools of the coupled renewables are bools as in the processed file
+    assert sheet["unrestrict"].dtype == bool
+    assert list(sheet["unrestrict"]) == [True, False, False, True]
+    assert list(sheet["controllable"]) == [False, True, False, False]
+
+
+def test_append_sheet_rows_without_rows():
+    sheet = pd.DataFrame({"name": ["a"], "ub": [1.0]})
+    assert append_sheet_rows(pd.DataFrame(), sheet) is sheet
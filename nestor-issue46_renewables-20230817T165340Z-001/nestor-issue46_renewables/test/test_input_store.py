@@ -0,0 +1,41 @@
+import os
+import stat
+
+from nestor.utils.data_handling import InputStore
+from nestor.utils.read_input import file_hash
+
+
+def test_stored_files_are_read_only(tmp_path):
+    source = tmp_path / "parameter.csv"
+    source.write_text("a,b\n1,2\n")
+    os.makedirs(str(tmp_path / "run"))
+    store = InputStore(str(tmp_path / "store"), str(tmp_path))
+
+    path = store.add_file(str(source), str(tmp_path / "run"))
+
+    assert open(path).read() == "a,b\n1,2\n"
+    assert not os.stat(path).st_mode & stat.S_IWUSR
+    assert store.manifest == {os.path.join("run", "parameter.csv"):
+                              file_hash(str(source))}
+    # result folders with read-only links can be deleted
+    os.remove(path)
+
+
+def test_changed_stored_file_is_stored_again(tmp_path):
+    source = tmp_path / "parameter.csv"
+    source.write_text("a,b\n1,2\n")
+    for name in ["run", "run_2"]:
+        os.makedirs(str(tmp_path / name))
+    path = InputStore(str(tmp_path / "store"), str(tmp_path)).add_file(
+        str(source), str(tmp_path / "run"))
+    # same size, but another content
+    os.chmod(path, 0o644)
+    with open(path, "w") as f:
+        f.write("a,b\n3,4\n")
+
+    store = InputStore(str(tmp_path / "store"), str(tmp_path))
+    path_2 = store.add_file(str(source), str(tmp_path / "run_2"))
+
+    assert open(path_2).read() == "a,b\n1,2\n"
+    assert file_hash(path_2) == store.manifest[
+        os.path.join("run_2", "parameter.csv")]
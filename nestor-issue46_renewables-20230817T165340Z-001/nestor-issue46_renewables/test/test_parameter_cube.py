@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nestor.utils.parameter_cube import (build_parameter_cube,
+                                         get_support_columns,
+                                         interpolate_years)
+
+
+def test_support_columns_with_prefix():
+    df = pd.DataFrame(columns=["capex20", "capex2030", "capex", "capex5"])
+    assert get_support_columns(df, "capex") == {
+        2020: "capex20", 2030: "capex2030"}
+
+
+def test_support_columns_without_prefix():
+    # Demand sheet: only four digit years, other columns are no years
+    df = pd.DataFrame(columns=["unit", "20", 2020, "2045", "Kat1"])
+    assert get_support_columns(df, "") == {2020: 2020, 2045: "2045"}
+
+
+YEARS = list(range(2020, 2051, 5))
+
+
+def interpolate_pandas(df, years, method="linear"):
+    # interpolation of the pathway parameters before the parameter cube
+    df = df.copy()
+    for year in years:
+        if year not in df.columns:
+            df[year] = np.nan
+    return df.sort_index(axis=1).interpolate(method=method, axis=1)
+
+
+@pytest.mark.parametrize("values", [
+    [[1.0, 2.0, 3.0, 4.0], [0.5, 0.5, 1.0, 0.0]],
+    # inner NaN
+    [[1.0, np.nan, 3.0, 4.0], [np.nan, 2.0, np.nan, 8.0]],
+    # leading and trailing NaN years
+    [[np.nan, np.nan, 3.0, 4.0], [1.0, 2.0, np.nan, np.nan]],
+    [[np.nan, np.nan, np.nan, np.nan], [np.nan, 5.0, np.nan, np.nan]]])
+def test_interpolate_years_equals_pandas(values):
+    # evenly spaced support years: same as interpolation by position
+    support_years = [2020, 2030, 2040, 2050]
+    df = pd.DataFrame(values, columns=support_years)
+    expected = interpolate_pandas(df, YEARS)
+
+    result = interpolate_years(np.array(values), support_years,
+                               list(expected.columns))
+    np.testing.assert_allclose(result, expected.values)
+
+
+def test_interpolate_uneven_years_by_year():
+    support_years = [2020, 2030, 2050]
+    values = [[1.0, 2.0, 4.0], [np.nan, 3.0, np.nan], [0.0, np.nan, 6.0]]
+    df = pd.DataFrame(values, columns=support_years)
+    expected = interpolate_pandas(df, YEARS, method="index")
+
+    result = interpolate_years(np.array(values), support_years,
+                               list(expected.columns))
+    np.testing.assert_allclose(result, expected.values)
+    # not by position, which gives 2.5 in 2035
+    assert result[0, YEARS.index(2035)] == 2.5
+    assert result[0, YEARS.index(2040)] == 3.0
+
+
+def test_build_parameter_cube():
+    sources = pd.DataFrame({"capex20": [10.0, 5.0], "capex50": [4.0, 2.0],
+                            "cost_scale2020": [0.1, 0.0]},
+                           index=["PV", "Gas"])
+    transformers = pd.DataFrame(
+        {"capex20": [100.0], "capex30": [80.0], "capex50": [50.0],
+         "cost_scale2020": [0.2], "CO2footprint2020": [0.4],
+         "CO2footprint2050": [0.1]}, index=["CHP"])
+    fuelprices = pd.DataFrame({"Price20": [20.0], "Price40": [30.0]},
+                              index=["Gas"])
+    components = pd.concat([sources, transformers], axis=0)
+
+    cube = build_parameter_cube(
+        {"fuelprice": (fuelprices, "Price"),
+         "emissions": (transformers, "CO2footprint"),
+         "capex": (components, "capex"),
+         "costscale": (components, "cost_scale")}, years=YEARS)
+
+    capex = interpolate_pandas(components[["capex20", "capex30", "capex50"]]
+                               .rename(columns=lambda x: 2000 + int(x[5:])),
+                               YEARS, method="index")
+    pd.testing.assert_frame_equal(cube.get_parameter("capex"), capex,
+                                  check_names=False, check_column_type=False)
+    assert list(cube.get_parameter("fuelprice").loc["Gas"]) == \
+        [20.0, 22.5, 25.0, 27.5, 30.0, 30.0, 30.0]
+    assert list(cube.get_parameter("emissions").index) == ["CHP"]
+    assert cube.get_value("CHP", "emissions", 2035) == pytest.approx(0.25)
+    # cost scale without value for 2050 stays constant
+    assert cube.get_value("PV", "costscale", 2050) == 0.1
+    assert np.isnan(cube.get_value("PV", "emissions", 2030))
+    assert list(cube.at_year(2030).index) == ["Gas", "CHP", "PV"]
+
+
+def test_build_parameter_cube_with_duplicate_names():
+    # the same name in two concatenated tables keeps both rows
+    components = pd.concat([
+        pd.DataFrame({"capex20": [10.0], "capex50": [4.0]}, index=["PV"]),
+        pd.DataFrame({"capex20": [100.0], "capex50": [40.0]},
+                     index=["PV"])], axis=0)
+    emissions = pd.DataFrame({"CO2footprint2020": [0.3]}, index=["PV"])
+
+    cube = build_parameter_cube({"capex": (components, "capex"),
+                                 "emissions": (emissions, "CO2footprint")},
+                                years=[2020, 2035, 2050])
+
+    capex = cube.get_parameter("capex")
+    assert list(capex.index) == ["PV", "PV"]
+    assert capex.values.tolist() == [[10.0, 7.0, 4.0], [100.0, 70.0, 40.0]]
+    # emissions belong to the first row of the name
+    assert cube.get_value("PV", "emissions", 2050) == 0.3
+    assert cube.get_value("PV", "capex", 2050) == 4.0
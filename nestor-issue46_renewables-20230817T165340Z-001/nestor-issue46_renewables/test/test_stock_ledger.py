@@ -0,0 +1,219 @@
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import nestor.backcasting
+from nestor.backcasting import MyopicTrans
+from nestor.utils.stock_ledger import StockLedger, load_snapshot
+
+REFYEAR = 2020
+TARGETYEAR = 2050
+INTERVAL = 5
+COMPONENTS = ["CHP", "Boiler", "PV"]
+
+
+def get_ledger():
+    return StockLedger(range(REFYEAR, TARGETYEAR + 1),
+                       range(REFYEAR - INTERVAL, TARGETYEAR + 1),
+                       COMPONENTS)
+
+
+def add_capacity_loop(ledger, components, year, lifetime, capacity):
+    # per component implementation of the backcasting before the ledger
+    for name, x, y in zip(components, lifetime, capacity):
+        ledger.commission.loc[year, name] = y
+        ledger.capacity.loc[year:year + x - 1, name] += y
+
+
+def add_decommissioning_loop(ledger, components, decommission_years,
+                             lifetime, capacity, interval):
+    # per component implementation of the backcasting before the ledger
+    for name, decommission_year, x, y in zip(
+            components, decommission_years, lifetime, capacity):
+        ledger.decommission.loc[decommission_year, name] += y
+        t = 0
+        for year in np.linspace(decommission_year - 1,
+                                decommission_year - interval + 1,
+                                interval - 1):
+            year = int(year)
+            t += 1
+            if ledger.compensation.loc[year, name] >= 0:
+                if year == decommission_year - 1:
+                    ledger.compensation.loc[year, name] += (
+                        ledger.decommission.loc[year + 1, name] / (x - 2)) * 2
+                else:
+                    ledger.compensation.loc[year, name] += (
+                        ledger.compensation.loc[year + 1, name] *
+                        ((x - 2 - t) / (x - 2)))
+
+
+def assert_ledgers_equal(ledger, expected):
+    for table in StockLedger.TABLES:
+        pd.testing.assert_frame_equal(getattr(ledger, table),
+                                      getattr(expected, table))
+
+
+def test_add_capacity():
+    ledger, expected = get_ledger(), get_ledger()
+    for year, capacity in [(2025, [1.0, 2.5, 0.0]), (2030, [0.5, 1.0, 4.0])]:
+        lifetime = np.array([20, 30, 10])
+        ledger.add_capacity(COMPONENTS, year, lifetime, np.array(capacity))
+        add_capacity_loop(expected, COMPONENTS, year, lifetime, capacity)
+
+    assert_ledgers_equal(ledger, expected)
+    assert ledger.capacity.loc[2039, "PV"] == 4.0
+    assert ledger.capacity.loc[2040, "PV"] == 0.0
+
+
+def test_add_decommissioning():
+    ledger, expected = get_ledger(), get_ledger()
+    # negative compensation is not increased
+    for x in [ledger, expected]:
+        x.compensation.loc[2042, "Boiler"] = -1.0
+    for components, years, capacity in [
+            (COMPONENTS, [2045, 2045, 2040], [1.0, 2.5, 3.0]),
+            (["CHP", "PV"], [2045, 2050], [0.5, 2.0])]:
+        lifetime = np.array([20, 25, 10])[:len(components)]
+        ledger.add_decommissioning(components, np.array(years), lifetime,
+                                   np.array(capacity), INTERVAL)
+        add_decommissioning_loop(expected, components, years, lifetime,
+                                 capacity, INTERVAL)
+
+    assert_ledgers_equal(ledger, expected)
+    assert ledger.decommission.loc[2045, "CHP"] == 1.5
+    assert ledger.compensation.loc[2042, "Boiler"] == -1.0
+
+
+def test_add_decommissioning_outside_of_ledger():
+    with pytest.raises(KeyError):
+        get_ledger().add_decommissioning(
+            ["CHP"], np.array([REFYEAR + 1]), np.array([20]),
+            np.array([1.0]), INTERVAL)
+
+
+def test_get_active_capacities():
+    ledger = get_ledger()
+    ledger.commission.loc[[2020, 2025, 2030], "CHP"] = [4.0, 2.0, 1.0]
+    ledger.commission.loc[[2020, 2025, 2030], "Boiler"] = [4.0, 2.0, 1.0]
+    # stock of the previous year (2030) without the decommissioned capacity
+    ledger.capacity.loc[2030, "CHP"] = 3.0
+    ledger.capacity.loc[2030, "Boiler"] = 7.0
+
+    active = ledger.get_active_capacities(COMPONENTS, 2035, REFYEAR,
+                                          INTERVAL)
+
+    # components without installed capacity are left out
+    assert list(active.index) == ["CHP", "Boiler"]
+    assert list(active.columns) == [2035, 2030, 2025, 2020]
+    # 4 installed: 1 of 2030, 2 of 2025 and the rest of 2020
+    assert active.loc["CHP"].tolist() == [0.0, 1.0, 2.0, 1.0]
+    # 8 installed: the rest of 2020 is up to the commissioned capacity
+    assert active.loc["Boiler"].tolist() == [0.0, 1.0, 2.0, 4.0]
+
+    # 1.5 installed: the capacity is used up in 2025
+    ledger.capacity.loc[2030, "CHP"] = 0.5
+    active = ledger.get_active_capacities(["CHP"], 2035, REFYEAR, INTERVAL)
+    assert active.loc["CHP", [2035, 2030, 2025]].tolist() == [0.0, 1.0, 0.5]
+    assert np.isnan(active.loc["CHP", 2020])
+
+
+def test_snapshot(tmp_path):
+    ledger = get_ledger()
+    ledger.add_capacity(COMPONENTS, 2025, np.array([20, 30, 10]),
+                        np.array([1.0, 2.5, 0.5]))
+    ledger.scurve_ub = pd.DataFrame({"CHP": [1.0, 2.0]}, index=[2025, 2030])
+    path = str(tmp_path / "stocks.npz")
+    ledger.snapshot(path)
+
+    tables = load_snapshot(path)
+    assert sorted(tables) == sorted(StockLedger.TABLES + ["scurve_ub"])
+    for table in StockLedger.TABLES + ["scurve_ub"]:
+        pd.testing.assert_frame_equal(tables[table], getattr(ledger, table),
+                                      check_index_type=False,
+                                      check_column_type=False)
+
+
+def get_myopic_trans(currentyear):
+    # stocks of CHP, Boiler and PV (not in the ledger yet), PV is not
+    # decommissioned during the pathway
+    lifetimes = {"CHP": 20, "Boiler": 10, "PV": 30}
+    components = {}
+    for name, lifetime in lifetimes.items():
+        for x in [name, name + "_stock"]:
+            components[x] = types.SimpleNamespace(
+                name=x, technicalLifetime=pd.Series([lifetime]),
+                capacityMin=None, capacityMax=None,
+                capacityFix=pd.Series({"L": 1.0}))
+    ledger = StockLedger(range(REFYEAR, TARGETYEAR + 1),
+                         range(REFYEAR - INTERVAL, TARGETYEAR + 1),
+                         ["CHP", "Boiler"])
+    ledger.capacity.loc[:, "CHP"] = 4.0
+    ledger.capacity.loc[:2030, "Boiler"] = 2.5
+    ledger.compensation.loc[2037, "Boiler"] = -0.5
+
+    trans = object.__new__(MyopicTrans)
+    trans.parent = types.SimpleNamespace(
+        esM=types.SimpleNamespace(componentNames={x: None for x in components},
+                                  getComponent=components.__getitem__),
+        currentyear=currentyear, refyear=REFYEAR, startyear=REFYEAR + INTERVAL,
+        targetyear=TARGETYEAR, interval=INTERVAL, location="L",
+        targetyearoptimization=False, scenario_definition={})
+    trans.stocks = ledger
+    trans.resultCapacities = {currentyear: {"CHP": 1.25, "Boiler": 0.75,
+                                            "PV": 2.0}}
+    trans.check_if_lb_greater_ub = lambda: None
+    trans.fixNumericalInstabilities = lambda: None
+    return trans
+
+
+def calculate_stock_capacities_loop(self):
+    # per component implementation of calculateStockCapacities in an
+    # optimization year before the batching
+    parent = self.parent
+    previous_year = parent.currentyear - parent.interval
+    names = [x.replace("_stock", "") for x in parent.esM.componentNames
+             if "_stock" in x]
+    for name in names:
+        self.stocks.add_component(name)
+    for name in names:
+        add_capacity_loop(
+            self.stocks, [name], previous_year,
+            parent.esM.getComponent(name).technicalLifetime,
+            [self.resultCapacities[parent.currentyear][name]])
+    bounds = {}
+    for name in names:
+        lifetime = parent.esM.getComponent(name).technicalLifetime[0]
+        bounds[name + "_stock"] = {
+            "capacityMin": None, "capacityMax": None,
+            "capacityFix": round(
+                self.stocks.capacity.loc[parent.currentyear, name], 4)}
+        decommission_year = int(previous_year + lifetime)
+        if decommission_year <= parent.targetyear:
+            add_decommissioning_loop(
+                self.stocks, [name], [decommission_year], [lifetime],
+                [self.resultCapacities[parent.currentyear][name]],
+                parent.interval)
+    self.stocks.round()
+    return bounds
+
+
+@pytest.mark.parametrize("currentyear", [2035, 2040])
+def test_calculate_stock_capacities_equals_loop(monkeypatch, currentyear):
+    updates = []
+    monkeypatch.setattr(
+        nestor.backcasting, "update_parameters",
+        lambda esM, bounds, location, **kwargs: updates.append(bounds) or esM)
+    trans = get_myopic_trans(currentyear)
+    expected = get_myopic_trans(currentyear)
+
+    trans.calculateStockCapacities()
+    expected_bounds = calculate_stock_capacities_loop(expected)
+
+    assert len(updates) == 1
+    assert updates[0] == expected_bounds
+    assert_ledgers_equal(trans.stocks, expected.stocks)
+    # PV is added to the ledger and not decommissioned in the pathway
+    assert trans.stocks.decommission["PV"].sum() == 0
+    assert trans.stocks.capacity.loc[currentyear, "PV"] == 2.0
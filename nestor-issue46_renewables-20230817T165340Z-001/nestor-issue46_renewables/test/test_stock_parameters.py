@@ -0,0 +1,200 @@
+import types
+
+import FINE as fn
+import pandas as pd
+import pytest
+
+from nestor.backcasting import MyopicTrans
+from nestor.utils.stock_ledger import StockLedger
+
+REFYEAR = 2020
+CURRENTYEAR = 2035
+INTERVAL = 5
+YEARS = list(range(REFYEAR, CURRENTYEAR + 1, INTERVAL))
+# name: class, economic lifetime, commissioning per model year, stock in the
+# previous model year, result of the previous model year
+COMPONENTS = {
+    "CHP": (fn.Conversion, 30, [2.0, 1.0, 1.5], 2.0, 1.5),
+    "Boiler": (fn.Conversion, 10, [3.0, 1.0, 1.0], 1.0, 1.0),
+    "HeatPump": (fn.Conversion, 20, [0.0, 2.0, 1.0], 1.5, 1.0),
+    "Gas": (fn.Source, 20, [4.0, 0.0, 2.0], 3.0, 2.0),
+    "Battery": (fn.Storage, 15, [1.0, 1.0, 0.5], 1.0, 0.5),
+    "Small": (fn.Conversion, 30, [1.0, 0.0, 0.0], 1.0, 0.001)}
+
+
+def get_component(cls, name, lifetime=None):
+    # FINE components without energy system model, only the attributes used
+    # by updateStockParameters are set
+    component = object.__new__(cls)
+    component.name = name
+    component.economicLifetime = pd.Series({"L": lifetime})
+    component.commodityConversionFactors = {"el": 1.0, "gas": -2.0,
+                                            "CO2Out": 0.3}
+    return component
+
+
+def get_myopic_trans(qp):
+    components = {}
+    for name, (cls, lifetime, _, _, _) in COMPONENTS.items():
+        components[name] = get_component(cls, name, lifetime)
+        components[name + "_stock"] = get_component(cls, name + "_stock")
+    names = list(components)
+
+    stocks = StockLedger(range(REFYEAR, CURRENTYEAR + 1),
+                         range(REFYEAR - INTERVAL, CURRENTYEAR + 1),
+                         list(COMPONENTS))
+    for name, (_, _, commission, stock, _) in COMPONENTS.items():
+        stocks.commission.loc[YEARS[:-1], name] = commission
+        stocks.capacity.loc[CURRENTYEAR - INTERVAL, name] = stock
+
+    capex = pd.DataFrame(
+        [[100.0 + 10 * i + j for j in range(len(YEARS))]
+         for i in range(len(names))], index=names, columns=YEARS)
+    costscale = pd.DataFrame(0.0, index=names, columns=YEARS)
+    costscale.loc[["CHP", "Gas"], CURRENTYEAR - INTERVAL] = 0.2
+    emissions = pd.DataFrame(0.0, index=names, columns=YEARS)
+    emissions.loc["CHP"] = [0.4, 0.35, 0.3, 0.25]
+    emissions.loc["HeatPump"] = 0.1
+
+    helper_capex_calculation = {}
+    for year in YEARS[:-1]:
+        helper_capex_calculation[year] = pd.DataFrame(
+            {"modelyear_ub": 10.0,
+             "capex_av_installed": [90.0 + i for i in range(len(COMPONENTS))]},
+            index=list(COMPONENTS))
+    # the previous model year is calculated by updateStockParameters
+    helper_capex_calculation[CURRENTYEAR - INTERVAL] = \
+        helper_capex_calculation[CURRENTYEAR - INTERVAL][["modelyear_ub"]]
+
+    trans = object.__new__(MyopicTrans)
+    trans.parent = types.SimpleNamespace(
+        esM=types.SimpleNamespace(componentNames={x: None for x in names},
+                                  getComponent=components.__getitem__),
+        targetyearoptimization=False, currentyear=CURRENTYEAR,
+        startyear=REFYEAR + INTERVAL, refyear=REFYEAR, interval=INTERVAL,
+        location="L", qp=qp, capex=capex, costscale=costscale,
+        emissions=emissions, raw_heatpumps=pd.DataFrame(index=["HeatPump"]),
+        fuelprices=pd.DataFrame({CURRENTYEAR: [25.0]}, index=["Gas"]))
+    trans.stocks = stocks
+    trans.raw_opexFix = pd.Series(0.02, index=names)
+    trans.resultCapacities = {CURRENTYEAR: {
+        x: y[4] for x, y in COMPONENTS.items()}}
+    trans.helper_capex_calculation = helper_capex_calculation
+    trans.parameter_updates = {}
+    return trans
+
+
+def update_stock_parameters_loop(self):
+    # per component implementation of updateStockParameters before the
+    # vectorization, without the unused efficiency
+    parent = self.parent
+    commission = self.stocks.commission
+    capacity = self.stocks.capacity
+    previous_year = parent.currentyear - parent.interval
+    for name in COMPONENTS:
+        component = parent.esM.getComponent(name)
+        if self.resultCapacities[parent.currentyear][name] < 0.01:
+            continue
+        total_capacity = commission.loc[previous_year, name] + \
+            capacity.loc[previous_year, name]
+        if total_capacity == 0:
+            continue
+        rest = total_capacity
+        active = pd.Series(dtype=float)
+        for year in range(parent.currentyear, parent.refyear - 1,
+                          -parent.interval):
+            if rest >= commission.loc[year, name]:
+                active[year] = commission.loc[year, name]
+                rest -= commission.loc[year, name]
+            else:
+                active[year] = rest
+                break
+
+        update_dict = {}
+        if isinstance(component, fn.Conversion) and \
+                name not in parent.raw_heatpumps.index:
+            if parent.emissions.loc[name, active.index].sum() > 0:
+                conversion = component.commodityConversionFactors
+                emission = (active * parent.emissions.loc[
+                    name, active.index]).sum() / active.sum()
+                if emission != 0:
+                    conversion.update({"CO2Out": emission})
+                update_dict["commodityConversionFactors"] = conversion
+
+        total_capex = 0
+        for year in sorted(
+                x for x in active.index
+                if parent.currentyear - x < component.economicLifetime["L"]
+                and x < parent.currentyear and active[x] > 0):
+            if year == parent.refyear:
+                capex_installed = parent.capex.loc[name + "_stock", year]
+            elif year == previous_year:
+                raw_capex = parent.capex.loc[name, year]
+                costscale = parent.costscale.loc[name, year]
+                if costscale != 0 and parent.qp is True:
+                    modelyear_ub = self.helper_capex_calculation[year].loc[
+                        name, "modelyear_ub"]
+                    capex_min = raw_capex * (1 - costscale)
+                    capex_max = capex_min + active[year] * (
+                        (raw_capex * (1 + costscale) - capex_min) /
+                        modelyear_ub)
+                    capex_installed = capex_min + (capex_max - capex_min) / 2
+                else:
+                    capex_installed = raw_capex
+                self.helper_capex_calculation[year].loc[
+                    name, "capex_av_installed"] = capex_installed
+            else:
+                capex_installed = self.helper_capex_calculation[year].loc[
+                    name, "capex_av_installed"]
+            total_capex += active[year] * capex_installed
+        update_dict["investPerCapacity"] = total_capex / active.sum()
+        update_dict["opexPerCapacity"] = \
+            update_dict["investPerCapacity"] * self.raw_opexFix[name]
+        if not isinstance(component, fn.Storage) and parent.qp:
+            update_dict["QPcostScale"] = 0
+        if name in parent.fuelprices.index:
+            update_dict["opexPerOperation"] = parent.fuelprices.loc[
+                name, parent.currentyear]
+        self.parameter_updates[name] = update_dict
+
+
+@pytest.mark.parametrize("qp", [False, True])
+def test_update_stock_parameters_equals_loop(qp):
+    trans, expected = get_myopic_trans(qp), get_myopic_trans(qp)
+    trans.updateStockParameters()
+    update_stock_parameters_loop(expected)
+
+    assert list(trans.parameter_updates) == list(expected.parameter_updates)
+    for name, update in expected.parameter_updates.items():
+        assert trans.parameter_updates[name].keys() == update.keys(), name
+        for parameter, value in update.items():
+            assert trans.parameter_updates[name][parameter] == \
+                pytest.approx(value), (name, parameter)
+    # previous year with the capex corrected by the cost scale
+    pd.testing.assert_frame_equal(
+        trans.helper_capex_calculation[CURRENTYEAR - INTERVAL],
+        expected.helper_capex_calculation[CURRENTYEAR - INTERVAL],
+        check_like=True)
+
+
+def test_update_stock_parameters_branches():
+    trans = get_myopic_trans(True)
+    trans.updateStockParameters()
+    updates = trans.parameter_updates
+
+    assert "Small" not in updates
+    # CHP: 1.5 of 2030 with cost scale, 1 of 2025 from the helper and the
+    # rest of 1 of the reference year with the capex of the stock
+    chp_2030 = 102.0 * 0.8 + 1.5 * (102.0 * 0.4 / 10.0) / 2
+    assert updates["CHP"]["investPerCapacity"] == pytest.approx(
+        (1.5 * chp_2030 + 1.0 * 90.0 + 1.0 * 110.0) / 3.5)
+    assert updates["CHP"]["commodityConversionFactors"]["CO2Out"] == \
+        pytest.approx((1.5 * 0.3 + 1.0 * 0.35 + 1.0 * 0.4) / 3.5)
+    # Boiler: only 2030 within the economic lifetime
+    assert updates["Boiler"]["investPerCapacity"] == pytest.approx(
+        1.0 * 122.0 / 2.0)
+    assert "commodityConversionFactors" not in updates["Boiler"]
+    # no emissions of heat pumps, no QP cost scale of storages
+    assert "commodityConversionFactors" not in updates["HeatPump"]
+    assert "QPcostScale" not in updates["Battery"]
+    assert updates["Gas"]["opexPerOperation"] == 25.0